@@ -0,0 +1,33 @@
+"""add document content_hash
+
+Revision ID: 5cc8f55ef2e5
+Revises: 0c1019124dcb
+Create Date: 2026-10-17 09:12:41.503218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5cc8f55ef2e5'
+down_revision: Union[str, Sequence[str], None] = '0c1019124dcb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('document', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    # Same digest as src.utils.general.content_hash: SHA-256 hex of the UTF-8 content.
+    op.execute("UPDATE document SET content_hash = encode(sha256(convert_to(content, 'UTF8')), 'hex')")
+    op.alter_column('document', 'content_hash', nullable=False)
+    op.create_index(op.f('ix_document_content_hash'), 'document', ['content_hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_document_content_hash'), table_name='document')
+    op.drop_column('document', 'content_hash')
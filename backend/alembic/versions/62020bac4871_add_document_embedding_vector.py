@@ -0,0 +1,59 @@
+"""add document embedding vector
+
+Revision ID: 62020bac4871
+Revises: 721b66f5e8ce
+Create Date: 2026-10-17 14:22:08.351730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.config.settings import settings
+from src.utils.types import Vector
+
+
+# revision identifiers, used by Alembic.
+revision: str = '62020bac4871'
+down_revision: Union[str, Sequence[str], None] = '721b66f5e8ce'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Size of the pgvector column; must match the embedding model.
+DIMENSION = settings.EMBEDDING_DIMENSION
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Only the pgvector backend reads or writes embedding_vector; the memory backend keeps
+    # the schema free of the extension. To switch an existing database, downgrade to
+    # 721b66f5e8ce and upgrade again with RAG_BACKEND=pgvector (the column is backfilled).
+    if settings.RAG_BACKEND != "pgvector":
+        return
+    # Requires a Postgres build with pgvector (docker-compose uses pgvector/pgvector:pg17).
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    op.add_column('document', sa.Column('embedding_vector', Vector(DIMENSION), nullable=True))
+    op.execute(
+        f"UPDATE document SET embedding_vector = embedding::vector({DIMENSION}) "
+        f"WHERE array_length(embedding, 1) = {DIMENSION}"
+    )
+    op.create_index(
+        'ix_document_embedding_vector_hnsw',
+        'document',
+        ['embedding_vector'],
+        unique=False,
+        postgresql_using='hnsw',
+        postgresql_with={'m': 16, 'ef_construction': 64},
+        postgresql_ops={'embedding_vector': 'vector_cosine_ops'}
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('document')}
+    if 'embedding_vector' not in columns:
+        return
+    op.drop_index('ix_document_embedding_vector_hnsw', table_name='document')
+    op.drop_column('document', 'embedding_vector')
+    op.execute("DROP EXTENSION IF EXISTS vector")
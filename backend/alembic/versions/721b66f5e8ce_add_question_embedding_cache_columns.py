@@ -0,0 +1,33 @@
+"""add question embedding cache columns
+
+Revision ID: 721b66f5e8ce
+Revises: 5cc8f55ef2e5
+Create Date: 2026-10-17 10:03:27.118904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '721b66f5e8ce'
+down_revision: Union[str, Sequence[str], None] = '5cc8f55ef2e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows keep NULLs: their embeddings were stored pickled and are not reusable.
+    op.add_column('question', sa.Column('question_key', sa.String(length=64), nullable=True))
+    op.add_column('question', sa.Column('embedding_model', sa.String(length=100), nullable=True))
+    op.create_index('ix_question_question_key_embedding_model', 'question', ['question_key', 'embedding_model'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_question_question_key_embedding_model', table_name='question')
+    op.drop_column('question', 'embedding_model')
+    op.drop_column('question', 'question_key')
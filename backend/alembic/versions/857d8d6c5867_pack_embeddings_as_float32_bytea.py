@@ -0,0 +1,74 @@
+"""pack embeddings as float32 bytea
+
+Revision ID: 857d8d6c5867
+Revises: 62020bac4871
+Create Date: 2026-10-17 19:40:12.508331
+
+"""
+import uuid
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from src.utils.types import PackedVector
+
+
+# revision identifiers, used by Alembic.
+revision: str = '857d8d6c5867'
+down_revision: Union[str, Sequence[str], None] = '62020bac4871'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('document', 'question')
+# Rows converted back per round trip on downgrade.
+DOWNGRADE_BATCH_ROWS = 1000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # float4send/int4send are big-endian; PackedVector stores little-endian, so reverse each 4 bytes.
+    op.execute(
+        "CREATE FUNCTION pg_temp.le4(b bytea) RETURNS bytea IMMUTABLE LANGUAGE sql "
+        "AS $$ SELECT substr(b, 4, 1) || substr(b, 3, 1) || substr(b, 2, 1) || substr(b, 1, 1) $$"
+    )
+    for table in TABLES:
+        op.add_column(table, sa.Column('embedding_packed', sa.LargeBinary(), nullable=True))
+        # Header: version 1, dtype 1 (float32), 2 reserved bytes, uint32 dimension (see PackedVector).
+        op.execute(f"""
+            UPDATE {table} t SET embedding_packed = (
+                SELECT '\\x01010000'::bytea
+                    || pg_temp.le4(int4send(count(*)::int))
+                    || coalesce(string_agg(pg_temp.le4(float4send(e::float4)), ''::bytea ORDER BY n), ''::bytea)
+                FROM unnest(t.embedding) WITH ORDINALITY AS u(e, n)
+            )
+            WHERE t.embedding IS NOT NULL
+        """)
+        op.drop_column(table, 'embedding')
+        op.alter_column(table, 'embedding_packed', new_column_name='embedding', nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    for table in TABLES:
+        op.add_column(table, sa.Column('embedding_array', postgresql.ARRAY(postgresql.FLOAT()), nullable=True))
+        # Postgres cannot read float4 from bytea in SQL, so the arrays are rebuilt here.
+        last_id = uuid.UUID(int=0)
+        while True:
+            rows = bind.execute(
+                sa.text(f"SELECT id, embedding FROM {table} WHERE id > :last_id ORDER BY id LIMIT :limit"),
+                {"last_id": last_id, "limit": DOWNGRADE_BATCH_ROWS}
+            ).all()
+            if not rows:
+                break
+            bind.execute(
+                sa.text(f"UPDATE {table} SET embedding_array = :embedding WHERE id = :id").bindparams(
+                    sa.bindparam('embedding', type_=postgresql.ARRAY(postgresql.FLOAT()))
+                ),
+                [{"id": row.id, "embedding": PackedVector.unpack(row.embedding).tolist()} for row in rows]
+            )
+            last_id = rows[-1].id
+        op.drop_column(table, 'embedding')
+        op.alter_column(table, 'embedding_array', new_column_name='embedding', nullable=False)
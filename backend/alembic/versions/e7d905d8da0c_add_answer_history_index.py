@@ -0,0 +1,28 @@
+"""add answer history index
+
+Revision ID: e7d905d8da0c
+Revises: 857d8d6c5867
+Create Date: 2026-10-17 21:12:46.204517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7d905d8da0c'
+down_revision: Union[str, Sequence[str], None] = '857d8d6c5867'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Serves the (created_at, id) keyset of /answer/history, scanned backwards for newest first.
+    op.create_index('ix_answer_created_at_id', 'answer', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_answer_created_at_id', table_name='answer')
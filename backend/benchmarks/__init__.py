@@ -0,0 +1,4 @@
+"""
+Offline benchmarks: a fake OpenAI server, synthetic corpora, micro-benchmarks and an
+end-to-end load generator. Every entry point prints its results as JSON.
+"""
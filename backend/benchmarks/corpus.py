@@ -0,0 +1,118 @@
+import csv
+
+import numpy as np
+
+# Named corpus sizes, in chunks.
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+# Rows generated at a time, so a 1M x 1536 corpus never needs a float64 copy in memory.
+BLOCK_ROWS = 16_384
+
+TERMS = (
+    "impuesto renta contribuyente declaracion retencion fuente patrimonio liquido ganancia ocasional "
+    "iva bienes servicios exentos excluidos tarifa base gravable periodo fiscal sancion extemporaneidad "
+    "correccion devolucion saldo favor dian administracion tributaria factura electronica nomina soporte "
+    "costos deducciones rentas exentas dividendos persona natural juridica regimen simple tributacion "
+    "anticipo descuento tributario obligacion formal responsable agente plazo vencimiento calendario "
+    "beneficio auditoria firmeza emplazamiento requerimiento liquidacion oficial recurso reconsideracion"
+).split()
+QUESTION_TEMPLATES = (
+    "¿Cuál es la tarifa del {} para {}?",
+    "¿Qué dice el artículo {} del Estatuto Tributario?",
+    "¿Cuándo vence el plazo de {} de {}?",
+    "¿Cómo se calcula la {} sobre {}?",
+    "¿Quién está obligado a presentar {} por {}?"
+)
+
+
+def synthetic_embeddings(
+    n: int,
+    dimension: int = 1536,
+    clusters: int = 256,
+    seed: int = 0,
+    path: str | None = None
+) -> np.ndarray:
+    """
+    Row-normalized float32 matrix of `n` vectors spread around `clusters` random topics,
+    which gives nearest-neighbour structure closer to real embeddings than uniform noise.
+    With `path`, the matrix is written to a `.npy` memmap there (6 GB for 1M x 1536).
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dimension), dtype=np.float32)
+    centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+    if path:
+        matrix = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(n, dimension))
+    else:
+        matrix = np.empty((n, dimension), dtype=np.float32)
+    for start in range(0, n, BLOCK_ROWS):
+        rows = min(BLOCK_ROWS, n - start)
+        block = centers[rng.integers(0, clusters, size=rows)]
+        block += rng.standard_normal((rows, dimension), dtype=np.float32) * (1.0 / np.sqrt(dimension))
+        block /= np.linalg.norm(block, axis=1, keepdims=True)
+        matrix[start:start + rows] = block
+    if path:
+        matrix.flush()
+    return matrix
+
+
+def synthetic_queries(matrix: np.ndarray, n: int, seed: int = 1) -> np.ndarray:
+    """
+    Question embeddings near random corpus rows (like a question about one chunk).
+    """
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(matrix.shape[0], size=min(n, matrix.shape[0]), replace=False)
+    queries = np.asarray(matrix[np.sort(rows)], dtype=np.float32)
+    queries += rng.standard_normal(queries.shape, dtype=np.float32) * (0.5 / np.sqrt(matrix.shape[1]))
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def synthetic_document(rng: np.random.Generator, articles: int = 8, sentences: int = 6) -> str:
+    """
+    Statute-like text: numbered articles with sentences, parágrafos and numerals.
+    """
+    parts = []
+    first = int(rng.integers(1, 900))
+    for article in range(first, first + articles):
+        body = []
+        for _ in range(sentences):
+            words = rng.choice(TERMS, size=int(rng.integers(8, 24)))
+            body.append(" ".join(words).capitalize() + ".")
+        parts.append(f"ARTÍCULO {article}. " + " ".join(body))
+        if rng.random() < 0.4:
+            parts.append("PARÁGRAFO. " + " ".join(rng.choice(TERMS, size=20)).capitalize() + ".")
+        if rng.random() < 0.3:
+            parts.append("\n".join(
+                f"{i}. " + " ".join(rng.choice(TERMS, size=10)).capitalize() + ";" for i in range(1, 4)
+            ))
+    return " ".join(parts)
+
+
+def synthetic_documents(n: int, seed: int = 0, articles: int = 8) -> list[str]:
+    rng = np.random.default_rng(seed)
+    return [synthetic_document(rng, articles=articles) for _ in range(n)]
+
+
+def synthetic_questions(n: int, seed: int = 0) -> list[str]:
+    """
+    Distinct Spanish tax questions (no two equal, so caches do not hide the pipeline).
+    """
+    rng = np.random.default_rng(seed)
+    questions = []
+    for i in range(n):
+        template = QUESTION_TEMPLATES[i % len(QUESTION_TEMPLATES)]
+        fills = [str(int(rng.integers(1, 900))) if "artículo" in template else str(rng.choice(TERMS))
+                 for _ in range(template.count("{}"))]
+        questions.append(f"{template.format(*fills)} (#{i})")
+    return questions
+
+
+def write_csv(path: str, n_documents: int, seed: int = 0, articles: int = 8) -> str:
+    """
+    Writes a corpus CSV in the ingestion format (`doc_id`, `title`, `text`).
+    """
+    rng = np.random.default_rng(seed)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["doc_id", "title", "text"])
+        for doc_id in range(n_documents):
+            writer.writerow([doc_id, f"Documento sintético {doc_id}", synthetic_document(rng, articles=articles)])
+    return path
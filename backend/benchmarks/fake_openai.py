@@ -0,0 +1,190 @@
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import time
+import uuid
+
+import numpy as np
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+ANSWER_WORDS = (
+    "De acuerdo con el Estatuto Tributario, el contribuyente debe declarar y pagar el impuesto "
+    "dentro de los plazos que fije el Gobierno Nacional, conservando los soportes de costos, "
+    "deducciones y retenciones en la fuente que haya practicado durante el periodo gravable."
+).split()
+
+
+def fake_embedding(text: str, dimension: int) -> np.ndarray:
+    """
+    Unit-length float32 vector seeded by the SHA-256 of the text: the same text always gets
+    the same vector, in every process.
+    """
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dimension, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def fake_answer(question: str, n_tokens: int) -> list[str]:
+    """
+    Deterministic answer of `n_tokens` words (one streamed delta each) for a question.
+    """
+    offset = int(hashlib.sha256(question.encode("utf-8")).hexdigest()[:8], 16)
+    words = [ANSWER_WORDS[(offset + i) % len(ANSWER_WORDS)] for i in range(n_tokens)]
+    return [word if i == 0 else f" {word}" for i, word in enumerate(words)]
+
+
+def count_tokens(text: str) -> int:
+    # Rough usage figures; the server stays importable without the API settings.
+    return max(1, len(text) // 4)
+
+
+def create_app(
+    dimension: int = 1536,
+    embedding_latency_ms: float = 0.0,
+    embedding_latency_per_input_ms: float = 0.0,
+    chat_latency_ms: float = 0.0,
+    token_latency_ms: float = 0.0,
+    answer_tokens: int = 60
+) -> FastAPI:
+    """
+    Stand-in for the OpenAI embeddings and chat completions endpoints, with fixed latencies.
+    Point the API at it with `OPENAI_BASE_URL=http://<host>:<port>/v1`.
+    :param embedding_latency_ms: Delay of every embeddings request.
+    :param embedding_latency_per_input_ms: Extra delay per input text of a request.
+    :param chat_latency_ms: Delay before the first answer token (the whole answer when not streaming).
+    :param token_latency_ms: Delay between streamed tokens.
+
+    Provider errors are injected through `app.state.embedding_failures`: every embeddings
+    request pops its first item and answers with that HTTP status (e.g. 429 or 503), or
+    normally when it is None.
+    """
+    app = FastAPI(title="Fake OpenAI")
+    app.state.requests = {"embeddings": 0, "embedding_inputs": 0, "chat_completions": 0}
+    app.state.embedding_failures = []
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        app.state.requests["embeddings"] += 1
+        status = app.state.embedding_failures.pop(0) if app.state.embedding_failures else None
+        if status is not None:
+            return JSONResponse(
+                {"error": {"message": f"Injected error {status}", "type": "fake_error", "code": None}},
+                status_code=status
+            )
+        app.state.requests["embedding_inputs"] += len(inputs)
+        delay = embedding_latency_ms + embedding_latency_per_input_ms * len(inputs)
+        if delay:
+            await asyncio.sleep(delay / 1000)
+
+        data = []
+        for i, text in enumerate(inputs):
+            vector = fake_embedding(str(text), dimension)
+            if body.get("encoding_format") == "base64":
+                embedding = base64.b64encode(vector.astype("<f4").tobytes()).decode("ascii")
+            else:
+                embedding = vector.tolist()
+            data.append({"object": "embedding", "index": i, "embedding": embedding})
+        tokens = sum(count_tokens(str(text)) for text in inputs)
+        return JSONResponse({
+            "object": "list",
+            "data": data,
+            "model": body.get("model"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens}
+        })
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests["chat_completions"] += 1
+        question = body["messages"][-1]["content"] if body.get("messages") else ""
+        tokens = fake_answer(question, answer_tokens)
+        usage = {
+            "prompt_tokens": sum(count_tokens(str(m.get("content", ""))) for m in body.get("messages", [])),
+            "completion_tokens": len(tokens)
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+
+        if not body.get("stream"):
+            await asyncio.sleep((chat_latency_ms + token_latency_ms * len(tokens)) / 1000)
+            return JSONResponse({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": body.get("model"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(tokens)},
+                    "finish_reason": "stop"
+                }],
+                "usage": usage
+            })
+
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+
+        def chunk(delta: dict, finish_reason: str | None = None, chunk_usage: dict | None = None) -> str:
+            choices = [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if delta is not None else []
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": body.get("model"),
+                "choices": choices
+            }
+            if chunk_usage:
+                payload["usage"] = chunk_usage
+            return f"data: {json.dumps(payload)}\n\n"
+
+        async def stream():
+            await asyncio.sleep(chat_latency_ms / 1000)
+            yield chunk({"role": "assistant", "content": ""})
+            for i, token in enumerate(tokens):
+                if i and token_latency_ms:
+                    await asyncio.sleep(token_latency_ms / 1000)
+                yield chunk({"content": token})
+            yield chunk({}, finish_reason="stop")
+            if include_usage:
+                yield chunk(None, chunk_usage=usage)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    @app.get("/stats")
+    async def stats():
+        return app.state.requests
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Deterministic fake OpenAI server for benchmarks.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--dimension", type=int, default=1536)
+    parser.add_argument("--embedding-latency-ms", type=float, default=0.0)
+    parser.add_argument("--embedding-latency-per-input-ms", type=float, default=0.0)
+    parser.add_argument("--chat-latency-ms", type=float, default=0.0)
+    parser.add_argument("--token-latency-ms", type=float, default=0.0)
+    parser.add_argument("--answer-tokens", type=int, default=60)
+    args = parser.parse_args()
+    uvicorn.run(
+        create_app(
+            dimension=args.dimension,
+            embedding_latency_ms=args.embedding_latency_ms,
+            embedding_latency_per_input_ms=args.embedding_latency_per_input_ms,
+            chat_latency_ms=args.chat_latency_ms,
+            token_latency_ms=args.token_latency_ms,
+            answer_tokens=args.answer_tokens
+        ),
+        host=args.host,
+        port=args.port,
+        log_level="warning"
+    )
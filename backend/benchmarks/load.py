@@ -0,0 +1,106 @@
+import argparse
+import asyncio
+import itertools
+import time
+from collections import Counter
+
+import httpx
+
+from benchmarks.corpus import synthetic_questions
+from benchmarks.report import emit, summarize
+
+ENDPOINT = "/api/v1/answer/create"
+
+
+async def run_load(
+    base_url: str,
+    concurrency: int,
+    requests: int | None = None,
+    duration_s: float | None = None,
+    warmup: int = 0,
+    distinct_questions: int = 1000,
+    timeout_s: float = 120.0,
+    seed: int = 0
+) -> dict:
+    """
+    Sends questions to `/api/v1/answer/create` from `concurrency` closed-loop workers until
+    `requests` have been sent or `duration_s` has elapsed, and reports throughput and
+    latency percentiles of the measured (post-warmup) requests.
+    :param distinct_questions: Size of the question pool; smaller pools exercise the caches.
+    """
+    questions = itertools.cycle(synthetic_questions(distinct_questions, seed=seed))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    latencies = []
+    statuses = Counter()
+    errors = Counter()
+    sent = 0
+    deadline = None
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout_s) as client:
+        for _ in range(warmup):
+            await client.post(ENDPOINT, json={"question": next(questions)})
+
+        def next_request() -> bool:
+            nonlocal sent
+            if requests is not None and sent >= requests:
+                return False
+            if deadline is not None and time.perf_counter() >= deadline:
+                return False
+            sent += 1
+            return True
+
+        async def worker():
+            while next_request():
+                started = time.perf_counter()
+                try:
+                    response = await client.post(ENDPOINT, json={"question": next(questions)})
+                    statuses[response.status_code] += 1
+                    if response.is_success:
+                        latencies.append((time.perf_counter() - started) * 1000)
+                except httpx.HTTPError as e:
+                    errors[type(e).__name__] += 1
+
+        started = time.perf_counter()
+        deadline = started + duration_s if duration_s else None
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": sent,
+        "succeeded": len(latencies),
+        "failed": sent - len(latencies),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "errors": dict(errors),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency": summarize(latencies)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=f"Closed-loop load generator for {ENDPOINT}.")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=16)
+    limit = parser.add_mutually_exclusive_group()
+    limit.add_argument("--requests", type=int, help="Total requests to send (default 500).")
+    limit.add_argument("--duration", type=float, help="Seconds to run instead of a request count.")
+    parser.add_argument("--warmup", type=int, default=10, help="Unmeasured requests sent first.")
+    parser.add_argument("--distinct-questions", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout.")
+    args = parser.parse_args()
+    if args.requests is None and args.duration is None:
+        args.requests = 500
+
+    results = asyncio.run(run_load(
+        base_url=args.url,
+        concurrency=args.concurrency,
+        requests=args.requests,
+        duration_s=args.duration,
+        warmup=args.warmup,
+        distinct_questions=args.distinct_questions,
+        timeout_s=args.timeout,
+        seed=args.seed
+    ))
+    emit("load", vars(args), results, args.output)
@@ -0,0 +1,195 @@
+import argparse
+import asyncio
+import itertools
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from types import SimpleNamespace
+
+import httpx
+import numpy as np
+from openai import AsyncOpenAI
+
+from benchmarks.corpus import SIZES, synthetic_documents, synthetic_embeddings, synthetic_queries, write_csv
+from benchmarks.fake_openai import create_app
+from benchmarks.report import emit, measure, measure_async
+from src.utils.general import chunk_text
+from src.utils.rag.ann_index import IVFIndex
+from src.utils.rag.chunker import LegalChunker
+from src.utils.rag.embedding_pipeline import EmbeddingPipeline
+from src.utils.rag.embedding_store import EmbeddingStore
+from src.utils.rag.ingestion import IngestionManager
+from src.utils.rag.quantization import QuantizedMatrix
+from src.utils.rag.rag_manager import RagManager
+from src.utils.rag.vector_index import VectorIndex
+from src.utils.types import PackedVector
+
+EMBEDDING_MODEL = "fake-embedding"
+
+
+def fake_client(**server_options) -> AsyncOpenAI:
+    """
+    OpenAI client served in-process by the fake server (no sockets, no network).
+    """
+    transport = httpx.ASGITransport(app=create_app(**server_options))
+    return AsyncOpenAI(
+        api_key="benchmark",
+        base_url="http://fake-openai/v1",
+        http_client=httpx.AsyncClient(transport=transport)
+    )
+
+
+def bench_retrieval(n: int, dimension: int, queries: int, k: int, list_max: int, workdir: str | None) -> dict:
+    """
+    Top-k retrieval over `n` synthetic chunks: `RagManager.get_top_k_documents` (documents
+    with embeddings decoded from their packed column, as loaded from Postgres), the prebuilt `VectorIndex`, int8
+    first-pass scoring with rescoring, and the IVF index.
+    """
+    path = os.path.join(workdir, f"corpus_{n}_{dimension}.npy") if workdir else None
+    started = time.perf_counter()
+    matrix = synthetic_embeddings(n, dimension, path=path)
+    result = {"chunks": n, "dimension": dimension, "k": k, "generate_s": round(time.perf_counter() - started, 3)}
+    questions = synthetic_queries(matrix, queries)
+    index = VectorIndex(matrix, list(range(n)), normalized=True)
+    cycle = itertools.cycle(questions)
+    exact = [{row for _, row in index.search(q, k)} for q in questions]
+
+    def recall(found: list[set]) -> float:
+        return sum(len(a & b) for a, b in zip(exact, found)) / (len(exact) * k)
+
+    if n <= list_max:
+        manager = RagManager(db=None, client=AsyncOpenAI(api_key="benchmark"))
+        documents = [SimpleNamespace(embedding=PackedVector.unpack(PackedVector.pack(row))) for row in matrix]
+        result["get_top_k_documents"] = measure_async(
+            lambda: manager.get_top_k_documents(next(cycle), documents, k),
+            repeat=min(queries, 20)
+        )
+        del documents
+    else:
+        result["get_top_k_documents"] = {"skipped": f"more than {list_max} chunks (see --list-max-chunks)"}
+
+    result["vector_index_search"] = measure(lambda: index.search(next(cycle), k), queries)
+    batch = measure(lambda: index.search_many(questions, k), repeat=3)
+    result["vector_index_search_many"] = {**batch, "per_query_ms": round(batch["p50_ms"] / len(questions), 4)}
+
+    started = time.perf_counter()
+    quantized = QuantizedMatrix.from_matrix(matrix, "int8")
+    build_s = time.perf_counter() - started
+
+    def int8_search(q: np.ndarray) -> list:
+        return index.search_rows(q, quantized.candidates(q, 4 * k), k)
+
+    result["int8_rescore_search"] = {
+        **measure(lambda: int8_search(next(cycle)), queries),
+        "build_s": round(build_s, 3),
+        "recall": recall([{row for _, row in int8_search(q)} for q in questions])
+    }
+
+    if n >= 10_000:
+        started = time.perf_counter()
+        ivf = IVFIndex.build(matrix)
+        build_s = time.perf_counter() - started
+
+        def ivf_search(q: np.ndarray) -> list:
+            return index.search_rows(q, ivf.candidates(q), k)
+
+        result["ivf_search"] = {
+            **measure(lambda: ivf_search(next(cycle)), queries),
+            "build_s": round(build_s, 3),
+            "n_lists": ivf.n_lists,
+            "recall": recall([{row for _, row in ivf_search(q)} for q in questions])
+        }
+    if path:
+        del index, matrix
+        os.remove(path)
+    return result
+
+
+def bench_chunking(n_documents: int, repeat: int) -> dict:
+    """
+    Fixed-size `chunk_text` against the structure-aware `LegalChunker` on synthetic statutes.
+    """
+    documents = synthetic_documents(n_documents)
+    characters = sum(len(text) for text in documents)
+    chunker = LegalChunker()
+    result = {"documents": n_documents, "characters": characters}
+    for name, split in (
+        ("chunk_text", lambda text: chunk_text(text)),
+        ("legal_chunker", lambda text: list(chunker.split(text)))
+    ):
+        timing = measure(lambda: [split(text) for text in documents], repeat)
+        result[name] = {
+            **timing,
+            "chunks": sum(len(split(text)) for text in documents),
+            "mb_per_s": round(characters / 1e6 / (timing["p50_ms"] / 1000), 2)
+        }
+    return result
+
+
+def bench_ingestion(n_documents: int, dimension: int, embedding_latency_ms: float) -> dict:
+    """
+    The ingestion stages that do not need Postgres: CSV streaming and chunking, embedding
+    through the fake server, and writing the embedding store.
+    """
+    workdir = tempfile.mkdtemp(prefix="rag-bench-")
+    try:
+        csv_path = write_csv(os.path.join(workdir, "documents.csv"), n_documents)
+        client = fake_client(dimension=dimension, embedding_latency_ms=embedding_latency_ms)
+        result = {"documents": n_documents, "dimension": dimension, "embedding_latency_ms": embedding_latency_ms}
+
+        started = time.perf_counter()
+        chunks = list(IngestionManager(db=None, client=client).load_chunks(csv_path))
+        elapsed = time.perf_counter() - started
+        result["load_chunks"] = {"chunks": len(chunks), "s": round(elapsed, 3), "chunks_per_s": round(len(chunks) / elapsed, 1)}
+
+        pipeline = EmbeddingPipeline(client, model=EMBEDDING_MODEL, checkpoint_dir=os.path.join(workdir, "checkpoints"))
+        started = time.perf_counter()
+        vectors = VectorIndex.normalize_rows(asyncio.run(pipeline.embed([chunk["content"] for chunk in chunks])))
+        elapsed = time.perf_counter() - started
+        result["embed"] = {
+            "batches": len(pipeline.make_batches([chunk["content"] for chunk in chunks])),
+            "s": round(elapsed, 3),
+            "chunks_per_s": round(len(chunks) / elapsed, 1)
+        }
+
+        store = EmbeddingStore(os.path.join(workdir, "store"))
+        started = time.perf_counter()
+        store.write([uuid.uuid4() for _ in chunks], vectors, EMBEDDING_MODEL)
+        result["store_write"] = {"s": round(time.perf_counter() - started, 3), "bytes": vectors.nbytes}
+        return result
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Retrieval, chunking and ingestion micro-benchmarks.")
+    parser.add_argument("--only", nargs="+", choices=("retrieval", "chunking", "ingestion"),
+                        default=["retrieval", "chunking", "ingestion"])
+    parser.add_argument("--sizes", nargs="+", choices=tuple(SIZES), default=["1k", "10k", "100k"],
+                        help="Corpus sizes for retrieval; 1m needs ~6 GB at 1536 dimensions (see --workdir).")
+    parser.add_argument("--dimension", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--list-max-chunks", type=int, default=10_000,
+                        help="Largest corpus for get_top_k_documents, which rebuilds the matrix per call.")
+    parser.add_argument("--workdir", help="Keep large corpora in memmaps under this directory.")
+    parser.add_argument("--chunk-documents", type=int, default=200)
+    parser.add_argument("--ingest-documents", type=int, default=100)
+    parser.add_argument("--embedding-latency-ms", type=float, default=0.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout.")
+    args = parser.parse_args()
+
+    results = {}
+    if "retrieval" in args.only:
+        results["retrieval"] = [
+            bench_retrieval(SIZES[size], args.dimension, args.queries, args.k, args.list_max_chunks, args.workdir)
+            for size in args.sizes
+        ]
+    if "chunking" in args.only:
+        results["chunking"] = bench_chunking(args.chunk_documents, args.repeat)
+    if "ingestion" in args.only:
+        results["ingestion"] = bench_ingestion(args.ingest_documents, args.dimension, args.embedding_latency_ms)
+    emit("micro", vars(args), results, args.output)
@@ -0,0 +1,126 @@
+import argparse
+import asyncio
+import time
+
+import asyncpg
+
+from benchmarks.corpus import SIZES, synthetic_embeddings, synthetic_queries
+from benchmarks.report import emit, summarize
+from src.config.database import DATABASE_URL
+from src.utils.rag.vector_index import VectorIndex
+from src.utils.types import Vector
+
+# Same build parameters as `ix_document_embedding_vector_hnsw` (migration 62020bac4871).
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 64
+COPY_BLOCK_ROWS = 10_000
+
+
+async def bench_pgvector(
+    dsn: str,
+    n: int,
+    dimension: int,
+    queries: int,
+    k: int,
+    ef_search: list[int],
+    table: str = "bench_pgvector",
+    keep: bool = False
+) -> dict:
+    """
+    Loads `n` synthetic vectors into a scratch table with the same HNSW index as
+    `document.embedding_vector`, then reports recall@k against exact numpy search and
+    the query latency for every `ef_search`, next to an exact sequential scan in Postgres.
+    The `document` table is never touched.
+    """
+    matrix = synthetic_embeddings(n, dimension)
+    questions = synthetic_queries(matrix, queries)
+    index = VectorIndex(matrix, list(range(n)), normalized=True)
+    exact = [{row for _, row in index.search(q, k)} for q in questions]
+    result = {"chunks": n, "dimension": dimension, "k": k}
+
+    connection = await asyncpg.connect(dsn)
+    try:
+        await connection.execute("CREATE EXTENSION IF NOT EXISTS vector")
+        await connection.set_type_codec(
+            "vector",
+            encoder=Vector.to_binary,
+            decoder=Vector.from_binary,
+            format="binary"
+        )
+        await connection.execute(f"DROP TABLE IF EXISTS {table}")
+        await connection.execute(f"CREATE TABLE {table} (id integer PRIMARY KEY, embedding_vector vector({dimension}))")
+
+        started = time.perf_counter()
+        for start in range(0, n, COPY_BLOCK_ROWS):
+            block = matrix[start:start + COPY_BLOCK_ROWS]
+            await connection.copy_records_to_table(
+                table,
+                records=[(start + i, row) for i, row in enumerate(block)],
+                columns=["id", "embedding_vector"]
+            )
+        result["load_s"] = round(time.perf_counter() - started, 3)
+
+        started = time.perf_counter()
+        await connection.execute(
+            f"CREATE INDEX ON {table} USING hnsw (embedding_vector vector_cosine_ops) "
+            f"WITH (m = {HNSW_M}, ef_construction = {HNSW_EF_CONSTRUCTION})"
+        )
+        await connection.execute(f"ANALYZE {table}")
+        result["index_build_s"] = round(time.perf_counter() - started, 3)
+
+        query = f"SELECT id FROM {table} ORDER BY embedding_vector <=> $1 LIMIT $2"
+        plan = await connection.fetchval(f"EXPLAIN (FORMAT JSON) {query}", questions[0], k)
+        result["uses_hnsw_index"] = "Index Scan" in str(plan)
+
+        async def run() -> tuple[float, dict]:
+            samples, found = [], []
+            await connection.fetch(query, questions[0], k)
+            for q in questions:
+                started = time.perf_counter()
+                rows = await connection.fetch(query, q, k)
+                samples.append((time.perf_counter() - started) * 1000)
+                found.append({row["id"] for row in rows})
+            recall = sum(len(a & b) for a, b in zip(exact, found)) / (len(exact) * k)
+            return round(recall, 4), summarize(samples)
+
+        result["hnsw"] = []
+        for ef in ef_search:
+            await connection.execute(f"SET hnsw.ef_search = {int(ef)}")
+            recall, latency = await run()
+            result["hnsw"].append({"ef_search": ef, "recall": recall, "latency": latency})
+
+        # Exact search inside Postgres, for the latency the index saves.
+        await connection.execute("SET enable_indexscan = off")
+        recall, latency = await run()
+        result["seqscan"] = {"recall": recall, "latency": latency}
+        await connection.execute("RESET enable_indexscan")
+    finally:
+        if not keep:
+            await connection.execute(f"DROP TABLE IF EXISTS {table}")
+        await connection.close()
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recall and latency of the pgvector HNSW backend.")
+    parser.add_argument("--dsn", default=DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://"),
+                        help="Postgres with pgvector (defaults to the DB_* settings, e.g. the docker-compose service).")
+    parser.add_argument("--sizes", nargs="+", choices=tuple(SIZES), default=["10k"])
+    parser.add_argument("--dimension", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--ef-search", nargs="+", type=int, default=[10, 40, 100, 200])
+    parser.add_argument("--table", default="bench_pgvector")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch table after the run.")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout.")
+    args = parser.parse_args()
+
+    async def main() -> list[dict]:
+        return [
+            await bench_pgvector(args.dsn, SIZES[size], args.dimension, args.queries, args.k,
+                                 args.ef_search, args.table, args.keep)
+            for size in args.sizes
+        ]
+
+    parameters = {key: value for key, value in vars(args).items() if key != "dsn"}
+    emit("pgvector", parameters, asyncio.run(main()), args.output)
@@ -0,0 +1,97 @@
+import asyncio
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Awaitable, Callable
+
+import numpy as np
+
+
+def summarize(samples_ms: list[float]) -> dict:
+    """
+    Count, mean and p50/p95/p99 of latency samples in milliseconds.
+    """
+    if not samples_ms:
+        return {"count": 0}
+    samples = np.asarray(samples_ms, dtype=np.float64)
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {
+        "count": int(samples.shape[0]),
+        "mean_ms": round(float(samples.mean()), 4),
+        "min_ms": round(float(samples.min()), 4),
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+        "max_ms": round(float(samples.max()), 4)
+    }
+
+
+def measure(fn: Callable[[], object], repeat: int, warmup: int = 1) -> dict:
+    """
+    Latency summary of `repeat` calls of `fn`, after `warmup` untimed calls.
+    """
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return summarize(samples)
+
+
+def measure_async(fn: Callable[[], Awaitable[object]], repeat: int, warmup: int = 1) -> dict:
+    """
+    Same as `measure` for a coroutine function; every call runs on one event loop.
+    """
+    async def run() -> list[float]:
+        for _ in range(warmup):
+            await fn()
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            await fn()
+            samples.append((time.perf_counter() - started) * 1000)
+        return samples
+    return summarize(asyncio.run(run()))
+
+
+def environment() -> dict:
+    """
+    Where the results come from, so runs are only compared on equal footing.
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, timeout=5, cwd=os.path.dirname(__file__)
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count()
+    }
+
+
+def emit(benchmark: str, parameters: dict, results: object, output: str | None = None):
+    """
+    Writes a run as JSON to `output`, or to stdout.
+    """
+    document = json.dumps(
+        {"benchmark": benchmark, "environment": environment(), "parameters": parameters, "results": results},
+        indent=2,
+        default=str
+    )
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(document + "\n")
+    else:
+        sys.stdout.write(document + "\n")
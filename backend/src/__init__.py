@@ -1,6 +1,8 @@
 from fastapi import APIRouter
 from src.answer import routers as answer_routers
+from src.health import routers as health_routers
 
 main_router = APIRouter(prefix="/api/v1")
 main_router.include_router(answer_routers.router)
+main_router.include_router(health_routers.router)
 
@@ -1,5 +1,5 @@
 import datetime
-from sqlalchemy import Text, ForeignKey
+from sqlalchemy import Index, Text, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -15,4 +15,9 @@ class Answer(Base):
     created_at: Mapped[datetime.datetime] = mapped_column(default=datetime.datetime.utcnow)
     
     question = relationship("Question", back_populates="answers")
-    documents = relationship("AnswerDocument", back_populates="answer", cascade="all, delete-orphan")
\ No newline at end of file
+    documents = relationship("AnswerDocument", back_populates="answer", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Keyset pagination of the history, newest first.
+        Index("ix_answer_created_at_id", "created_at", "id"),
+    )
\ No newline at end of file
@@ -1,8 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Body
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.config.database import get_db
-from src.question.schemas import QuestionRequest
-from src.answer.schemas import AnswerResponse
+from src.config.database import SessionLocal, get_db
+from src.config.settings import settings
+from src.question.schemas import BatchQuestionRequest, QuestionRequest
+from src.answer.schemas import (
+    AnswerDocumentsResponse,
+    AnswerHistoryItem,
+    AnswerHistoryResponse,
+    AnswerResponse,
+    BatchAnswerResponse,
+    SourceDocumentSchema
+)
+from src.answer.services import AnswerManager
+from src.utils.general import decode_cursor
 from src.utils.rag.rag_manager import RagManager
 
 router = APIRouter(prefix="/answer", tags=["Answer"])
@@ -27,3 +39,135 @@ async def generate_answer(
                 "method": "generate_answer"
             }
         )
+
+@router.post(
+   "/batch",
+   status_code=status.HTTP_200_OK,
+   response_model=BatchAnswerResponse
+)
+async def generate_answers_batch(
+    payload: BatchQuestionRequest = Body(),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Answers up to `BATCH_MAX_QUESTIONS` questions at once. Each result carries either the
+    answer and its sources or the error of that question.
+    """
+    try:
+        return await RagManager(db).process_batch(payload.questions)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "error": "Failed to generate answers",
+                "details": str(e),
+                "method": "generate_answers_batch"
+            }
+        )
+
+@router.post(
+   "/stream",
+   response_class=StreamingResponse,
+   responses={200: {"content": {"text/event-stream": {}}}}
+)
+async def stream_answer(
+    payload: QuestionRequest = Body()
+):
+    """
+    Streams the answer as Server-Sent Events: `sources`, then `token` events, then `done`
+    (same body as `/answer/create`) or `error`.
+    """
+    async def events():
+        # The session must outlive the request handler, so it is owned by the stream itself.
+        async with SessionLocal() as db:
+            async for event in RagManager(db).stream_question(payload):
+                yield event
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get(
+   "/history",
+   response_model=AnswerHistoryResponse,
+   response_model_exclude_none=True
+)
+async def get_answer_history(
+    limit: int = Query(settings.HISTORY_PAGE_SIZE, ge=1, le=settings.HISTORY_MAX_PAGE_SIZE),
+    cursor: str | None = Query(None, description="`next_cursor` of the previous page"),
+    include_content: bool = Query(False, description="Include the content of the cited documents"),
+    include_embedding: bool = Query(False, description="Include the question and document embeddings"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Past questions and answers with their cited documents, newest first. Pages are keyed
+    on (created_at, id), so following `next_cursor` is stable while new answers arrive.
+    """
+    try:
+        position = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": "Invalid cursor",
+                "details": str(e),
+                "method": "get_answer_history"
+            }
+        )
+    try:
+        answers, next_cursor = await AnswerManager(db).get_history(limit, position, include_content, include_embedding)
+        return AnswerHistoryResponse(
+            items=[AnswerHistoryItem.from_answer(answer, include_content, include_embedding) for answer in answers],
+            next_cursor=next_cursor
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "error": "Failed to retrieve answer history",
+                "details": str(e),
+                "method": "get_answer_history"
+            }
+        )
+
+@router.get(
+   "/{answer_id}/documents",
+   response_model=AnswerDocumentsResponse,
+   response_model_exclude_none=True
+)
+async def get_answer_documents(
+    answer_id: UUID,
+    include_content: bool = Query(False, description="Include the content of the documents"),
+    include_embedding: bool = Query(False, description="Include the document embeddings"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Documents cited by an answer, most relevant first.
+    """
+    try:
+        links = await AnswerManager(db).get_documents(answer_id, include_content, include_embedding)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "error": "Failed to retrieve answer documents",
+                "details": str(e),
+                "method": "get_answer_documents"
+            }
+        )
+    if links is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "error": "Answer not found",
+                "details": f"No answer with id {answer_id}",
+                "method": "get_answer_documents"
+            }
+        )
+    return AnswerDocumentsResponse(
+        answer_id=answer_id,
+        documents=[SourceDocumentSchema.from_link(link, include_content, include_embedding) for link in links]
+    )
+
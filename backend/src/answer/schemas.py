@@ -1,6 +1,7 @@
+import datetime
 from uuid import UUID
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 
 class AnswerResponse(BaseModel):
@@ -8,6 +9,20 @@ class AnswerResponse(BaseModel):
     sources: List[str]
 
 
+class BatchAnswerItem(BaseModel):
+    index: int
+    question: str
+    answer: Optional[str] = None
+    sources: List[str] = []
+    error: Optional[str] = None
+
+
+class BatchAnswerResponse(BaseModel):
+    results: List[BatchAnswerItem]
+    succeeded: int
+    failed: int
+
+
 class AnswerReadSchema(BaseModel):
     id: UUID
     answer_text: str
@@ -17,3 +32,68 @@ class AnswerReadSchema(BaseModel):
         from_attributes = True
 
 
+class SourceDocumentSchema(BaseModel):
+    document_id: UUID
+    title: str
+    relevance_score: float
+    content: Optional[str] = None
+    embedding: Optional[List[float]] = None
+
+    @classmethod
+    def from_link(cls, link, include_content: bool = False, include_embedding: bool = False) -> "SourceDocumentSchema":
+        """
+        Builds the schema from an `AnswerDocument` whose `document` was eager loaded; the
+        optional columns are only read when they were part of the projection.
+        """
+        document = link.document
+        return cls(
+            document_id=link.document_id,
+            title=document.title,
+            relevance_score=link.relevance_score,
+            content=document.content if include_content else None,
+            embedding=document.embedding.tolist() if include_embedding else None
+        )
+
+
+class HistoryQuestionSchema(BaseModel):
+    id: UUID
+    question_text: str
+    created_at: datetime.datetime
+    embedding: Optional[List[float]] = None
+
+
+class AnswerHistoryItem(BaseModel):
+    id: UUID
+    answer_text: str
+    created_at: datetime.datetime
+    question: HistoryQuestionSchema
+    sources: List[SourceDocumentSchema]
+
+    @classmethod
+    def from_answer(cls, answer, include_content: bool = False, include_embedding: bool = False) -> "AnswerHistoryItem":
+        question = answer.question
+        return cls(
+            id=answer.id,
+            answer_text=answer.answer_text,
+            created_at=answer.created_at,
+            question=HistoryQuestionSchema(
+                id=question.id,
+                question_text=question.question_text,
+                created_at=question.created_at,
+                embedding=question.embedding.tolist() if include_embedding else None
+            ),
+            sources=[
+                SourceDocumentSchema.from_link(link, include_content, include_embedding)
+                for link in sorted(answer.documents, key=lambda link: -link.relevance_score)
+            ]
+        )
+
+
+class AnswerHistoryResponse(BaseModel):
+    items: List[AnswerHistoryItem]
+    next_cursor: Optional[str] = None
+
+
+class AnswerDocumentsResponse(BaseModel):
+    answer_id: UUID
+    documents: List[SourceDocumentSchema]
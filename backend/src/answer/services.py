@@ -1,24 +1,32 @@
+import datetime
 from uuid import UUID
+from sqlalchemy import Sequence, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from src.answer.models import Answer
+from src.answer_document.models import AnswerDocument
+from src.document.services import DocumentManager
+from src.question.models import Question
+from src.utils.general import encode_cursor
 
 
 class AnswerManager:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def create_answer(self, question_id: UUID, answer_text: str) -> Answer:
+    async def create_answer(self, question_id: UUID, answer_text: str, is_flush: bool = False) -> Answer:
         """
         Create a new answer associated with a question.
         :param question_id: UUID of the related question.
         :param answer_text: The answer text generated by the model.
+        :param is_flush: Whether to flush (caller commits) instead of commit.
         :return: The created Answer object.
         """
         try:
             answer = await self._create({
                 "question_id": question_id,
                 "answer_text": answer_text
-            })
+            }, is_flush=is_flush)
             return answer
         except ValueError as e:
             raise ValueError({
@@ -27,6 +35,111 @@ class AnswerManager:
                 "method": "AnswerManager.create_answer"
             })
 
+    async def get_recent_answers(self, since: datetime.datetime, embedding_model: str, limit: int) -> Sequence[Answer]:
+        """
+        Retrieve the latest answers created since a timestamp, with their question and sources loaded.
+        :param since: Oldest creation time to include.
+        :param embedding_model: Only answers whose question was embedded with this model.
+        :param limit: Maximum number of answers.
+        :return: Answers, newest first.
+        """
+        try:
+            query = (
+                select(Answer)
+                .join(Answer.question)
+                .where(Answer.created_at >= since, Question.embedding_model == embedding_model)
+                .options(selectinload(Answer.question), selectinload(Answer.documents))
+                .order_by(Answer.created_at.desc())
+                .limit(limit)
+            )
+            result = await self.db.execute(query)
+            return result.scalars().all()
+        except Exception as e:
+            raise ValueError({
+                "error": "Error retrieving recent answers",
+                "details": str(e),
+                "method": "AnswerManager.get_recent_answers"
+            })
+
+    async def get_history(
+        self,
+        limit: int,
+        cursor: tuple[datetime.datetime, UUID] | None = None,
+        include_content: bool = False,
+        include_embedding: bool = False
+    ) -> tuple[Sequence[Answer], str | None]:
+        """
+        Retrieve a page of answers, newest first, with their question and cited documents
+        eager loaded (one query per relationship instead of one per answer).
+        :param limit: Maximum number of answers.
+        :param cursor: (created_at, id) of the last answer of the previous page.
+        :param include_content: Load the content of the cited documents.
+        :param include_embedding: Load the question and document embeddings.
+        :return: The answers and the cursor of the next page (None on the last page).
+        """
+        try:
+            question_columns = [Question.id, Question.question_text, Question.created_at]
+            if include_embedding:
+                question_columns.append(Question.embedding)
+            query = (
+                select(Answer)
+                .options(
+                    selectinload(Answer.question).load_only(*question_columns),
+                    selectinload(Answer.documents)
+                    .selectinload(AnswerDocument.document)
+                    .load_only(*DocumentManager.columns(include_content, include_embedding))
+                )
+                .order_by(Answer.created_at.desc(), Answer.id.desc())
+                .limit(limit + 1)
+            )
+            if cursor is not None:
+                query = query.where(tuple_(Answer.created_at, Answer.id) < tuple_(*cursor))
+            result = await self.db.execute(query)
+            answers = result.scalars().all()
+            if len(answers) <= limit:
+                return answers, None
+            answers = answers[:limit]
+            return answers, encode_cursor(answers[-1].created_at, answers[-1].id)
+        except Exception as e:
+            raise ValueError({
+                "error": "Error retrieving answer history",
+                "details": str(e),
+                "method": "AnswerManager.get_history"
+            })
+
+    async def get_documents(
+        self,
+        answer_id: UUID,
+        include_content: bool = False,
+        include_embedding: bool = False
+    ) -> Sequence[AnswerDocument] | None:
+        """
+        Retrieve the documents cited by an answer, most relevant first.
+        :param answer_id: UUID of the answer.
+        :return: The answer links with their document loaded, or None if the answer does not exist.
+        """
+        try:
+            exists = await self.db.execute(select(Answer.id).where(Answer.id == answer_id))
+            if exists.scalar_one_or_none() is None:
+                return None
+            query = (
+                select(AnswerDocument)
+                .where(AnswerDocument.answer_id == answer_id)
+                .options(
+                    selectinload(AnswerDocument.document)
+                    .load_only(*DocumentManager.columns(include_content, include_embedding))
+                )
+                .order_by(AnswerDocument.relevance_score.desc())
+            )
+            result = await self.db.execute(query)
+            return result.scalars().all()
+        except Exception as e:
+            raise ValueError({
+                "error": "Error retrieving answer documents",
+                "details": str(e),
+                "method": "AnswerManager.get_documents"
+            })
+
     async def _create(self, payload: dict, is_flush: bool = False) -> Answer:
         """
         Internal method to create an Answer object.
@@ -38,10 +151,11 @@ class AnswerManager:
             answer = Answer(**payload)
             self.db.add(answer)
             if is_flush:
+                # The flush already fetched the generated primary key; no refresh needed.
                 await self.db.flush()
             else:
                 await self.db.commit()
-            await self.db.refresh(answer)
+                await self.db.refresh(answer)
             return answer
         except Exception as e:
             raise ValueError({
@@ -1,25 +1,32 @@
+import uuid
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.answer_document.models import AnswerDocument
 from src.document.models import Document
+from src.utils.database import bulk_insert
 
 class AnswerDocumentManager:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def post_link_documents_to_answer(self, answer_id: UUID, top_docs: list[tuple[float, Document]]):
+    async def post_link_documents_to_answer(self, answer_id: UUID, top_docs: list[tuple[float, Document]], is_flush: bool = False):
         """
         Create and link documents to an answer with relevance scores.
         :param answer_id: UUID of the answer.
         :param top_docs: List of (score, Document) tuples.
+        :param is_flush: Whether to leave the commit to the caller.
         """
         try:
-            for score, doc in top_docs:
-                await self._create({
+            await bulk_insert(self.db, AnswerDocument, [
+                {
+                    # COPY skips the client-side default, so the id is generated here.
+                    "id": uuid.uuid4(),
                     "answer_id": answer_id,
                     "document_id": doc.id,
                     "relevance_score": score
-                })
+                }
+                for score, doc in top_docs
+            ], commit=not is_flush)
         except Exception as e:
             raise ValueError({
                 "error": "Error linking documents to answer",
@@ -38,10 +45,11 @@ class AnswerDocumentManager:
             answer_doc = AnswerDocument(**payload)
             self.db.add(answer_doc)
             if is_flush:
+                # The flush already fetched the generated primary key; no refresh needed.
                 await self.db.flush()
             else:
                 await self.db.commit()
-            await self.db.refresh(answer_doc)
+                await self.db.refresh(answer_doc)
             return answer_doc
         except Exception as e:
             raise ValueError({
@@ -12,6 +12,8 @@ class Settings(BaseSettings):
     DB_HOST: str | None = None
     DB_NAME: str | None = None
     DB_PORT: int | None = None
+    BULK_INSERT_BATCH_SIZE: int = 1000
+    BULK_INSERT_METHOD: str = "values"  # values | copy
 
     # General
     APP_NAME: str | None = None
@@ -24,8 +26,68 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str | None = None
     OPENAI_MODEL: str | None = None
     OPENAI_EMBEDDING_MODEL: str | None = None
+    OPENAI_BASE_URL: str | None = None
+    OPENAI_MAX_CONNECTIONS: int = 100
+    OPENAI_TIMEOUT_SECONDS: float = 60.0
+    EMBEDDING_MICROBATCH_WAIT_MS: float = 5.0
+    EMBEDDING_MICROBATCH_MAX_INPUTS: int = 256
     PROMPT_TEMPLATE: str = (
         "Eres un asistente experto en materia tributaria y legal. Con base únicamente en la información proporcionada a continuación, responde de forma clara, precisa y profesional. Si no cuentas con suficiente información para responder, indícalo con transparencia. {context}\n\n---\n\nPregunta:\n{question}\n\n---\n\nRespuesta:"
     )
 
+    # RAG
+    RAG_BACKEND: str = "memory"  # memory | pgvector
+    RAG_PGVECTOR_EF_SEARCH: int = 40
+    EMBEDDING_DIMENSION: int = 1536
+    EMBEDDING_STORE_DIR: str | None = None
+    EMBEDDING_STORE_VERIFY: bool = False
+    CORPUS_SNAPSHOT_ENABLED: bool = False
+    CORPUS_SNAPSHOT_DIR: str | None = None
+    CORPUS_SNAPSHOT_KEEP: int = 2
+    CORPUS_DB_POLL_SECONDS: float = 5.0
+    RAG_RETRIEVAL_MODE: str = "exact"  # exact | ivf
+    RAG_IVF_NLIST: int | None = None
+    RAG_IVF_NPROBE: int = 8
+    RAG_IVF_MIN_DOCUMENTS: int = 10000
+    RAG_QUANTIZATION: str = "none"  # none | int8
+    RAG_RESCORE_FACTOR: int = 4
+    RAG_LEXICAL_MODE: str = "off"  # off | hybrid | prefilter
+    RAG_LEXICAL_CANDIDATES: int = 100
+    RAG_RRF_K: int = 60
+    EMBEDDING_CACHE_SIZE: int = 10000
+    EMBEDDING_CACHE_PERSISTENT: bool = True
+    RETRIEVAL_CACHE_SIZE: int = 1000
+    RETRIEVAL_CACHE_BITS: int = 8
+    RETRIEVAL_CACHE_THRESHOLD: float = 0.99
+    CONTEXT_MAX_TOKENS: int = 1500
+    CONTEXT_DEDUP_THRESHOLD: float = 0.8
+    SEMANTIC_CACHE_ENABLED: bool = False
+    SEMANTIC_CACHE_THRESHOLD: float = 0.95
+    SEMANTIC_CACHE_TTL_SECONDS: int = 86400
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 5000
+    PERSISTENCE_MODE: str = "sync"  # sync | write_behind
+    PERSISTENCE_QUEUE_SIZE: int = 1000
+    PERSISTENCE_BATCH_SIZE: int = 50
+    BATCH_MAX_QUESTIONS: int = 100
+    BATCH_GENERATION_CONCURRENCY: int = 8
+    HISTORY_PAGE_SIZE: int = 20
+    HISTORY_MAX_PAGE_SIZE: int = 100
+
+    # Ingestion
+    CHUNK_MAX_CHARS: int = 1200
+    CHUNK_OVERLAP_CHARS: int = 150
+    INGESTION_CSV_BATCH_ROWS: int = 500
+    INGESTION_EMBED_BATCH_CHUNKS: int = 2000
+    EMBEDDING_BATCH_MAX_TOKENS: int = 100000
+    EMBEDDING_BATCH_MAX_INPUTS: int = 512
+    EMBEDDING_CONCURRENCY: int = 4
+    EMBEDDING_MAX_RETRIES: int = 5
+    EMBEDDING_RETRY_BASE_SECONDS: float = 1.0
+    EMBEDDING_CHECKPOINT_DIR: str | None = None
+
+    # Observability
+    SERVER_TIMING_ENABLED: bool = True
+    PROFILING_ENABLED: bool = False
+    PROFILING_DIR: str | None = None
+
 settings = Settings()
@@ -1,10 +1,14 @@
 import datetime
+
+import numpy as np
 from sqlalchemy import String, Text
-from sqlalchemy.dialects.postgresql import UUID, ARRAY, FLOAT
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
 from src.config.database import Base
+from src.config.settings import settings
+from src.utils.types import PackedVector, Vector
 
 
 class Document(Base):
@@ -13,7 +17,12 @@ class Document(Base):
     id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=func.gen_random_uuid())
     title: Mapped[str] = mapped_column(String(255))
     content: Mapped[str] = mapped_column(Text)
-    embedding: Mapped[list[float]] = mapped_column(ARRAY(FLOAT))
+    content_hash: Mapped[str] = mapped_column(String(64), index=True)
+    embedding: Mapped[np.ndarray] = mapped_column(PackedVector)
+    # Only created with RAG_BACKEND=pgvector (migration 62020bac4871), so never loaded by default.
+    embedding_vector: Mapped[list[float] | None] = mapped_column(
+        Vector(settings.EMBEDDING_DIMENSION), nullable=True, deferred=True
+    )
     created_at: Mapped[datetime.datetime] = mapped_column(default=datetime.datetime.utcnow)
 
 
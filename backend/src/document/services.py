@@ -1,30 +1,110 @@
-import pickle
+import datetime
+import uuid
+from uuid import UUID
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
+from src.config.settings import settings
 from src.document.models import Document
-from sqlalchemy import Sequence, select
+from src.utils.database import bulk_insert
+from src.utils.general import content_hash
+from sqlalchemy import Row, Sequence, delete, func, select
 
 
 class DocumentManager:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def bulk_create_documents_with_embeddings(self, documents: list[dict], embeddings: list, cache_path: str):
+    @staticmethod
+    def columns(include_content: bool = False, include_embedding: bool = False) -> list:
         """
-        Bulk creates documents in the database and saves their embeddings in cache.
+        Columns to load when a document is only displayed; `content` and `embedding` are
+        the heavy ones and are left out unless asked for.
         """
-        cache_data = []
+        columns = [Document.id, Document.title, Document.created_at]
+        if include_content:
+            columns.append(Document.content)
+        if include_embedding:
+            columns.append(Document.embedding)
+        return columns
 
-        for i, doc in enumerate(documents):
-            embedding = embeddings[i]
-            db_doc = await self._create({
-                "title": doc["title"],
-                "content": doc["content"],
-                "embedding": embedding
+    async def bulk_create_documents_with_embeddings(self, documents: list[dict], embeddings: np.ndarray | list) -> list[Document]:
+        """
+        Bulk creates documents in the database.
+        Returns the created documents (transient objects, not attached to the session).
+        """
+        try:
+            created_at = datetime.datetime.utcnow()
+            rows = [
+                {
+                    "id": uuid.uuid4(),
+                    "title": doc["title"],
+                    "content": doc["content"],
+                    "content_hash": doc.get("content_hash") or content_hash(doc["content"]),
+                    "embedding": embeddings[i],
+                    "created_at": created_at
+                }
+                for i, doc in enumerate(documents)
+            ]
+            # Only the pgvector backend has (and searches) the `embedding_vector` column.
+            if settings.RAG_BACKEND == "pgvector":
+                for row in rows:
+                    row["embedding_vector"] = row["embedding"]
+            await bulk_insert(self.db, Document, rows)
+        except Exception as e:
+            raise ValueError({
+                "error": "Error creating documents",
+                "details": str(e),
+                "method": "DocumentManager.bulk_create_documents_with_embeddings"
+            })
+        return [Document(**row) for row in rows]
+
+    async def get_chunk_keys(self) -> Sequence[Row]:
+        """
+        Retrieves id, title and content_hash of every document, used to diff a new ingestion.
+        """
+        try:
+            query = select(Document.id, Document.title, Document.content_hash)
+            result = await self.db.execute(query)
+            return result.all()
+        except Exception as e:
+            raise ValueError({
+                "error": "Error retrieving chunk keys",
+                "details": str(e),
+                "method": "DocumentManager.get_chunk_keys"
             })
-            cache_data.append((doc["title"], doc["content"], embedding))
 
-        with open(cache_path, "wb") as f:
-            pickle.dump(cache_data, f)
+    async def get_embeddings(self, ids: list[UUID]) -> dict[UUID, np.ndarray]:
+        """
+        Retrieves the embeddings of the given documents, keyed by id.
+        """
+        try:
+            query = select(Document.id, Document.embedding).where(Document.id.in_(ids))
+            result = await self.db.execute(query)
+            return {doc_id: embedding for doc_id, embedding in result.all()}
+        except Exception as e:
+            raise ValueError({
+                "error": "Error retrieving document embeddings",
+                "details": str(e),
+                "method": "DocumentManager.get_embeddings"
+            })
+
+    async def delete_documents(self, ids: list[UUID], batch_size: int | None = None) -> int:
+        """
+        Deletes documents by id, one transaction per batch. Their answer links are removed by cascade.
+        """
+        try:
+            batch_size = batch_size or settings.BULK_INSERT_BATCH_SIZE
+            for start in range(0, len(ids), batch_size):
+                await self.db.execute(delete(Document).where(Document.id.in_(ids[start:start + batch_size])))
+                await self.db.commit()
+            return len(ids)
+        except Exception as e:
+            await self.db.rollback()
+            raise ValueError({
+                "error": "Error deleting documents",
+                "details": str(e),
+                "method": "DocumentManager.delete_documents"
+            })
     
     async def get_documents_list(self) -> Sequence[Document]:
         """
@@ -42,15 +122,72 @@ class DocumentManager:
             })
         
 
+    async def get_corpus_metadata(self) -> Sequence[Row]:
+        """
+        Retrieves id, title, content and created_at of every document, without embeddings.
+        """
+        try:
+            query = select(
+                Document.id,
+                Document.title,
+                Document.content,
+                Document.created_at
+            ).order_by(Document.created_at, Document.id)
+            result = await self.db.execute(query)
+            return result.all()
+        except Exception as e:
+            raise ValueError({
+                "error": "Error retrieving corpus metadata",
+                "details": str(e),
+                "method": "DocumentManager.get_corpus_metadata"
+            })
+
+    async def get_corpus_rows(self) -> Sequence[Row]:
+        """
+        Retrieves the columns needed for retrieval as plain rows, skipping ORM hydration.
+        """
+        try:
+            query = select(
+                Document.id,
+                Document.title,
+                Document.content,
+                Document.embedding,
+                Document.created_at
+            ).order_by(Document.created_at, Document.id)
+            result = await self.db.execute(query)
+            return result.all()
+        except Exception as e:
+            raise ValueError({
+                "error": "Error retrieving corpus rows",
+                "details": str(e),
+                "method": "DocumentManager.get_corpus_rows"
+            })
+
+    async def get_corpus_signature(self) -> tuple[int, datetime.datetime | None]:
+        """
+        Number of documents and latest `created_at`: changes whenever documents are added
+        or an ingestion replaces some of them.
+        """
+        try:
+            result = await self.db.execute(select(func.count(Document.id), func.max(Document.created_at)))
+            return tuple(result.one())
+        except Exception as e:
+            raise ValueError({
+                "error": "Error retrieving corpus signature",
+                "details": str(e),
+                "method": "DocumentManager.get_corpus_signature"
+            })
+
     async def _create(self, payload: dict, is_flush: bool = False) -> Document:
         try:
             document = Document(**payload)
             self.db.add(document)
             if is_flush:
+                # The flush already fetched the generated primary key; no refresh needed.
                 await self.db.flush()
             else:
                 await self.db.commit()
-            await self.db.refresh(document)
+                await self.db.refresh(document)
             return document
         except Exception as e:
             raise ValueError({
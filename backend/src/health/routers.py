@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.config.database import get_db
+from src.config.settings import settings
+from src.utils.metrics import registry
+from src.utils.rag.answer_cache import semantic_answer_cache
+from src.utils.rag.context_builder import context_builder
+from src.utils.rag.corpus_store import corpus_store
+from src.utils.rag.embedding_cache import question_embedding_cache
+from src.utils.rag.openai_client import embedding_batcher
+from src.utils.rag.persistence import write_behind_queue
+from src.utils.rag.pgvector_retriever import PgVectorRetriever
+from src.utils.rag.retrieval_cache import retrieval_cache
+
+router = APIRouter(prefix="/health", tags=["Health"])
+# Served at the root (`/metrics`), where Prometheus scrapes by default.
+metrics_router = APIRouter(tags=["Health"])
+
+@router.get("/live")
+async def liveness():
+    return {"status": "alive"}
+
+@router.get("/ready")
+async def readiness(db: AsyncSession = Depends(get_db)):
+    """
+    The API is ready once the corpus store is loaded and not empty or, with the pgvector
+    backend, once Postgres answers and has indexed documents.
+    """
+    if settings.RAG_BACKEND == "pgvector":
+        body = {"status": "ready", "backend": "pgvector"}
+        try:
+            ready = await PgVectorRetriever(db).is_ready()
+        except Exception:
+            ready = False
+        if not ready:
+            body["status"] = "not_ready"
+            return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=body)
+        return body
+
+    body = {
+        "status": "ready",
+        "documents": len(corpus_store),
+        "corpus_version": corpus_store.version
+    }
+    if not corpus_store.loaded or not len(corpus_store):
+        body["status"] = "not_ready"
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=body)
+    return body
+
+@router.get("/stats")
+async def stats():
+    """
+    In-process cache counters of this worker.
+    """
+    return {
+        "question_embedding_cache": question_embedding_cache.stats(),
+        "retrieval_cache": retrieval_cache.stats(),
+        "semantic_answer_cache": semantic_answer_cache.stats(),
+        "write_behind_queue": write_behind_queue.stats(),
+        "embedding_batcher": embedding_batcher.stats(),
+        "context_builder": context_builder.stats()
+    }
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Stage, request and token usage histograms of this worker, in Prometheus text format.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,40 @@
+import argparse
+import asyncio
+import json
+import logging
+
+from src.config.database import SessionLocal, engine
+from src.utils.rag.ingestion import DEFAULT_CSV_PATH, IngestionManager
+from src.utils.rag.openai_client import openai_client_manager
+
+
+async def main(csv_path: str, snapshot_only: bool = False):
+    """
+    Synchronizes the corpus with the CSV, outside of the API process.
+    :param snapshot_only: Only publish the current corpus as a worker snapshot.
+    """
+    try:
+        async with SessionLocal() as db:
+            if snapshot_only:
+                stats = {"snapshot": await IngestionManager(db).publish_snapshot()}
+            else:
+                stats = await IngestionManager(db).ingest(csv_path)
+        print(json.dumps(stats))
+    finally:
+        await openai_client_manager.close()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    # Usage: python -m src.ingest [--csv path/to/documents.csv] [--snapshot-only]
+    parser = argparse.ArgumentParser(description="Chunk, embed and store the RAG corpus.")
+    parser.add_argument("--csv", default=DEFAULT_CSV_PATH, help="CSV with doc_id, title and text columns")
+    parser.add_argument(
+        "--snapshot-only",
+        action="store_true",
+        help="Publish the stored corpus as a snapshot for the API workers, without ingesting"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(args.csv, args.snapshot_only))
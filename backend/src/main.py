@@ -1,12 +1,52 @@
 import json
+import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from src import main_router
+from src.config.database import SessionLocal
 from src.config.settings import settings
+from src.health.routers import metrics_router
+from src.utils.middleware import ObservabilityMiddleware
+from src.utils.rag.answer_cache import semantic_answer_cache
+from src.utils.rag.corpus_store import corpus_store
+from src.utils.rag.openai_client import openai_client_manager
+from src.utils.rag.persistence import write_behind_queue
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Warms the in-memory corpus store once per process so requests never load the corpus.
+    Ingestion is done beforehand by `python -m src.ingest`; if the corpus is missing or the
+    database is not reachable yet, /health/ready reports it and the store is loaded lazily
+    on the first question. With `RAG_BACKEND=pgvector` retrieval runs in Postgres and no
+    corpus is loaded.
+    """
+    try:
+        async with SessionLocal() as db:
+            if settings.RAG_BACKEND == "pgvector":
+                corpus_store.track_store()
+            else:
+                await corpus_store.load(db)
+                if not len(corpus_store):
+                    logger.warning("Corpus is empty, run `python -m src.ingest`")
+            if settings.SEMANTIC_CACHE_ENABLED:
+                await semantic_answer_cache.warm(db, corpus_store)
+    except Exception as e:
+        logger.warning("Corpus store not loaded at startup: %s", e)
+    if settings.PERSISTENCE_MODE == "write_behind":
+        write_behind_queue.start()
+    yield
+    await write_behind_queue.stop()
+    await openai_client_manager.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # This code block is checking if the `BACKEND_CORS_ORIGIN` setting is defined in the `settings`
 # module. If it is defined, it adds a CORS (Cross-Origin Resource Sharing) middleware to the FastAPI
@@ -21,6 +61,9 @@ if settings.BACKEND_CORS_ORIGIN:
         expose_headers=["Content-Disposition"],
     )
 
+# Per-request timings (Server-Timing header, /metrics histograms) and opt-in profiling.
+app.add_middleware(ObservabilityMiddleware)
+
 # This is just to initialize the translation system
 if settings.APP_NAME:
     app.title = settings.APP_NAME
@@ -28,6 +71,7 @@ if settings.APP_NAME:
 # `app.include_router(main_router)` is including the routes defined in the `main_router` in the
 # FastAPI application.
 app.include_router(main_router)
+app.include_router(metrics_router)
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,17 +1,26 @@
 import datetime
-from sqlalchemy import Text
-from sqlalchemy.dialects.postgresql import UUID, ARRAY, FLOAT
+
+import numpy as np
+from sqlalchemy import Index, String, Text
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
 from src.config.database import Base
+from src.utils.types import PackedVector
 
 class Question(Base):
     __tablename__ = "question"
 
     id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=func.gen_random_uuid())
     question_text: Mapped[str] = mapped_column(Text)
-    embedding: Mapped[list[float]] = mapped_column(ARRAY(FLOAT))
+    question_key: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    embedding: Mapped[np.ndarray] = mapped_column(PackedVector)
+    embedding_model: Mapped[str | None] = mapped_column(String(100), nullable=True)
     created_at: Mapped[datetime.datetime] = mapped_column(default=datetime.datetime.utcnow)
 
-    answers = relationship("Answer", back_populates="question", cascade="all, delete-orphan")
\ No newline at end of file
+    answers = relationship("Answer", back_populates="question", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        Index("ix_question_question_key_embedding_model", "question_key", "embedding_model"),
+    )
\ No newline at end of file
@@ -1,11 +1,17 @@
 from uuid import UUID
 from pydantic import BaseModel, Field
+from typing import List
+from src.config.settings import settings
 
 
 class QuestionRequest(BaseModel):
     question: str = Field(..., min_length=1, max_length=500)
 
 
+class BatchQuestionRequest(BaseModel):
+    questions: List[QuestionRequest] = Field(..., min_length=1, max_length=settings.BATCH_MAX_QUESTIONS)
+
+
 class QuestionReadSchema(BaseModel):
     id: UUID
     question_text: str
@@ -1,25 +1,31 @@
-import pickle
+import numpy as np
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from src.config.settings import settings
 from src.question.models import Question
+from src.utils.general import content_hash, normalize_question
 
 
 class QuestionManager:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def create_question(self, payload: dict, embedding: list[float]) -> Question:
+    async def create_question(self, payload: dict, embedding: np.ndarray | list[float], is_flush: bool = False) -> Question:
         """
         Create a new question in the database.
         
         :param payload: The request payload containing the question text.
         :param embedding: The embedding vector for the question.
+        :param is_flush: Whether to flush (caller commits) instead of commit.
         :return: The created Question object.
         """
         try:
             question = await self._create({
                 "question": payload.question,
-                "embedding": embedding
-            })
+                "question_key": content_hash(normalize_question(payload.question)),
+                "embedding": embedding,
+                "embedding_model": settings.OPENAI_EMBEDDING_MODEL
+            }, is_flush=is_flush)
             return question
         except ValueError as e:
             raise ValueError({
@@ -29,6 +35,33 @@ class QuestionManager:
             })
         
     
+    async def get_embeddings(self, question_keys: list[str], embedding_model: str) -> dict[str, np.ndarray]:
+        """
+        Returns the embedding of the latest question with the same normalized text and model,
+        for many normalized questions in one query.
+        :param question_keys: SHA-256 of the normalized question texts.
+        :param embedding_model: Model that produced the embeddings.
+        :return: Latest embedding per question key found.
+        """
+        try:
+            if not question_keys:
+                return {}
+            # DISTINCT ON keeps only the latest row of each key, however often it was asked.
+            query = (
+                select(Question.question_key, Question.embedding)
+                .where(Question.question_key.in_(set(question_keys)), Question.embedding_model == embedding_model)
+                .distinct(Question.question_key)
+                .order_by(Question.question_key, Question.created_at.desc())
+            )
+            result = await self.db.execute(query)
+            return {question_key: embedding for question_key, embedding in result.all()}
+        except Exception as e:
+            raise ValueError({
+                "error": "Error retrieving question embeddings",
+                "details": str(e),
+                "method": "QuestionManager.get_embeddings"
+            })
+
     async def _create(self, payload: dict, is_flush=False) -> Question:
         """
         Internal method to create a question in the database.
@@ -39,14 +72,17 @@ class QuestionManager:
         try:
             question = Question(
                 question_text=payload["question"],
-                embedding=pickle.dumps(payload["embedding"])
+                question_key=payload.get("question_key"),
+                embedding=payload["embedding"],
+                embedding_model=payload.get("embedding_model")
             )
             self.db.add(question)
             if is_flush:
+                # The flush already fetched the generated primary key; no refresh needed.
                 await self.db.flush()
             else:
                 await self.db.commit()
-            await self.db.refresh(question)
+                await self.db.refresh(question)
             return question
         except Exception as e:
             raise ValueError({
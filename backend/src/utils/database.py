@@ -0,0 +1,88 @@
+from typing import Sequence
+
+from sqlalchemy import insert
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config.database import Base
+from src.config.settings import settings
+from src.utils.types import Vector
+
+# asyncpg accepts at most 32767 bind parameters per statement.
+MAX_BIND_PARAMETERS = 32767
+
+
+async def bulk_insert(
+    db: AsyncSession,
+    model: type[Base],
+    rows: Sequence[dict],
+    batch_size: int | None = None,
+    method: str | None = None,
+    commit: bool = True
+) -> int:
+    """
+    Inserts plain dict rows without creating, refreshing or tracking ORM objects.
+
+    :param model: Mapped class whose table receives the rows.
+    :param rows: Column values; every row must have the same keys.
+    :param batch_size: Rows per statement/transaction (`BULK_INSERT_BATCH_SIZE` by default).
+    :param method: "values" for multi-row INSERT ... VALUES, "copy" for asyncpg COPY
+        (`BULK_INSERT_METHOD` by default). COPY skips column defaults, so rows must
+        carry every non-nullable column.
+    :param commit: Commit after each batch (one transaction per batch); if False the
+        caller owns the transaction and the batches are only flushed to the database.
+    :return: Number of inserted rows.
+    """
+    try:
+        if not rows:
+            return 0
+        method = method or settings.BULK_INSERT_METHOD
+        columns = list(rows[0].keys())
+        batch_size = batch_size or settings.BULK_INSERT_BATCH_SIZE
+        # Column defaults may add bind parameters, so budget for every column of the table.
+        batch_size = max(1, min(batch_size, MAX_BIND_PARAMETERS // len(model.__table__.columns)))
+
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            if method == "copy":
+                await _copy(db, model, columns, batch)
+            else:
+                await db.execute(insert(model).values(list(batch)))
+            if commit:
+                await db.commit()
+        return len(rows)
+    except Exception as e:
+        if commit:
+            await db.rollback()
+        raise ValueError({
+            "error": "Error inserting rows",
+            "details": str(e),
+            "method": "bulk_insert"
+        })
+
+
+async def _copy(db: AsyncSession, model: type[Base], columns: list[str], batch: Sequence[dict]):
+    connection = await db.connection()
+    raw = await connection.get_raw_connection()
+    if any(isinstance(model.__table__.c[column].type, Vector) for column in columns):
+        # COPY uses the binary protocol, which asyncpg only speaks for pgvector with a codec.
+        await raw.driver_connection.set_type_codec(
+            "vector",
+            encoder=Vector.to_binary,
+            decoder=Vector.from_binary,
+            format="binary"
+        )
+    # COPY bypasses SQLAlchemy bind processing, so TypeDecorator columns (e.g. PackedVector) are encoded here.
+    types = [model.__table__.c[column].type for column in columns]
+    encoders = [column_type if isinstance(column_type, TypeDecorator) else None for column_type in types]
+    await raw.driver_connection.copy_records_to_table(
+        model.__tablename__,
+        records=[
+            tuple(
+                encoder.process_bind_param(row[column], None) if encoder is not None else row[column]
+                for column, encoder in zip(columns, encoders)
+            )
+            for row in batch
+        ],
+        columns=columns
+    )
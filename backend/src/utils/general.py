@@ -1,5 +1,17 @@
+import base64
+import datetime
+import hashlib
+import json
+import math
+import re
+import unicodedata
+from uuid import UUID
+
 import numpy as np
 
+# Conservative characters-per-token ratio for Spanish legal text with OpenAI tokenizers.
+CHARS_PER_TOKEN = 3
+
 
 def chunk_text(text: str, max_chars: int = 1500):
     """
@@ -19,4 +31,53 @@ def normalize_v(vec: np.ndarray) -> np.ndarray:
     Normalizes a vector for stability in cosine similarity.
     """
     norm = np.linalg.norm(vec)
-    return vec / norm if norm > 0 else vec
\ No newline at end of file
+    return vec / norm if norm > 0 else vec
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the number of tokens of a text without loading a tokenizer.
+    It over-counts on purpose so batches stay under provider limits.
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def content_hash(text: str) -> str:
+    """
+    SHA-256 hex digest of a chunk, used to detect new, changed and removed chunks.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def normalize_question(text: str) -> str:
+    """
+    Canonical form of a question for cache keys: NFC, lower case, collapsed whitespace.
+    """
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip().lower()
+
+def fold_accents(text: str) -> str:
+    """
+    Removes diacritics (á → a, ñ → n) so Spanish terms match with or without accents.
+    """
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+def sse_event(event: str, data: dict) -> str:
+    """
+    Formats a Server-Sent Event with a JSON payload.
+    """
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def encode_cursor(created_at: datetime.datetime, row_id: UUID) -> str:
+    """
+    Opaque keyset pagination cursor pointing at the last row of a page.
+    """
+    payload = json.dumps([created_at.isoformat(), str(row_id)]).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime.datetime, UUID]:
+    """
+    Inverse of `encode_cursor`; raises ValueError on a malformed cursor.
+    """
+    try:
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.datetime.fromisoformat(created_at), UUID(row_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}")
@@ -0,0 +1,183 @@
+import math
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+# Seconds; from sub-millisecond in-process stages up to slow generations.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str | None = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram in the Prometheus model (`_bucket`, `_sum`, `_count`).
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # Per series: non-cumulative bucket counts (the last one is +Inf), sum.
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1][0] += value
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(tuple(str(labels.get(name, "")) for name in self.labelnames))
+        return sum(series[0]) if series else 0
+
+    def samples(self) -> Iterator[str]:
+        for key, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total[0])}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}"
+
+
+class MetricsRegistry:
+    """
+    In-process metrics of this worker, rendered in the Prometheus text exposition format.
+    With several workers every process keeps its own series; Prometheus aggregates them.
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, Histogram] = {}
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS
+    ) -> Histogram:
+        if name in self._metrics:
+            raise ValueError({
+                "error": "Duplicated metric",
+                "details": f"Metric {name!r} is already registered",
+                "method": "MetricsRegistry.histogram"
+            })
+        metric = self._metrics[name] = Histogram(name, documentation, labelnames, buckets)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+class RequestTimings:
+    """
+    Stage durations of the current request, in the order they first ran, for `Server-Timing`.
+    """
+
+    def __init__(self):
+        self.stages: dict[str, float] = {}
+
+    def add(self, stage: str, seconds: float):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def header(self, total_seconds: float | None = None) -> str:
+        entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.stages.items()]
+        if total_seconds is not None:
+            entries.append(f"total;dur={total_seconds * 1000:.2f}")
+        return ", ".join(entries)
+
+
+registry = MetricsRegistry()
+request_timings: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+
+stage_duration = registry.histogram(
+    "rag_stage_duration_seconds",
+    "Duration of each stage of the RAG pipeline.",
+    ("stage",)
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "Time until the response is fully sent, by route.",
+    ("method", "route", "status")
+)
+openai_tokens = registry.histogram(
+    "openai_tokens",
+    "Tokens per OpenAI call; _sum is the total usage.",
+    ("model", "type"),
+    TOKEN_BUCKETS
+)
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Times a block as a pipeline stage: observed in `rag_stage_duration_seconds` and added
+    to the `Server-Timing` header of the request running it (if any). Failed blocks
+    are timed too.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - started)
+
+
+def record_stage(name: str, seconds: float) -> None:
+    """
+    Records a stage timed by hand, e.g. the upstream waits of a stream spread over many awaits.
+    """
+    stage_duration.observe(seconds, stage=name)
+    timings = request_timings.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+def record_token_usage(model: str | None, usage) -> None:
+    """
+    Records the `usage` block of an OpenAI response (chat or embeddings).
+    """
+    if usage is None:
+        return
+    model = model or "unknown"
+    prompt_tokens = getattr(usage, "prompt_tokens", None)
+    completion_tokens = getattr(usage, "completion_tokens", None)
+    if prompt_tokens is not None:
+        openai_tokens.observe(prompt_tokens, model=model, type="prompt")
+    if completion_tokens is not None:
+        openai_tokens.observe(completion_tokens, model=model, type="completion")
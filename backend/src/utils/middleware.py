@@ -0,0 +1,110 @@
+import cProfile
+import logging
+import os
+import tempfile
+import time
+import uuid
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config.settings import settings
+from src.utils.metrics import RequestTimings, http_request_duration, request_timings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+
+class ObservabilityMiddleware:
+    """
+    Times every HTTP request into `http_request_duration_seconds` and collects the stages
+    timed with `metrics.stage` while it runs. Stages finished before the response starts are
+    sent in a `Server-Timing` header (for streamed answers, everything up to the first event).
+
+    With `PROFILING_ENABLED`, a request sent with `X-Profile: 1` runs under cProfile and the
+    stats are written to `PROFILING_DIR/<id>.prof`, the id being returned in `X-Profile-Id`.
+    cProfile follows the event loop thread, so other requests served meanwhile show up in
+    the capture too; only one capture runs at a time.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._profiling = False
+        self._routes: dict[object, str] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = request_timings.set(timings)
+        started = time.perf_counter()
+        status_code = 500
+        profiler, profile_id = self._start_profiler(scope)
+
+        async def send_with_timing(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                if settings.SERVER_TIMING_ENABLED:
+                    headers.append("Server-Timing", timings.header(time.perf_counter() - started))
+                if profiler is not None:
+                    headers.append(PROFILE_ID_HEADER, profile_id)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_timings.reset(token)
+            http_request_duration.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=self._route(scope),
+                status=str(status_code)
+            )
+            if profiler is not None:
+                self._stop_profiler(profiler, profile_id)
+
+    def _route(self, scope: Scope) -> str:
+        """
+        Path template of the matched route ("/api/v1/answer/create"), so the label keeps a
+        bounded number of values; unknown paths share one label.
+        """
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        route = self._routes.get(endpoint)
+        if route is None:
+            app = scope.get("app")
+            route = next(
+                (r.path for r in getattr(app, "routes", []) if getattr(r, "endpoint", None) is endpoint),
+                getattr(endpoint, "__name__", "unknown")
+            )
+            self._routes[endpoint] = route
+        return route
+
+    def _start_profiler(self, scope: Scope) -> tuple[cProfile.Profile | None, str | None]:
+        if not settings.PROFILING_ENABLED or self._profiling:
+            return None, None
+        if dict(scope["headers"]).get(PROFILE_HEADER) not in (b"1", b"true"):
+            return None, None
+        self._profiling = True
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler, uuid.uuid4().hex
+
+    def _stop_profiler(self, profiler: cProfile.Profile, profile_id: str):
+        profiler.disable()
+        self._profiling = False
+        directory = settings.PROFILING_DIR or os.path.join(tempfile.gettempdir(), "rag-profiles")
+        try:
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"{profile_id}.prof")
+            profiler.dump_stats(path)
+            logger.info("Request profile written to %s", path)
+        except OSError as e:
+            logger.warning("Could not write request profile %s: %s", profile_id, e)
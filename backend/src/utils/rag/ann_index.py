@@ -0,0 +1,213 @@
+import math
+import time
+
+import numpy as np
+
+from src.utils.rag.vector_index import VectorIndex
+
+FORMAT_VERSION = 1
+# Index saved next to the embedding store, tied to it by the store checksum.
+ANN_FILE = "ivf.npz"
+
+
+class IVFIndex:
+    """
+    Inverted-file approximate nearest-neighbour index over a `VectorIndex` matrix.
+
+    Rows are clustered around `n_lists` unit-length k-means centroids. A query only scores
+    the rows of its `nprobe` closest lists, so the work per question grows with
+    nprobe / n_lists of the corpus instead of the whole corpus. The index stores row
+    numbers only; vectors stay in the `VectorIndex` matrix.
+    """
+
+    def __init__(
+        self,
+        centroids: np.ndarray,
+        assignments: np.ndarray,
+        nprobe: int = 8,
+        order: np.ndarray | None = None,
+        offsets: np.ndarray | None = None
+    ):
+        """
+        :param centroids: (n_lists x dimension) unit-length centroids.
+        :param assignments: List number of every matrix row.
+        :param nprobe: Default number of lists scanned per query.
+        :param order: Precomputed CSR layout with `offsets` (e.g. mapped from a snapshot);
+            derived from the assignments otherwise.
+        """
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.assignments = np.ascontiguousarray(assignments, dtype=np.int32)
+        self.nprobe = nprobe
+        # CSR layout: rows of list `i` are order[offsets[i]:offsets[i + 1]].
+        if order is None or offsets is None:
+            order = np.argsort(self.assignments, kind="stable").astype(np.int64)
+            counts = np.bincount(self.assignments, minlength=self.n_lists)
+            offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self.order = order
+        self.offsets = offsets
+
+    @property
+    def n_lists(self) -> int:
+        return self.centroids.shape[0]
+
+    def __len__(self) -> int:
+        return self.assignments.shape[0]
+
+    @classmethod
+    def build(
+        cls,
+        matrix: np.ndarray,
+        n_lists: int | None = None,
+        nprobe: int = 8,
+        n_iter: int = 20,
+        sample_size: int | None = None,
+        seed: int = 0
+    ) -> "IVFIndex":
+        """
+        Trains spherical k-means centroids on a sample of the (unit-length) rows and
+        assigns every row to its closest centroid.
+        :param n_lists: Number of lists; defaults to 4 * sqrt(rows).
+        :param sample_size: Rows used for training; defaults to 256 per list.
+        """
+        try:
+            count = matrix.shape[0]
+            if count == 0:
+                raise ValueError("Cannot build an index over an empty matrix")
+            n_lists = max(1, min(n_lists or int(4 * math.sqrt(count)), count))
+            rng = np.random.default_rng(seed)
+            sample_size = min(count, sample_size or 256 * n_lists)
+            sample_rows = np.sort(rng.choice(count, size=sample_size, replace=False))
+            sample = np.asarray(matrix[sample_rows], dtype=np.float32)
+
+            centroids = sample[rng.choice(sample_size, size=n_lists, replace=False)].copy()
+            for _ in range(n_iter):
+                labels = cls._assign(sample, centroids)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, labels, sample)
+                counts = np.bincount(labels, minlength=n_lists)
+                empty = counts == 0
+                if empty.any():
+                    # Re-seed empty lists with random training rows.
+                    sums[empty] = sample[rng.choice(sample_size, size=int(empty.sum()), replace=False)]
+                centroids = VectorIndex.normalize_rows(sums)
+
+            return cls(centroids, cls._assign(matrix, centroids), nprobe=nprobe)
+        except Exception as e:
+            raise ValueError({
+                "error": "Error building IVF index",
+                "details": str(e),
+                "method": "IVFIndex.build"
+            })
+
+    @staticmethod
+    def _assign(matrix: np.ndarray, centroids: np.ndarray, block: int = 65536) -> np.ndarray:
+        labels = np.empty(matrix.shape[0], dtype=np.int32)
+        for start in range(0, matrix.shape[0], block):
+            rows = np.asarray(matrix[start:start + block], dtype=np.float32)
+            labels[start:start + block] = np.argmax(rows @ centroids.T, axis=1)
+        return labels
+
+    def candidates(self, question_embedding: np.ndarray, nprobe: int | None = None) -> np.ndarray:
+        """
+        Returns the matrix rows of the `nprobe` lists closest to the question.
+        """
+        nprobe = max(1, min(nprobe or self.nprobe, self.n_lists))
+        query = np.asarray(question_embedding, dtype=np.float32)
+        centroid_scores = self.centroids @ query
+        if nprobe < self.n_lists:
+            lists = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        else:
+            lists = np.arange(self.n_lists)
+        return np.concatenate([self.order[self.offsets[i]:self.offsets[i + 1]] for i in lists])
+
+    def select(self, rows: np.ndarray) -> "IVFIndex":
+        """
+        Returns a new index keeping only `rows` (renumbered in the given order).
+        """
+        return IVFIndex(self.centroids, self.assignments[rows], nprobe=self.nprobe)
+
+    def save(self, path: str, source_checksum: str | None = None):
+        """
+        Saves centroids and assignments; `source_checksum` ties the file to an embedding store.
+        """
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                format_version=np.int32(FORMAT_VERSION),
+                centroids=self.centroids,
+                assignments=self.assignments,
+                source_checksum=np.array(source_checksum or "")
+            )
+
+    @classmethod
+    def load(cls, path: str, nprobe: int = 8, source_checksum: str | None = None) -> "IVFIndex | None":
+        """
+        Loads a saved index. Returns None if it was built from a different embedding store.
+        """
+        with np.load(path) as data:
+            if int(data["format_version"]) != FORMAT_VERSION:
+                return None
+            if source_checksum is not None and str(data["source_checksum"]) != source_checksum:
+                return None
+            return cls(data["centroids"], data["assignments"], nprobe=nprobe)
+
+
+def recall_report(
+    index: VectorIndex,
+    ivf: IVFIndex,
+    queries: np.ndarray | None = None,
+    k: int = 5,
+    nprobes: tuple[int, ...] = (1, 2, 4, 8, 16, 32),
+    n_queries: int = 200,
+    seed: int = 0
+) -> list[dict]:
+    """
+    Compares IVF search with the exact scan for several `nprobe` values.
+    When no queries are given, random corpus rows are used as questions.
+    :return: One dict per nprobe with recall@k, mean latencies and the fraction of rows scored.
+    """
+    if queries is None:
+        rng = np.random.default_rng(seed)
+        rows = rng.choice(len(index), size=min(n_queries, len(index)), replace=False)
+        queries = np.asarray(index.matrix[rows], dtype=np.float32)
+
+    started = time.perf_counter()
+    exact = [set(index.rank(q, k)[0].tolist()) for q in queries]
+    exact_ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+    report = []
+    for nprobe in nprobes:
+        hits = 0
+        scanned = 0
+        started = time.perf_counter()
+        for q, expected in zip(queries, exact):
+            rows = ivf.candidates(q, nprobe)
+            scanned += rows.shape[0]
+            found, _ = index.rank(q, k, rows=rows)
+            hits += len(expected & set(found.tolist()))
+        ivf_ms = (time.perf_counter() - started) * 1000 / len(queries)
+        report.append({
+            "nprobe": nprobe,
+            "k": k,
+            "recall": hits / (len(queries) * k),
+            "ivf_ms": round(ivf_ms, 4),
+            "exact_ms": round(exact_ms, 4),
+            "speedup": round(exact_ms / ivf_ms, 2) if ivf_ms else None,
+            "scanned_fraction": scanned / (len(queries) * len(index))
+        })
+    return report
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    from src.config.settings import settings
+    from src.utils.rag.embedding_store import EmbeddingStore
+
+    # Usage: python -m src.utils.rag.ann_index [k]
+    ids, vectors = EmbeddingStore().open()
+    exact_index = VectorIndex(vectors, ids, normalized=True)
+    ivf_index = IVFIndex.build(vectors, n_lists=settings.RAG_IVF_NLIST, nprobe=settings.RAG_IVF_NPROBE)
+    top_k = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(json.dumps({"n_lists": ivf_index.n_lists, "report": recall_report(exact_index, ivf_index, k=top_k)}, indent=2))
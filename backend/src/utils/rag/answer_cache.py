@@ -0,0 +1,166 @@
+import datetime
+import logging
+import time
+from dataclasses import dataclass
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.answer.services import AnswerManager
+from src.config.settings import settings
+from src.utils.general import normalize_v
+from src.utils.rag.corpus_store import CorpusStore
+from src.utils.rag.pgvector_retriever import PgVectorRetriever
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class CachedAnswer:
+    """
+    A generated answer, its `(score, document)` sources and the corpus version it was built on.
+    """
+    answer_text: str
+    top_docs: list
+    corpus_version: int
+
+
+class SemanticAnswerCache:
+    """
+    Opt-in cache returning a previous answer when a new question is a near duplicate.
+
+    Past question embeddings live in a fixed-size float32 ring buffer, so a lookup is a
+    single matrix-vector product. An entry matches when its cosine similarity reaches
+    `threshold`, it is younger than `ttl_seconds`, and it was answered against the
+    current corpus version. A corpus change drops every entry.
+    """
+
+    def __init__(self, threshold: float, ttl_seconds: float, max_entries: int):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.corpus_version: int | None = None
+        self.hits = 0
+        self.misses = 0
+        self._clear()
+
+    def __len__(self) -> int:
+        return sum(entry is not None for entry in self._entries)
+
+    def lookup(self, question_embedding: np.ndarray, corpus_version: int) -> CachedAnswer | None:
+        """
+        Returns the cached answer of the most similar live question above the threshold.
+        """
+        self._check_version(corpus_version)
+        if self._matrix is None or not self._size:
+            self.misses += 1
+            return None
+        query = normalize_v(np.asarray(question_embedding, dtype=np.float32))
+        scores = self._matrix[:self._size] @ query
+        scores[self._expires[:self._size] < time.monotonic()] = -np.inf
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold or self._entries[best] is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._entries[best]
+
+    def store(self, question_embedding: np.ndarray, answer: CachedAnswer, age_seconds: float = 0.0):
+        """
+        Adds an answer, overwriting the oldest entry once the buffer is full.
+        """
+        if self.max_entries <= 0:
+            return
+        self._check_version(answer.corpus_version)
+        query = normalize_v(np.asarray(question_embedding, dtype=np.float32))
+        if self._matrix is None or self._matrix.shape[1] != query.shape[0]:
+            self._matrix = np.zeros((self.max_entries, query.shape[0]), dtype=np.float32)
+        slot = self._next
+        self._matrix[slot] = query
+        self._expires[slot] = time.monotonic() + self.ttl_seconds - age_seconds
+        self._entries[slot] = answer
+        self._next = (slot + 1) % self.max_entries
+        self._size = min(self._size + 1, self.max_entries)
+
+    def invalidate(self):
+        """
+        Drops every entry (e.g. after the corpus changed).
+        """
+        self._clear()
+
+    async def warm(self, db: AsyncSession, corpus: CorpusStore) -> int:
+        """
+        Loads recent answers produced after the current corpus was built and within the TTL.
+        :return: Number of answers loaded.
+        """
+        try:
+            since = datetime.datetime.utcnow() - datetime.timedelta(seconds=self.ttl_seconds)
+            if corpus.changed_at is not None:
+                since = max(since, corpus.changed_at)
+            answers = await AnswerManager(db).get_recent_answers(
+                since=since,
+                embedding_model=settings.OPENAI_EMBEDDING_MODEL,
+                limit=self.max_entries
+            )
+            if settings.RAG_BACKEND == "pgvector":
+                # No in-memory corpus: the sources are read from the document table.
+                documents = await PgVectorRetriever(db).get_documents(
+                    list({link.document_id for answer in answers for link in answer.documents})
+                )
+                resolve = documents.get
+            else:
+                resolve = corpus.get
+            now = datetime.datetime.utcnow()
+            loaded = 0
+            for answer in reversed(answers):
+                top_docs = [
+                    (link.relevance_score, resolve(link.document_id))
+                    for link in sorted(answer.documents, key=lambda link: -link.relevance_score)
+                ]
+                if not top_docs or any(doc is None for _, doc in top_docs):
+                    continue
+                self.store(
+                    answer.question.embedding,
+                    CachedAnswer(answer_text=answer.answer_text, top_docs=top_docs, corpus_version=corpus.version),
+                    age_seconds=(now - answer.created_at).total_seconds()
+                )
+                loaded += 1
+            logger.info("Semantic answer cache warmed with %s answers", loaded)
+            return loaded
+        except Exception as e:
+            raise ValueError({
+                "error": "Error warming semantic answer cache",
+                "details": str(e),
+                "method": "SemanticAnswerCache.warm"
+            })
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": settings.SEMANTIC_CACHE_ENABLED,
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "corpus_version": self.corpus_version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+    def _check_version(self, corpus_version: int):
+        if corpus_version != self.corpus_version:
+            self._clear()
+            self.corpus_version = corpus_version
+
+    def _clear(self):
+        self._matrix: np.ndarray | None = None
+        self._expires = np.full(max(self.max_entries, 0), -np.inf)
+        self._entries: list[CachedAnswer | None] = [None] * max(self.max_entries, 0)
+        self._next = 0
+        self._size = 0
+
+
+semantic_answer_cache = SemanticAnswerCache(
+    threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+    ttl_seconds=settings.SEMANTIC_CACHE_TTL_SECONDS,
+    max_entries=settings.SEMANTIC_CACHE_MAX_ENTRIES
+)
@@ -0,0 +1,125 @@
+import re
+from typing import Iterator
+
+from src.config.settings import settings
+
+# Units start at an article, a paragraph (parágrafo), a numeral ("1.", "2)") or a literal ("a)").
+UNIT_BOUNDARY = re.compile(
+    r"\s+(?=(?:ART[IÍ]CULO|Art[ií]culo|ART\.|Art\.|PAR[AÁ]GRAFO|Par[aá]grafo)\s+\w)"
+    r"|\n\s*(?=(?:\d{1,3}|[a-z]{1,2})[.)]\s)"
+)
+ARTICLE_START = re.compile(r"^(?:ART[IÍ]CULO|Art[ií]culo|ART\.|Art\.)\s+\w")
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.;:!?])\s+(?=[\"'(¿¡A-ZÁÉÍÓÚÑ0-9])")
+
+
+class LegalChunker:
+    """
+    Splits legal text into chunks that follow its structure.
+
+    The text is cut into units at Artículo, Parágrafo and numeral boundaries, and units are
+    packed into chunks of at most `max_chars`. A new article starts a new chunk once the
+    current one is at least half full. Units longer than `max_chars` are split at
+    sentence boundaries, and sentences that are still too long at whitespace.
+    Every chunk after the first starts with up to `overlap_chars` of whole sentences (or
+    words) from the end of the previous chunk.
+    """
+
+    def __init__(self, max_chars: int | None = None, overlap_chars: int | None = None):
+        self.max_chars = max_chars or settings.CHUNK_MAX_CHARS
+        self.overlap_chars = settings.CHUNK_OVERLAP_CHARS if overlap_chars is None else overlap_chars
+        if self.overlap_chars >= self.max_chars:
+            raise ValueError({
+                "error": "Invalid chunker configuration",
+                "details": f"Overlap ({self.overlap_chars}) must be smaller than max_chars ({self.max_chars})",
+                "method": "LegalChunker.__init__"
+            })
+
+    def split(self, text: str) -> Iterator[str]:
+        """
+        Lazily yields the chunks of `text`.
+        """
+        current = ""
+        for piece, is_article in self._pieces(text):
+            if current:
+                joined = f"{current} {piece}"
+                starts_article = is_article and len(current) >= self.max_chars // 2
+                if len(joined) <= self.max_chars and not starts_article:
+                    current = joined
+                    continue
+                yield current
+                # A new article starts clean; continuations repeat the end of the previous chunk.
+                overlap = "" if starts_article else self._overlap(current, self.max_chars - len(piece) - 1)
+                current = f"{overlap} {piece}" if overlap else piece
+            else:
+                current = piece
+        if current:
+            yield current
+
+    def _pieces(self, text: str) -> Iterator[tuple[str, bool]]:
+        """
+        Structural units no longer than `max_chars`, flagged when they open an article.
+        """
+        for unit in UNIT_BOUNDARY.split(text or ""):
+            unit = " ".join(unit.split())
+            if not unit:
+                continue
+            is_article = bool(ARTICLE_START.match(unit))
+            if len(unit) <= self.max_chars:
+                yield unit, is_article
+                continue
+            for sentence in self._split_long(unit):
+                yield sentence, is_article
+                is_article = False
+
+    def _split_long(self, unit: str) -> Iterator[str]:
+        buffer = ""
+        for sentence in SENTENCE_BOUNDARY.split(unit):
+            for part in self._split_words(sentence):
+                if buffer and len(buffer) + 1 + len(part) <= self.max_chars:
+                    buffer = f"{buffer} {part}"
+                    continue
+                if buffer:
+                    yield buffer
+                buffer = part
+        if buffer:
+            yield buffer
+
+    def _split_words(self, sentence: str) -> Iterator[str]:
+        if len(sentence) <= self.max_chars:
+            yield sentence
+            return
+        buffer = ""
+        for word in sentence.split(" "):
+            while len(word) > self.max_chars:
+                if buffer:
+                    yield buffer
+                    buffer = ""
+                yield word[:self.max_chars]
+                word = word[self.max_chars:]
+            if buffer and len(buffer) + 1 + len(word) > self.max_chars:
+                yield buffer
+                buffer = word
+            else:
+                buffer = f"{buffer} {word}" if buffer else word
+        if buffer:
+            yield buffer
+
+    def _overlap(self, chunk: str, room: int) -> str:
+        """
+        Tail of `chunk` repeated at the start of the next one: whole sentences when they fit,
+        otherwise whole words.
+        """
+        limit = min(self.overlap_chars, room)
+        if limit <= 0:
+            return ""
+        sentences = SENTENCE_BOUNDARY.split(chunk)
+        tail = ""
+        for sentence in reversed(sentences[1:]):
+            candidate = f"{sentence} {tail}" if tail else sentence
+            if len(candidate) > limit:
+                break
+            tail = candidate
+        if tail:
+            return tail
+        words = chunk[-limit:].split(" ")
+        return " ".join(words[1:]) if len(words) > 1 else ""
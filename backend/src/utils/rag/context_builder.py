@@ -0,0 +1,195 @@
+import logging
+import math
+import re
+from dataclasses import dataclass
+
+from src.config.settings import settings
+from src.utils.general import estimate_tokens, fold_accents
+
+logger = logging.getLogger(__name__)
+
+FRAGMENT_TITLE = re.compile(r"^(?P<source>.*) \[fragment (?P<number>\d+)\]$")
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.;:!?])\s+|\n+")
+TERM = re.compile(r"\w{3,}")
+# Longest shared boundary looked for when stitching adjacent fragments that overlap.
+MAX_FRAGMENT_OVERLAP = 400
+# Shorter shared boundaries are coincidences (e.g. "artículo 5" + "5 del estatuto"), not chunk overlap.
+MIN_FRAGMENT_OVERLAP = 20
+
+
+@dataclass(frozen=True, slots=True)
+class PackedContext:
+    """
+    Context sent to the model and its token accounting (estimated tokens).
+    """
+    text: str
+    tokens: int
+    original_tokens: int
+    blocks: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.original_tokens - self.tokens
+
+
+@dataclass(slots=True)
+class _Block:
+    source: str
+    numbers: list[int]
+    content: str
+    rank: int
+
+
+class ContextBuilder:
+    """
+    Packs the retrieved chunks into a prompt context within a token budget.
+
+    1. Adjacent fragments of the same source document (`title [fragment n]`) are merged
+       into one block, removing the text they share at the boundary.
+    2. Blocks whose terms overlap an already kept block by `dedup_threshold` (Jaccard)
+       are dropped.
+    3. If the blocks still exceed `max_tokens`, only the sentences sharing the most terms
+       with the question are kept, in their original order.
+
+    Blocks keep the rank of their best chunk, so the most relevant source comes first.
+    A `max_tokens` of 0 disables trimming.
+    """
+
+    def __init__(self, max_tokens: int, dedup_threshold: float):
+        self.max_tokens = max_tokens
+        self.dedup_threshold = dedup_threshold
+        self.requests = 0
+        self.original_tokens = 0
+        self.packed_tokens = 0
+
+    def build(self, question: str, top_docs: list) -> PackedContext:
+        """
+        :param question: Question the context must answer, used for extractive trimming.
+        :param top_docs: `(score, document)` tuples, best first.
+        """
+        original_tokens = sum(estimate_tokens(doc.content) for _, doc in top_docs)
+        blocks = self._deduplicate(self._merge(top_docs))
+        contents = [block.content for block in blocks]
+        if self.max_tokens > 0 and sum(estimate_tokens(content) for content in contents) > self.max_tokens:
+            contents = self._trim(question, contents)
+        text = "\n".join(contents)
+        packed = PackedContext(
+            text=text,
+            tokens=estimate_tokens(text),
+            original_tokens=original_tokens,
+            blocks=len(contents)
+        )
+        self.requests += 1
+        self.original_tokens += packed.original_tokens
+        self.packed_tokens += packed.tokens
+        logger.info(
+            "Context packed from %s to %s tokens (%s saved)",
+            packed.original_tokens, packed.tokens, packed.tokens_saved
+        )
+        return packed
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "max_tokens": self.max_tokens,
+            "original_tokens": self.original_tokens,
+            "packed_tokens": self.packed_tokens,
+            "tokens_saved": self.original_tokens - self.packed_tokens,
+            "average_tokens_saved": (self.original_tokens - self.packed_tokens) / self.requests if self.requests else 0.0
+        }
+
+    @staticmethod
+    def terms(text: str) -> set[str]:
+        """
+        Accent-folded, lower-cased words of at least three characters.
+        """
+        return set(TERM.findall(fold_accents(text).lower()))
+
+    def _merge(self, top_docs: list) -> list[_Block]:
+        blocks: list[_Block] = []
+        by_source: dict[str, list[_Block]] = {}
+        for rank, (_, doc) in enumerate(top_docs):
+            match = FRAGMENT_TITLE.match(doc.title or "")
+            if match is None:
+                blocks.append(_Block(source=doc.title, numbers=[], content=doc.content, rank=rank))
+                continue
+            source, number = match["source"], int(match["number"])
+            block = next(
+                (block for block in by_source.get(source, []) if number in block.numbers),
+                None
+            )
+            if block is not None:
+                continue
+            block = _Block(source=source, numbers=[number], content=doc.content, rank=rank)
+            by_source.setdefault(source, []).append(block)
+            blocks.append(block)
+
+        # Stitch blocks of the same source whose fragment numbers are consecutive.
+        for source_blocks in by_source.values():
+            source_blocks.sort(key=lambda block: block.numbers[0])
+            current = source_blocks[0]
+            for block in source_blocks[1:]:
+                if block.numbers[0] == current.numbers[-1] + 1:
+                    current.content = self._stitch(current.content, block.content)
+                    current.numbers.extend(block.numbers)
+                    current.rank = min(current.rank, block.rank)
+                    blocks.remove(block)
+                else:
+                    current = block
+        return sorted(blocks, key=lambda block: block.rank)
+
+    @staticmethod
+    def _stitch(first: str, second: str) -> str:
+        """
+        Joins consecutive fragments, dropping the whole words the chunker repeated at the
+        start of `second`.
+        """
+        for size in range(min(len(first), len(second), MAX_FRAGMENT_OVERLAP), MIN_FRAGMENT_OVERLAP - 1, -1):
+            starts_word = size == len(first) or first[-size - 1].isspace()
+            ends_word = size == len(second) or second[size].isspace()
+            if starts_word and ends_word and first.endswith(second[:size]):
+                return first + second[size:]
+        return f"{first} {second}"
+
+    def _deduplicate(self, blocks: list[_Block]) -> list[_Block]:
+        kept: list[tuple[_Block, set[str]]] = []
+        for block in blocks:
+            terms = self.terms(block.content)
+            duplicate = any(
+                block.content == other.content
+                or (terms and len(terms & other_terms) / len(terms | other_terms) >= self.dedup_threshold)
+                for other, other_terms in kept
+            )
+            if not duplicate:
+                kept.append((block, terms))
+        return [block for block, _ in kept]
+
+    def _trim(self, question: str, contents: list[str]) -> list[str]:
+        question_terms = self.terms(question)
+        sentences = []
+        for block_index, content in enumerate(contents):
+            for position, sentence in enumerate(SENTENCE_BOUNDARY.split(content)):
+                if sentence.strip():
+                    overlap = len(self.terms(sentence) & question_terms)
+                    # Short sentences with the same overlap are denser, so they go first.
+                    score = overlap / math.sqrt(max(len(sentence), 1))
+                    sentences.append((score, block_index, position, sentence.strip()))
+
+        selected = []
+        budget = self.max_tokens
+        for sentence in sorted(sentences, key=lambda item: (-item[0], item[1], item[2])):
+            tokens = estimate_tokens(sentence[3]) + 1
+            if tokens <= budget:
+                selected.append(sentence)
+                budget -= tokens
+
+        trimmed = {}
+        for _, block_index, _, sentence in sorted(selected, key=lambda item: (item[1], item[2])):
+            trimmed.setdefault(block_index, []).append(sentence)
+        return [" ".join(block_sentences) for block_sentences in trimmed.values()]
+
+
+context_builder = ContextBuilder(
+    max_tokens=settings.CONTEXT_MAX_TOKENS,
+    dedup_threshold=settings.CONTEXT_DEDUP_THRESHOLD
+)
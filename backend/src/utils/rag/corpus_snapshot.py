@@ -0,0 +1,397 @@
+import asyncio
+import datetime
+import fcntl
+import json
+import logging
+import os
+import shutil
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Sequence
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config.settings import settings
+from src.document.services import DocumentManager
+from src.utils.rag.ann_index import ANN_FILE, IVFIndex
+from src.utils.rag.embedding_store import EmbeddingStore
+from src.utils.rag.lexical_index import LexicalIndex
+from src.utils.rag.quantization import QuantizedMatrix
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+DEFAULT_SNAPSHOT_DIR = os.path.join(os.path.dirname(__file__), "data", "snapshots")
+
+
+@dataclass(frozen=True)
+class SnapshotManifest:
+    """
+    Metadata of a published snapshot; `source_checksum` is the checksum of the embedding
+    store it was built from, so a stale snapshot is recognized after ingestion.
+    `indexes` names the retrieval indexes published with it ("ivf", "int8", "bm25") and
+    their parameters.
+    """
+    format_version: int
+    version: str
+    count: int
+    dimension: int
+    model: str | None
+    source_checksum: str
+    last_created_at: str | None
+    published_at: str
+    indexes: dict = field(default_factory=dict)
+
+
+class CorpusSnapshot:
+    """
+    Read-only, memory-mapped corpus published by a loader process.
+
+    Layout of a version directory:
+    - `vectors.npy`: float32 matrix (count x dimension) of unit-length embeddings.
+    - `ids.npy`: uint8 matrix (count x 16) with the document UUID bytes, aligned with the vectors.
+    - `sorted_ids.npy` / `id_order.npy`: the ids sorted as 16-byte strings and their rows,
+      to look a document up with a binary search.
+    - `positions.npy`: row of every document in the embedding store it was built from.
+    - `text.bin` / `offsets.npy`: UTF-8 titles and contents back to back; the title of row
+      `i` is `text[offsets[2i]:offsets[2i+1]]` and its content ends at `offsets[2i+2]`.
+    - `ivf_*.npy`, `int8_*.npy`, `bm25_*.npy`: arrays of the `IVFIndex`, `QuantizedMatrix`
+      and `LexicalIndex` enabled when the snapshot was published.
+    - `manifest.json`: `SnapshotManifest`, written last.
+
+    Every worker maps the same files, so the pages are shared through the page cache
+    instead of being copied into each process or rebuilt by it.
+    """
+
+    VECTORS_FILE = "vectors.npy"
+    IDS_FILE = "ids.npy"
+    SORTED_IDS_FILE = "sorted_ids.npy"
+    ID_ORDER_FILE = "id_order.npy"
+    POSITIONS_FILE = "positions.npy"
+    TEXT_FILE = "text.bin"
+    OFFSETS_FILE = "offsets.npy"
+    MANIFEST_FILE = "manifest.json"
+    IVF_ARRAYS = ("centroids", "assignments", "order", "offsets")
+    INT8_ARRAYS = ("codes", "scales")
+    BM25_ARRAYS = ("terms", "offsets", "doc_ids", "frequencies", "doc_lengths", "idf", "norms")
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, self.MANIFEST_FILE), encoding="utf-8") as f:
+            self.manifest = SnapshotManifest(**json.load(f))
+        if self.manifest.format_version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format {self.manifest.format_version}")
+        self.vectors = self._load(self.VECTORS_FILE)
+        self.ids = self._load(self.IDS_FILE)
+        self.sorted_ids = self._load(self.SORTED_IDS_FILE)
+        self.id_order = self._load(self.ID_ORDER_FILE)
+        self.positions = self._load(self.POSITIONS_FILE)
+        self.offsets = self._load(self.OFFSETS_FILE)
+        text_path = os.path.join(path, self.TEXT_FILE)
+        # np.memmap cannot map an empty file.
+        self.text = np.memmap(text_path, dtype=np.uint8, mode="r") if os.path.getsize(text_path) else np.empty(0, np.uint8)
+        if self.vectors.shape[0] != self.manifest.count or self.ids.shape[0] != self.manifest.count:
+            raise ValueError("Snapshot files do not match the manifest count")
+
+    @property
+    def version(self) -> str:
+        return self.manifest.version
+
+    def __len__(self) -> int:
+        return self.manifest.count
+
+    def document_id(self, row: int) -> UUID:
+        return UUID(bytes=self.ids[row].tobytes())
+
+    def title(self, row: int) -> str:
+        return self._text(2 * row)
+
+    def content(self, row: int) -> str:
+        return self._text(2 * row + 1)
+
+    def row(self, document_id: UUID) -> int | None:
+        """
+        Row of a document, or None when it is not in the snapshot.
+        """
+        if not len(self):
+            return None
+        key = np.frombuffer(document_id.bytes, dtype="S16")[0]
+        i = int(np.searchsorted(self.sorted_ids, key))
+        if i == len(self) or self.sorted_ids[i] != key:
+            return None
+        return int(self.id_order[i])
+
+    def ann(self, nprobe: int) -> IVFIndex | None:
+        """
+        The published IVF index over the mapped arrays, or None when none was published.
+        """
+        if "ivf" not in self.manifest.indexes:
+            return None
+        arrays = self._load_arrays("ivf", self.IVF_ARRAYS)
+        return IVFIndex(nprobe=nprobe, **arrays)
+
+    def quantized(self) -> QuantizedMatrix | None:
+        """
+        The published int8 matrix (mapped), or None when none was published.
+        """
+        if "int8" not in self.manifest.indexes:
+            return None
+        return QuantizedMatrix(**self._load_arrays("int8", self.INT8_ARRAYS))
+
+    def lexical(self) -> LexicalIndex | None:
+        """
+        The published BM25 index: its postings are mapped, only the term lookup is built.
+        """
+        if "bm25" not in self.manifest.indexes:
+            return None
+        arrays = self._load_arrays("bm25", self.BM25_ARRAYS)
+        terms = arrays.pop("terms")
+        return LexicalIndex(
+            vocabulary={term: i for i, term in enumerate(terms.tolist())},
+            **arrays,
+            **self.manifest.indexes["bm25"]
+        )
+
+    def _text(self, field: int) -> str:
+        return self.text[int(self.offsets[field]):int(self.offsets[field + 1])].tobytes().decode("utf-8")
+
+    def _load(self, name: str) -> np.ndarray:
+        return np.load(os.path.join(self.path, name), mmap_mode="r")
+
+    def _load_arrays(self, prefix: str, names: tuple[str, ...]) -> dict[str, np.ndarray]:
+        return {name: self._load(f"{prefix}_{name}.npy") for name in names}
+
+
+class SnapshotDirectory:
+    """
+    Versioned snapshots of the corpus shared by the API workers.
+
+    A publisher writes a complete version directory under a temporary name, renames it,
+    then atomically replaces the `CURRENT` pointer; readers only ever see finished
+    versions. Workers keep using the version they attached to until they notice the
+    pointer moved. Old versions are pruned, which is safe for workers still mapping them
+    (their mappings keep the deleted files alive).
+    """
+
+    CURRENT_FILE = "CURRENT"
+    LOCK_FILE = ".lock"
+
+    def __init__(self, path: str | None = None):
+        self.path = path or settings.CORPUS_SNAPSHOT_DIR or DEFAULT_SNAPSHOT_DIR
+
+    def current_version(self) -> str | None:
+        try:
+            with open(os.path.join(self.path, self.CURRENT_FILE), encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def current(self) -> CorpusSnapshot | None:
+        """
+        Attaches to the current version, or returns None when nothing was published.
+        """
+        version = self.current_version()
+        if version is None:
+            return None
+        try:
+            return CorpusSnapshot(os.path.join(self.path, version))
+        except Exception as e:
+            raise ValueError({
+                "error": "Error opening corpus snapshot",
+                "details": f"{version}: {e}",
+                "method": "SnapshotDirectory.current"
+            })
+
+    def signature(self) -> tuple | None:
+        """
+        Identity of the `CURRENT` pointer; it is replaced (new inode) on every publish.
+        """
+        try:
+            stat = os.stat(os.path.join(self.path, self.CURRENT_FILE))
+            return stat.st_ino, stat.st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    @asynccontextmanager
+    async def lock(self):
+        """
+        Exclusive lock across the processes sharing the directory, so concurrent workers
+        starting on a stale snapshot publish it only once.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, self.LOCK_FILE), "a") as f:
+            await asyncio.to_thread(fcntl.flock, f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    async def publish_from_store(self, db: AsyncSession, store: EmbeddingStore | None = None) -> CorpusSnapshot | None:
+        """
+        Joins the embedding store with the document metadata and publishes the result.
+        Returns None (publishing nothing) when the store is missing, built with another
+        model, or does not cover every document.
+        """
+        store = store or EmbeddingStore()
+        try:
+            if not store.exists():
+                return None
+            header = store.read_header()
+            if header.model != settings.OPENAI_EMBEDDING_MODEL:
+                logger.warning("Embedding store built with %s, not publishing a snapshot", header.model)
+                return None
+            ids, vectors = await asyncio.to_thread(store.open, verify=settings.EMBEDDING_STORE_VERIFY)
+            rows = {row.id: row for row in await DocumentManager(db).get_corpus_metadata()}
+            positions = [i for i, doc_id in enumerate(ids) if doc_id in rows]
+            if len(positions) != len(rows):
+                logger.warning("Embedding store covers %s of %s documents, not publishing a snapshot", len(positions), len(rows))
+                return None
+            # Copying the vectors and building the indexes is bulk I/O and CPU work.
+            return await asyncio.to_thread(
+                self.publish,
+                rows=[rows[ids[i]] for i in positions],
+                vectors=vectors,
+                positions=np.asarray(positions, dtype=np.int64),
+                source=store
+            )
+        except Exception as e:
+            raise ValueError({
+                "error": "Error publishing corpus snapshot",
+                "details": str(e),
+                "method": "SnapshotDirectory.publish_from_store"
+            })
+
+    def publish(self, rows: Sequence, vectors: np.ndarray, positions: np.ndarray, source: EmbeddingStore) -> CorpusSnapshot:
+        """
+        Writes a new version, with the retrieval indexes enabled in the settings, and makes
+        it current.
+        :param rows: Document metadata (id, title, content, created_at) in output order.
+        :param vectors: Normalized store matrix; row `positions[i]` belongs to `rows[i]`.
+        :param source: Store the vectors come from (its checksum identifies the snapshot).
+        """
+        header = source.read_header()
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        version = f"{now:%Y%m%dT%H%M%S%f}-{header.checksum[:8]}"
+        tmp = os.path.join(self.path, f".{version}.tmp")
+        target = os.path.join(self.path, version)
+        os.makedirs(tmp)
+        try:
+            self._write_vectors(tmp, vectors, positions, source)
+            id_bytes = np.frombuffer(b"".join(row.id.bytes for row in rows), dtype=np.uint8).reshape(len(rows), 16)
+            keys = id_bytes.view("S16").ravel()
+            order = np.argsort(keys, kind="stable")
+            np.save(os.path.join(tmp, CorpusSnapshot.IDS_FILE), id_bytes)
+            np.save(os.path.join(tmp, CorpusSnapshot.SORTED_IDS_FILE), keys[order])
+            np.save(os.path.join(tmp, CorpusSnapshot.ID_ORDER_FILE), order.astype(np.int64))
+            np.save(os.path.join(tmp, CorpusSnapshot.POSITIONS_FILE), positions)
+            offsets = np.zeros(2 * len(rows) + 1, dtype=np.int64)
+            with open(os.path.join(tmp, CorpusSnapshot.TEXT_FILE), "wb") as f:
+                end = 0
+                for i, row in enumerate(rows):
+                    for j, text in enumerate((row.title, row.content)):
+                        encoded = (text or "").encode("utf-8")
+                        f.write(encoded)
+                        end += len(encoded)
+                        offsets[2 * i + j + 1] = end
+            np.save(os.path.join(tmp, CorpusSnapshot.OFFSETS_FILE), offsets)
+            indexes = self._write_indexes(tmp, rows, positions, source)
+            last_created_at = max((row.created_at for row in rows), default=None)
+            manifest = SnapshotManifest(
+                format_version=FORMAT_VERSION,
+                version=version,
+                count=len(rows),
+                dimension=header.dimension,
+                model=header.model,
+                source_checksum=header.checksum,
+                last_created_at=last_created_at.isoformat() if last_created_at else None,
+                published_at=now.isoformat(),
+                indexes=indexes
+            )
+            with open(os.path.join(tmp, CorpusSnapshot.MANIFEST_FILE), "w", encoding="utf-8") as f:
+                json.dump(manifest.__dict__, f, indent=2)
+            os.rename(tmp, target)
+        except Exception:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        pointer = os.path.join(self.path, f"{self.CURRENT_FILE}.tmp")
+        with open(pointer, "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(pointer, os.path.join(self.path, self.CURRENT_FILE))
+        logger.info("Corpus snapshot %s published: %s documents", version, len(rows))
+        self.prune()
+        return CorpusSnapshot(target)
+
+    def prune(self, keep: int | None = None):
+        """
+        Deletes all but the `keep` most recent versions (the current one is always kept).
+        """
+        keep = max(1, keep or settings.CORPUS_SNAPSHOT_KEEP)
+        current = self.current_version()
+        versions = sorted(
+            (name for name in os.listdir(self.path)
+             if not name.startswith(".") and os.path.isdir(os.path.join(self.path, name))),
+            reverse=True
+        )
+        for name in versions[keep:]:
+            if name != current:
+                shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+
+    @staticmethod
+    def _write_indexes(path: str, rows: Sequence, positions: np.ndarray, source: EmbeddingStore) -> dict:
+        """
+        Builds the IVF, int8 and BM25 indexes enabled in the settings over the snapshot
+        rows and saves their arrays in the version directory, once for every worker.
+        :return: The `SnapshotManifest.indexes` entry.
+        """
+        indexes = {}
+        if not len(rows):
+            return indexes
+        vectors = np.load(os.path.join(path, CorpusSnapshot.VECTORS_FILE), mmap_mode="r")
+
+        def save(prefix: str, arrays: dict[str, np.ndarray]):
+            for name, array in arrays.items():
+                np.save(os.path.join(path, f"{prefix}_{name}.npy"), array)
+
+        if settings.RAG_RETRIEVAL_MODE == "ivf" and len(rows) >= settings.RAG_IVF_MIN_DOCUMENTS:
+            ann = None
+            ann_path = os.path.join(source.path, ANN_FILE)
+            if os.path.exists(ann_path):
+                # Saved next to the store by a worker that loaded it without a snapshot.
+                ann = IVFIndex.load(ann_path, source_checksum=source.read_header().checksum)
+            if ann is None:
+                ann = IVFIndex.build(vectors, n_lists=settings.RAG_IVF_NLIST)
+            elif len(ann) != len(rows):
+                ann = ann.select(positions)
+            save("ivf", {name: getattr(ann, name) for name in CorpusSnapshot.IVF_ARRAYS})
+            indexes["ivf"] = {"n_lists": ann.n_lists}
+        if settings.RAG_QUANTIZATION != "none":
+            quantized = QuantizedMatrix.from_matrix(vectors, settings.RAG_QUANTIZATION)
+            save("int8", {name: getattr(quantized, name) for name in CorpusSnapshot.INT8_ARRAYS})
+            indexes["int8"] = {}
+        if settings.RAG_LEXICAL_MODE != "off":
+            lexical = LexicalIndex.build(row.content or "" for row in rows)
+            # Term ids follow the vocabulary insertion order.
+            terms = np.array(list(lexical.vocabulary), dtype=str)
+            save("bm25", {"terms": terms, **{name: getattr(lexical, name) for name in CorpusSnapshot.BM25_ARRAYS[1:]}})
+            indexes["bm25"] = {"k1": lexical.k1, "b": lexical.b}
+        return indexes
+
+    @staticmethod
+    def _write_vectors(path: str, vectors: np.ndarray, positions: np.ndarray, source: EmbeddingStore):
+        target = os.path.join(path, CorpusSnapshot.VECTORS_FILE)
+        if positions.shape[0] == vectors.shape[0]:
+            # Every store row is live: hard-link the store file. The store never rewrites a
+            # file in place (it replaces it), so the linked inode stays immutable.
+            try:
+                os.link(os.path.join(source.path, source.VECTORS_FILE), target)
+                return
+            except OSError:
+                pass
+        output = np.lib.format.open_memmap(target, mode="w+", dtype=np.float32, shape=(positions.shape[0], vectors.shape[1]))
+        # Copy in row blocks so the store matrix is never fully materialized.
+        for start in range(0, positions.shape[0], 65536):
+            output[start:start + 65536] = vectors[positions[start:start + 65536]]
+        output.flush()
+        del output
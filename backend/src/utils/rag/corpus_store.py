@@ -0,0 +1,511 @@
+import asyncio
+import datetime
+import logging
+import os
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Iterable
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config.settings import settings
+from src.document.services import DocumentManager
+from src.utils.general import normalize_v
+from src.utils.rag.ann_index import ANN_FILE, IVFIndex
+from src.utils.rag.corpus_snapshot import CorpusSnapshot, SnapshotDirectory
+from src.utils.rag.embedding_store import EmbeddingStore
+from src.utils.rag.lexical_index import LexicalIndex, reciprocal_rank_fusion
+from src.utils.rag.quantization import QuantizedMatrix
+from src.utils.rag.vector_index import VectorIndex
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class CorpusDocument:
+    """
+    Lightweight, read-only view of a `Document` kept in memory for retrieval.
+    """
+    id: UUID
+    title: str
+    content: str
+
+
+class SnapshotDocuments(Sequence):
+    """
+    `CorpusDocument` rows of a snapshot, decoded from the shared mapping when accessed
+    instead of being held by every worker.
+    """
+
+    def __init__(self, snapshot: CorpusSnapshot):
+        self.snapshot = snapshot
+
+    def __len__(self) -> int:
+        return len(self.snapshot)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(len(self))[index]]
+        row = int(index)
+        return CorpusDocument(
+            id=self.snapshot.document_id(row),
+            title=self.snapshot.title(row),
+            content=self.snapshot.content(row)
+        )
+
+
+@dataclass(slots=True)
+class LoadedCorpus:
+    """
+    Everything a load builds, swapped into the `CorpusStore` at once.
+    """
+    index: VectorIndex
+    documents: dict[UUID, CorpusDocument]
+    snapshot: CorpusSnapshot | None
+    store_positions: np.ndarray
+    last_created_at: datetime.datetime | None
+    changed_at: datetime.datetime | None
+    ann: IVFIndex | None = None
+    quantized: QuantizedMatrix | None = None
+    lexical: LexicalIndex | None = None
+
+
+class CorpusStore:
+    """
+    Process-wide, in-memory copy of the document corpus.
+
+    The corpus is loaded at application startup and fully reloaded when the embedding
+    store changes (or, without a store, when documents are added to the table), so
+    answering a question never reads the `document` table. Reloads build the indexes in a
+    worker thread and swap them in at once; requests keep using the previous corpus
+    meanwhile. `version` is bumped on every change so caches can tell when the corpus moved.
+
+    With `CORPUS_SNAPSHOT_ENABLED`, the vectors, ids, texts and published indexes are
+    attached read-only from the current `SnapshotDirectory` version shared by every
+    worker, and the store hands off to a new version as soon as one is published.
+    """
+
+    def __init__(self):
+        self.index = VectorIndex.empty()
+        self.ann: IVFIndex | None = None
+        self.lexical: LexicalIndex | None = None
+        self.quantized: QuantizedMatrix | None = None
+        self.version = 0
+        self.loaded = False
+        self.changed_at: datetime.datetime | None = None
+        self._documents: dict[UUID, CorpusDocument] = {}
+        self._snapshot: CorpusSnapshot | None = None
+        self._store_positions = np.empty(0, dtype=np.int64)
+        self._store_signature: tuple | None = None
+        self._last_created_at: datetime.datetime | None = None
+        self._rows_signature: tuple | None = None
+        self._polled_rows_signature: tuple | None = None
+        self._next_rows_poll = 0.0
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    async def load(self, db: AsyncSession):
+        """
+        Loads the whole corpus from the database, replacing the current one.
+        """
+        async with self._lock:
+            await self._load(db)
+
+    async def ensure_loaded(self, db: AsyncSession):
+        """
+        Loads the corpus if it has not been loaded yet by this process, or reloads it when
+        ingestion rewrote the embedding store or a new snapshot was published (one `stat`
+        call per file when nothing changed). A corpus loaded from the database rows is
+        reloaded when the table changed, checked every `CORPUS_DB_POLL_SECONDS`.
+        """
+        if self.loaded and not self._store_changed() and not await self._rows_changed(db):
+            return
+        async with self._lock:
+            if not self.loaded or self._store_changed() or await self._rows_changed(db):
+                await self._load(db)
+
+    def track_store(self) -> int:
+        """
+        Bumps `version` when ingestion rewrote the embedding store, without loading the
+        corpus; used with the pgvector backend, where retrieval never reads this store.
+        :return: The current version.
+        """
+        store = EmbeddingStore()
+        signature = self._signature(store)
+        if signature != self._store_signature:
+            self._store_signature = signature
+            self._bump_version(self._store_mtime(store))
+        return self.version
+
+    def get(self, document_id: UUID) -> CorpusDocument | None:
+        document = self._documents.get(document_id)
+        if document is None and self._snapshot is not None:
+            row = self._snapshot.row(document_id)
+            if row is not None:
+                return self.index.documents[row]
+        return document
+
+    def search(self, question_embedding: np.ndarray, k: int = 5, question: str | None = None) -> list[tuple[float, CorpusDocument]]:
+        """
+        Returns the top-k `(score, CorpusDocument)` tuples for the question embedding,
+        scanning only the closest IVF lists when the ANN index is enabled, or rescoring the
+        best quantized matches when quantization is enabled. When lexical retrieval is
+        enabled and the question text is given, BM25 either pre-filters the vector scan or
+        is fused with it (RRF). Scores are always full-precision cosine similarities.
+        """
+        index, lexical = self.index, self.lexical
+        if question and lexical is not None and len(lexical) == len(index):
+            return self._lexical_search(index, lexical, question_embedding, question, k)
+        rows = self._vector_candidates(index, question_embedding, k)
+        if rows is not None:
+            return index.search_rows(question_embedding, rows, k)
+        return index.search(question_embedding, k)
+
+    def search_many(
+        self,
+        question_embeddings: np.ndarray,
+        k: int = 5,
+        questions: list[str] | None = None
+    ) -> list[list[tuple[float, CorpusDocument]]]:
+        """
+        Batched `search`, one top-k list per question row. Exact retrieval scores the whole
+        batch with a single matrix-matrix product (also for the quantized first pass); with
+        IVF or lexical retrieval each question keeps its own candidates.
+        """
+        index, quantized = self.index, self.quantized
+        if (questions and self.lexical is not None) or self.ann is not None:
+            return [
+                self.search(query, k, question)
+                for query, question in zip(question_embeddings, questions or [None] * len(question_embeddings))
+            ]
+        if quantized is not None and len(quantized) == len(index):
+            n = k * settings.RAG_RESCORE_FACTOR
+            return [
+                index.search_rows(query, np.sort(VectorIndex.top_positions(scores, n)), k)
+                for query, scores in zip(question_embeddings, np.atleast_2d(quantized.scores(question_embeddings)))
+            ]
+        return index.search_many(question_embeddings, k)
+
+    def _vector_candidates(self, index: VectorIndex, question_embedding: np.ndarray, k: int) -> np.ndarray | None:
+        """
+        Rows worth scoring at full precision, or None to scan the whole index.
+        """
+        ann, quantized = self.ann, self.quantized
+        if ann is not None:
+            return ann.candidates(question_embedding)
+        if quantized is not None and len(quantized) == len(index):
+            return quantized.candidates(question_embedding, k * settings.RAG_RESCORE_FACTOR)
+        return None
+
+    def _lexical_search(
+        self,
+        index: VectorIndex,
+        lexical: LexicalIndex,
+        question_embedding: np.ndarray,
+        question: str,
+        k: int
+    ) -> list[tuple[float, CorpusDocument]]:
+        lexical_rows, _ = lexical.search(question, settings.RAG_LEXICAL_CANDIDATES)
+        if settings.RAG_LEXICAL_MODE == "prefilter" and lexical_rows.shape[0] >= k:
+            # Only documents sharing terms with the question are scored.
+            rows, scores = index.rank(question_embedding, k, rows=np.sort(lexical_rows))
+            return [(float(score), index.documents[row]) for row, score in zip(rows, scores)]
+
+        depth = max(k, settings.RAG_LEXICAL_CANDIDATES)
+        candidates = self._vector_candidates(index, question_embedding, depth)
+        vector_rows, _ = index.rank(question_embedding, depth, rows=candidates)
+        fused = reciprocal_rank_fusion([vector_rows, lexical_rows], settings.RAG_RRF_K)[:k]
+        scores = index.matrix[fused] @ normalize_v(np.asarray(question_embedding, dtype=np.float32))
+        return [(float(score), index.documents[row]) for row, score in zip(fused, scores)]
+
+    async def _load(self, db: AsyncSession):
+        try:
+            store = EmbeddingStore()
+            signature = self._signature(store)
+            snapshot = stored = rows = rows_signature = None
+            if settings.CORPUS_SNAPSHOT_ENABLED:
+                snapshot, published = await self._fetch_snapshot(db, store)
+                if published:
+                    # Publishing replaced the pointer: record it so this load is not redone.
+                    signature = self._signature(store)
+            if snapshot is None:
+                stored = await self._fetch_store(db, store)
+            if snapshot is None and stored is None:
+                manager = DocumentManager(db)
+                # Taken before the rows: a document added in between triggers one more reload.
+                rows_signature = await manager.get_corpus_signature()
+                rows = await manager.get_corpus_rows()
+            # Building the indexes (IVF k-means, quantization, BM25) is CPU-bound: it runs in
+            # a worker thread and the result is swapped in without awaiting, so concurrent
+            # requests keep using the previous corpus until the new one is complete.
+            corpus = await asyncio.to_thread(self._build, store, snapshot, stored, rows)
+            self.index = corpus.index
+            self.ann = corpus.ann
+            self.quantized = corpus.quantized
+            self.lexical = corpus.lexical
+            self._documents = corpus.documents
+            self._snapshot = corpus.snapshot
+            self._store_positions = corpus.store_positions
+            self._last_created_at = corpus.last_created_at
+            self._store_signature = signature
+            self._rows_signature = self._polled_rows_signature = rows_signature
+            self._next_rows_poll = time.monotonic() + settings.CORPUS_DB_POLL_SECONDS
+            self.loaded = True
+            self._bump_version(corpus.changed_at)
+            logger.info("Corpus loaded: %s documents (version %s)", len(self), self.version)
+        except Exception as e:
+            raise ValueError({
+                "error": "Error loading corpus",
+                "details": str(e),
+                "method": "CorpusStore.load"
+            })
+
+    def _build(
+        self,
+        store: EmbeddingStore,
+        snapshot: CorpusSnapshot | None,
+        stored: tuple | None,
+        rows: Iterable | None
+    ) -> LoadedCorpus:
+        """
+        Builds the corpus and its indexes from whichever source `_load` fetched; indexes
+        published with a snapshot are mapped instead of built. Runs in a worker thread, so
+        it never touches the current state.
+        """
+        if snapshot is not None:
+            corpus = self._attach_snapshot(snapshot)
+        elif stored is not None:
+            corpus = self._attach_store(*stored, changed_at=self._store_mtime(store))
+        else:
+            corpus = self._load_rows(rows)
+        if self._ann_enabled(len(corpus.index)):
+            if snapshot is not None:
+                corpus.ann = snapshot.ann(nprobe=settings.RAG_IVF_NPROBE)
+            if corpus.ann is None and rows is None:
+                corpus.ann = self._load_ann(store, corpus.store_positions)
+            elif corpus.ann is None:
+                corpus.ann = IVFIndex.build(corpus.index.matrix, n_lists=settings.RAG_IVF_NLIST, nprobe=settings.RAG_IVF_NPROBE)
+        corpus.quantized = self._load_quantized(corpus.index, snapshot)
+        corpus.lexical = self._load_lexical(corpus.index, snapshot)
+        return corpus
+
+    async def _rows_changed(self, db: AsyncSession) -> bool:
+        """
+        Whether the document table moved since a corpus was loaded from its rows; the
+        table is queried at most every `CORPUS_DB_POLL_SECONDS`.
+        """
+        if self._rows_signature is None:
+            return False
+        now = time.monotonic()
+        if now >= self._next_rows_poll:
+            self._next_rows_poll = now + settings.CORPUS_DB_POLL_SECONDS
+            self._polled_rows_signature = await DocumentManager(db).get_corpus_signature()
+        return self._polled_rows_signature != self._rows_signature
+
+    async def _fetch_snapshot(self, db: AsyncSession, store: EmbeddingStore) -> tuple[CorpusSnapshot | None, bool]:
+        """
+        Opens the current snapshot. When there is none, or it was built from another
+        embedding store, the first worker to get the lock publishes one from the store and
+        the others attach to it.
+        :return: The snapshot (None when none can be published) and whether this call published it.
+        """
+        directory = SnapshotDirectory()
+        snapshot = directory.current()
+        checksum = store.read_header().checksum if store.exists() else None
+        if snapshot is not None and snapshot.manifest.source_checksum == checksum:
+            return snapshot, False
+        async with directory.lock():
+            snapshot = directory.current()
+            if snapshot is not None and snapshot.manifest.source_checksum == checksum:
+                return snapshot, False
+            return await directory.publish_from_store(db, store), True
+
+    @staticmethod
+    def _attach_snapshot(snapshot: CorpusSnapshot) -> LoadedCorpus:
+        documents = SnapshotDocuments(snapshot)
+        last_created_at = snapshot.manifest.last_created_at
+        logger.info("Attaching to corpus snapshot %s", snapshot.version)
+        return LoadedCorpus(
+            index=VectorIndex(snapshot.vectors, documents, normalized=True) if len(documents) else VectorIndex.empty(),
+            documents={},
+            snapshot=snapshot,
+            store_positions=snapshot.positions,
+            last_created_at=datetime.datetime.fromisoformat(last_created_at) if last_created_at else None,
+            changed_at=datetime.datetime.fromisoformat(snapshot.manifest.published_at)
+        )
+
+    async def _fetch_store(self, db: AsyncSession, store: EmbeddingStore) -> tuple | None:
+        """
+        Memory-maps the vectors from the embedding store and reads the document metadata,
+        so no embedding is read from Postgres. Returns None when the store is missing,
+        built with another model, or does not cover every document.
+        :return: The store ids, vectors, metadata rows by id and the store rows of live documents.
+        """
+        if not store.exists():
+            return None
+        header = store.read_header()
+        if header.model != settings.OPENAI_EMBEDDING_MODEL:
+            logger.warning("Embedding store built with %s, ignoring it", header.model)
+            return None
+        ids, vectors = store.open(verify=settings.EMBEDDING_STORE_VERIFY)
+        rows = {row.id: row for row in await DocumentManager(db).get_corpus_metadata()}
+        positions = [i for i, doc_id in enumerate(ids) if doc_id in rows]
+        if len(positions) != len(rows):
+            logger.warning("Embedding store covers %s of %s documents, loading from the database", len(positions), len(rows))
+            return None
+        return ids, vectors, rows, positions
+
+    @staticmethod
+    def _attach_store(
+        ids: list[UUID],
+        vectors: np.ndarray,
+        rows: dict,
+        positions: list[int],
+        changed_at: datetime.datetime | None
+    ) -> LoadedCorpus:
+        if len(positions) != len(ids):
+            # Documents deleted since the store was written: keep only live rows (copies them).
+            vectors = vectors[positions]
+        documents = []
+        last_created_at = None
+        for i in positions:
+            row = rows[ids[i]]
+            documents.append(CorpusDocument(id=row.id, title=row.title, content=row.content))
+            if last_created_at is None or row.created_at > last_created_at:
+                last_created_at = row.created_at
+        return LoadedCorpus(
+            index=VectorIndex(vectors, documents, normalized=True) if documents else VectorIndex.empty(),
+            documents={doc.id: doc for doc in documents},
+            snapshot=None,
+            store_positions=np.asarray(positions, dtype=np.int64),
+            last_created_at=last_created_at,
+            changed_at=changed_at
+        )
+
+    @staticmethod
+    def _load_ann(store: EmbeddingStore, positions: np.ndarray) -> IVFIndex:
+        """
+        Loads the IVF index saved next to the embedding store, or builds and saves it.
+        """
+        path = os.path.join(store.path, ANN_FILE)
+        checksum = store.read_header().checksum
+        ann = None
+        if os.path.exists(path):
+            ann = IVFIndex.load(path, nprobe=settings.RAG_IVF_NPROBE, source_checksum=checksum)
+        if ann is None:
+            full = EmbeddingStore(store.path).open()[1]
+            ann = IVFIndex.build(full, n_lists=settings.RAG_IVF_NLIST, nprobe=settings.RAG_IVF_NPROBE)
+            ann.save(path, source_checksum=checksum)
+            logger.info("IVF index built with %s lists", ann.n_lists)
+        if len(positions) != len(ann):
+            ann = ann.select(positions)
+        return ann
+
+    @staticmethod
+    def _load_quantized(index: VectorIndex, snapshot: CorpusSnapshot | None = None) -> QuantizedMatrix | None:
+        """
+        Builds the int8 copy used for first-pass scoring. It is only worth it when the
+        float32 rows are memory-mapped (embedding store or snapshot): the int8 matrix is then
+        the only resident copy and only the rescored candidates are read from the file.
+        Rows loaded from the database (or copied to drop deleted documents) are resident
+        anyway, so an exact scan of them is both cheaper and exact. The copy published with
+        the snapshot is mapped when there is one.
+        """
+        if settings.RAG_QUANTIZATION == "none" or not len(index):
+            return None
+        if not isinstance(index.matrix, np.memmap):
+            logger.info("Quantization skipped: the float32 rows are not memory-mapped")
+            return None
+        quantized = snapshot.quantized() if snapshot is not None else None
+        if quantized is not None:
+            logger.info("Quantized index attached from snapshot %s", snapshot.version)
+            return quantized
+        quantized = QuantizedMatrix.from_matrix(index.matrix, settings.RAG_QUANTIZATION)
+        logger.info("Quantized index built: %s, %s bytes", quantized.dtype, quantized.nbytes)
+        return quantized
+
+    @staticmethod
+    def _load_lexical(index: VectorIndex, snapshot: CorpusSnapshot | None = None) -> LexicalIndex | None:
+        """
+        Builds the BM25 index over the document contents, aligned with the vector rows, or
+        maps the one published with the snapshot.
+        """
+        if settings.RAG_LEXICAL_MODE == "off":
+            return None
+        lexical = snapshot.lexical() if snapshot is not None else None
+        if lexical is not None:
+            logger.info("Lexical index attached from snapshot %s", snapshot.version)
+            return lexical
+        lexical = LexicalIndex.build(doc.content for doc in index.documents)
+        logger.info("Lexical index built with %s terms", len(lexical.vocabulary))
+        return lexical
+
+    def _bump_version(self, changed_at: datetime.datetime | None = None):
+        """
+        Marks a corpus change; `changed_at` (UTC) is when the current corpus was produced.
+        """
+        self.version += 1
+        self.changed_at = changed_at or datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+    def _store_changed(self) -> bool:
+        return self._signature(EmbeddingStore()) != self._store_signature
+
+    @staticmethod
+    def _store_mtime(store: EmbeddingStore) -> datetime.datetime | None:
+        """
+        When the store was last written (naive UTC, like the stored `created_at` columns),
+        or None without a store.
+        """
+        try:
+            mtime = os.stat(os.path.join(store.path, store.HEADER_FILE)).st_mtime
+        except FileNotFoundError:
+            return None
+        return datetime.datetime.fromtimestamp(mtime, datetime.timezone.utc).replace(tzinfo=None)
+
+    @staticmethod
+    def _signature(store: EmbeddingStore) -> tuple | None:
+        """
+        Identity of the store on disk (the header is replaced last on every write) and,
+        with snapshots, of the current snapshot pointer.
+        """
+        snapshot = SnapshotDirectory().signature() if settings.CORPUS_SNAPSHOT_ENABLED else None
+        try:
+            stat = os.stat(os.path.join(store.path, store.HEADER_FILE))
+            return stat.st_ino, stat.st_mtime_ns, snapshot
+        except FileNotFoundError:
+            return None, snapshot
+
+    @staticmethod
+    def _ann_enabled(count: int) -> bool:
+        return settings.RAG_RETRIEVAL_MODE == "ivf" and count >= settings.RAG_IVF_MIN_DOCUMENTS
+
+    @staticmethod
+    def _load_rows(rows: Iterable) -> LoadedCorpus:
+        """
+        Builds the corpus from database rows (id, title, content, embedding, created_at).
+        """
+        documents = {}
+        embeddings = []
+        last_created_at = None
+        for row in rows:
+            if row.id in documents:
+                continue
+            documents[row.id] = CorpusDocument(id=row.id, title=row.title, content=row.content)
+            embeddings.append(row.embedding)
+            if last_created_at is None or row.created_at > last_created_at:
+                last_created_at = row.created_at
+        return LoadedCorpus(
+            index=VectorIndex(np.asarray(embeddings, dtype=np.float32), list(documents.values())) if documents else VectorIndex.empty(),
+            documents=documents,
+            snapshot=None,
+            store_positions=np.empty(0, dtype=np.int64),
+            last_created_at=last_created_at,
+            changed_at=last_created_at
+        )
+
+corpus_store = CorpusStore()
@@ -0,0 +1,61 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from src.config.settings import settings
+from src.utils.general import content_hash, normalize_question
+
+
+class EmbeddingCache:
+    """
+    Bounded in-process LRU of question embeddings keyed by (normalized text, model).
+    Cached vectors are read-only so callers can share them safely.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], np.ndarray] = OrderedDict()
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def question_key(text: str) -> str:
+        """
+        SHA-256 of the normalized question, also stored in `question.question_key`.
+        """
+        return content_hash(normalize_question(text))
+
+    def get(self, question_key: str, model: str) -> np.ndarray | None:
+        embedding = self._entries.get((question_key, model))
+        if embedding is not None:
+            self._entries.move_to_end((question_key, model))
+        return embedding
+
+    def put(self, question_key: str, model: str, embedding: np.ndarray) -> np.ndarray:
+        if self.max_entries <= 0:
+            return embedding
+        embedding = np.array(embedding, dtype=np.float32)
+        embedding.flags.writeable = False
+        self._entries[(question_key, model)] = embedding
+        self._entries.move_to_end((question_key, model))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return embedding
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.persistent_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.persistent_hits) / lookups if lookups else 0.0
+        }
+
+
+question_embedding_cache = EmbeddingCache(settings.EMBEDDING_CACHE_SIZE)
@@ -0,0 +1,142 @@
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import shutil
+
+import numpy as np
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    AsyncOpenAI,
+    InternalServerError,
+    RateLimitError,
+)
+
+from src.config.settings import settings
+from src.utils.general import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_DIR = os.path.join(os.path.dirname(__file__), "data", "embeddings", "checkpoints")
+RETRYABLE_ERRORS = (APIConnectionError, APITimeoutError, InternalServerError, RateLimitError)
+
+
+class EmbeddingPipeline:
+    """
+    Embeds large lists of texts for corpus ingestion.
+
+    Texts are split into batches bounded by an estimated token budget and an input
+    count. Up to `concurrency` batches are in flight at once, and transient provider
+    errors are retried with exponential backoff. Every finished batch is saved under
+    `checkpoint_dir`, keyed by a hash of the model and the batch texts, so a rerun
+    after a failure only embeds the batches that are missing.
+    """
+
+    def __init__(
+        self,
+        client: AsyncOpenAI,
+        model: str | None = None,
+        max_batch_tokens: int | None = None,
+        max_batch_inputs: int | None = None,
+        concurrency: int | None = None,
+        max_retries: int | None = None,
+        retry_base_seconds: float | None = None,
+        checkpoint_dir: str | None = None
+    ):
+        self.client = client
+        self.model = model or settings.OPENAI_EMBEDDING_MODEL
+        self.max_batch_tokens = max_batch_tokens or settings.EMBEDDING_BATCH_MAX_TOKENS
+        self.max_batch_inputs = max_batch_inputs or settings.EMBEDDING_BATCH_MAX_INPUTS
+        self.concurrency = concurrency or settings.EMBEDDING_CONCURRENCY
+        self.max_retries = settings.EMBEDDING_MAX_RETRIES if max_retries is None else max_retries
+        self.retry_base_seconds = (
+            settings.EMBEDDING_RETRY_BASE_SECONDS if retry_base_seconds is None else retry_base_seconds
+        )
+        self.checkpoint_dir = checkpoint_dir or settings.EMBEDDING_CHECKPOINT_DIR or DEFAULT_CHECKPOINT_DIR
+
+    def make_batches(self, texts: list[str]) -> list[range]:
+        """
+        Splits `texts` into consecutive index ranges within the token and input limits.
+        A single text over the token limit gets a batch of its own.
+        """
+        batches = []
+        start = 0
+        tokens = 0
+        for i, text in enumerate(texts):
+            text_tokens = estimate_tokens(text)
+            full = i - start >= self.max_batch_inputs or tokens + text_tokens > self.max_batch_tokens
+            if i > start and full:
+                batches.append(range(start, i))
+                start, tokens = i, 0
+            tokens += text_tokens
+        if start < len(texts):
+            batches.append(range(start, len(texts)))
+        return batches
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        """
+        Embeds every text and returns a (len(texts) x dimension) float32 matrix in input order.
+        """
+        try:
+            if not texts:
+                return np.empty((0, 0), dtype=np.float32)
+            os.makedirs(self.checkpoint_dir, exist_ok=True)
+            batches = self.make_batches(texts)
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def run(batch: range) -> np.ndarray:
+                async with semaphore:
+                    return await self._embed_batch([texts[i] for i in batch])
+
+            results = await asyncio.gather(*(run(batch) for batch in batches))
+            logger.info("Embedded %s texts in %s batches", len(texts), len(batches))
+            return np.vstack(results)
+        except Exception as e:
+            raise ValueError({
+                "error": "Error embedding texts",
+                "details": str(e),
+                "method": "EmbeddingPipeline.embed"
+            })
+
+    def clear_checkpoints(self):
+        """
+        Removes saved batches once their embeddings are safely persisted.
+        """
+        shutil.rmtree(self.checkpoint_dir, ignore_errors=True)
+
+    async def _embed_batch(self, batch: list[str]) -> np.ndarray:
+        path = os.path.join(self.checkpoint_dir, f"{self._batch_key(batch)}.npy")
+        if os.path.exists(path):
+            return np.load(path)
+
+        attempt = 0
+        while True:
+            try:
+                response = await self.client.embeddings.create(model=self.model, input=batch)
+                break
+            except RETRYABLE_ERRORS as e:
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                delay = self.retry_base_seconds * 2 ** (attempt - 1) * (1 + random.random())
+                logger.warning("Embedding batch failed (%s), retry %s in %.1fs", e, attempt, delay)
+                await asyncio.sleep(delay)
+
+        vectors = np.asarray(
+            [item.embedding for item in sorted(response.data, key=lambda item: item.index)],
+            dtype=np.float32
+        )
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, vectors)
+        os.replace(tmp, path)
+        return vectors
+
+    def _batch_key(self, batch: list[str]) -> str:
+        digest = hashlib.sha256(str(self.model).encode("utf-8"))
+        for text in batch:
+            digest.update(b"\x00")
+            digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from typing import Sequence
+from uuid import UUID
+
+import numpy as np
+
+from src.config.settings import settings
+from src.utils.rag.vector_index import VectorIndex
+
+FORMAT_VERSION = 1
+DEFAULT_STORE_DIR = os.path.join(os.path.dirname(__file__), "data", "embeddings")
+
+
+@dataclass(frozen=True)
+class EmbeddingStoreHeader:
+    """
+    Metadata written next to the vectors; `checksum` is the SHA-256 of the raw matrix bytes.
+    """
+    format_version: int
+    count: int
+    dimension: int
+    dtype: str
+    model: str | None
+    checksum: str
+
+
+class EmbeddingStore:
+    """
+    On-disk embedding matrix that can be memory-mapped without copying.
+
+    Layout of the store directory:
+    - `vectors.npy`: float32 matrix (count x dimension) of unit-length embeddings.
+    - `ids.npy`: uint8 matrix (count x 16) with the document UUID bytes; the row
+      of an id is the row offset of its vector in `vectors.npy`.
+    - `header.json`: `EmbeddingStoreHeader`, written last so a complete header
+      always describes complete data files.
+    """
+
+    VECTORS_FILE = "vectors.npy"
+    IDS_FILE = "ids.npy"
+    HEADER_FILE = "header.json"
+
+    def __init__(self, path: str | None = None):
+        self.path = path or settings.EMBEDDING_STORE_DIR or DEFAULT_STORE_DIR
+
+    def exists(self) -> bool:
+        return all(
+            os.path.exists(os.path.join(self.path, name))
+            for name in (self.VECTORS_FILE, self.IDS_FILE, self.HEADER_FILE)
+        )
+
+    def read_header(self) -> EmbeddingStoreHeader:
+        with open(os.path.join(self.path, self.HEADER_FILE), encoding="utf-8") as f:
+            return EmbeddingStoreHeader(**json.load(f))
+
+    def write(self, ids: Sequence[UUID], matrix: np.ndarray, model: str | None) -> EmbeddingStoreHeader:
+        """
+        Replaces the store contents with `matrix` (normalized here) and the aligned `ids`.
+        Every file is written to a temporary name and atomically moved into place.
+        """
+        try:
+            vectors = VectorIndex.normalize_rows(matrix)
+            if vectors.shape[0] != len(ids):
+                raise ValueError(f"{vectors.shape[0]} vectors for {len(ids)} ids")
+            id_bytes = np.frombuffer(b"".join(i.bytes for i in ids), dtype=np.uint8).reshape(len(ids), 16)
+            header = EmbeddingStoreHeader(
+                format_version=FORMAT_VERSION,
+                count=int(vectors.shape[0]),
+                dimension=int(vectors.shape[1]) if vectors.ndim == 2 else 0,
+                dtype="float32",
+                model=model,
+                checksum=self._checksum(vectors)
+            )
+            os.makedirs(self.path, exist_ok=True)
+            self._replace(self.VECTORS_FILE, lambda f: np.save(f, vectors))
+            self._replace(self.IDS_FILE, lambda f: np.save(f, id_bytes))
+            self._replace(
+                self.HEADER_FILE,
+                lambda f: f.write(json.dumps(header.__dict__, indent=2).encode("utf-8"))
+            )
+            return header
+        except Exception as e:
+            raise ValueError({
+                "error": "Error writing embedding store",
+                "details": str(e),
+                "method": "EmbeddingStore.write"
+            })
+
+    def open(self, verify: bool = False) -> tuple[list[UUID], np.ndarray]:
+        """
+        Memory-maps the store read-only.
+        :param verify: Recompute the checksum (reads the whole matrix).
+        :return: The document ids and the (count x dimension) float32 memmap.
+        """
+        try:
+            header = self.read_header()
+            if header.format_version != FORMAT_VERSION:
+                raise ValueError(f"Unsupported store format {header.format_version}")
+            vectors = np.load(os.path.join(self.path, self.VECTORS_FILE), mmap_mode="r")
+            id_bytes = np.load(os.path.join(self.path, self.IDS_FILE))
+            if vectors.shape[0] != header.count or id_bytes.shape[0] != header.count:
+                raise ValueError("Store files do not match the header count")
+            if header.count and vectors.shape[1] != header.dimension:
+                raise ValueError("Store vectors do not match the header dimension")
+            if verify and self._checksum(vectors) != header.checksum:
+                raise ValueError("Store checksum mismatch")
+            ids = [UUID(bytes=row.tobytes()) for row in id_bytes]
+            return ids, vectors
+        except Exception as e:
+            raise ValueError({
+                "error": "Error opening embedding store",
+                "details": str(e),
+                "method": "EmbeddingStore.open"
+            })
+
+    def _replace(self, name: str, write):
+        target = os.path.join(self.path, name)
+        tmp = f"{target}.tmp"
+        with open(tmp, "wb") as f:
+            write(f)
+        os.replace(tmp, target)
+
+    @staticmethod
+    def _checksum(vectors: np.ndarray) -> str:
+        digest = hashlib.sha256()
+        # Hash in row blocks so memory-mapped matrices are never fully materialized.
+        for start in range(0, vectors.shape[0], 65536):
+            digest.update(np.ascontiguousarray(vectors[start:start + 65536]).tobytes())
+        return digest.hexdigest()
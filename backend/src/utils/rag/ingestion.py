@@ -0,0 +1,215 @@
+import logging
+import os
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+from openai import AsyncOpenAI
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config.database import engine
+from src.config.settings import settings
+from src.document.services import DocumentManager
+from src.utils.general import content_hash
+from src.utils.rag.chunker import LegalChunker
+from src.utils.rag.corpus_snapshot import SnapshotDirectory
+from src.utils.rag.embedding_pipeline import EmbeddingPipeline
+from src.utils.rag.embedding_store import EmbeddingStore
+from src.utils.rag.openai_client import openai_client_manager
+from src.utils.rag.vector_index import VectorIndex
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CSV_PATH = os.path.join(os.path.dirname(__file__), "data", "documents.csv")
+# Serializes ingestion across processes (CLI, containers) sharing the database.
+INGESTION_LOCK_KEY = "rag_ingestion"
+
+
+class IngestionManager:
+    """
+    Builds the corpus: CSV → chunks → embeddings → `document` rows + embedding store.
+    Runs from the `python -m src.ingest` command, never from a request. API processes
+    pick up the new corpus when they see the embedding store change, or the new snapshot
+    published here with `CORPUS_SNAPSHOT_ENABLED`.
+    """
+
+    def __init__(self, db: AsyncSession, client: AsyncOpenAI | None = None):
+        self.db = db
+        self.client = client or openai_client_manager.get()
+
+    async def ingest(self, csv_path: str = DEFAULT_CSV_PATH, store: EmbeddingStore | None = None) -> dict:
+        """
+        Synchronizes the corpus with a CSV file. Only new or changed chunks are embedded and
+        inserted, and chunks that disappeared from the CSV are deleted.
+        :return: Counters of the run (added, deleted, unchanged, embedded, reused).
+        """
+        store = store or EmbeddingStore()
+        try:
+            # The session commits per batch and may change pooled connections in between,
+            # so the session-level lock is held on a connection of its own for the whole run.
+            async with engine.connect() as lock_connection:
+                await lock_connection.execute(select(func.pg_advisory_lock(func.hashtext(INGESTION_LOCK_KEY))))
+                try:
+                    return await self._ingest(csv_path, store)
+                finally:
+                    await lock_connection.execute(select(func.pg_advisory_unlock(func.hashtext(INGESTION_LOCK_KEY))))
+                    await lock_connection.commit()
+        except Exception as e:
+            raise ValueError({
+                "error": "Error loading documents and creating embeddings",
+                "details": str(e),
+                "method": "IngestionManager.ingest"
+            })
+
+    def load_chunks(self, csv_path: str) -> Iterator[dict]:
+        """
+        Streams the CSV (`doc_id`, `title`, `text`) in row batches and lazily yields the
+        hashed chunks of every document, so memory does not grow with the corpus size.
+        """
+        chunker = LegalChunker()
+        for frame in pd.read_csv(csv_path, chunksize=settings.INGESTION_CSV_BATCH_ROWS):
+            for doc in frame.itertuples(index=False):
+                if not isinstance(doc.text, str):
+                    continue
+                for idx, chunk in enumerate(chunker.split(doc.text)):
+                    yield {
+                        "title": f"{doc.title} [fragment {idx + 1}]",
+                        "content": chunk,
+                        "content_hash": content_hash(chunk),
+                        "doc_id_original": doc.doc_id
+                    }
+
+    async def _ingest(self, csv_path: str, store: EmbeddingStore) -> dict:
+        manager = DocumentManager(self.db)
+        existing = await manager.get_chunk_keys()
+        if existing and not store.exists():
+            await self._export_store(store)
+
+        # A chunk is identified by (title, content_hash); the hash alone drives embedding reuse,
+        # so chunks that only moved to another fragment number are never embedded again.
+        current = {}
+        to_delete = []
+        for row in existing:
+            key = (row.title, row.content_hash)
+            if key in current:
+                to_delete.append(row.id)
+            else:
+                current[key] = row.id
+
+        store_ids, store_vectors = store.open() if store.exists() else ([], None)
+        store_rows = {doc_id: i for i, doc_id in enumerate(store_ids)}
+        hash_rows = {
+            row.content_hash: store_rows[row.id]
+            for row in existing
+            if row.id in store_rows
+        }
+        stats = {"added": 0, "deleted": 0, "unchanged": 0, "embedded": 0, "reused": 0}
+        pipeline = EmbeddingPipeline(self.client)
+        embedded = {}
+        new_ids = []
+        new_vectors = []
+
+        async def add(batch: list[dict]):
+            """
+            Embeds the chunks whose content is new and inserts the batch.
+            """
+            missing = list({
+                chunk["content_hash"]: chunk["content"]
+                for chunk in batch
+                if chunk["content_hash"] not in hash_rows and chunk["content_hash"] not in embedded
+            }.items())
+            if missing:
+                vectors = VectorIndex.normalize_rows(await pipeline.embed([text for _, text in missing]))
+                embedded.update({digest: vectors[i] for i, (digest, _) in enumerate(missing)})
+            fresh = {digest for digest, _ in missing}
+            batch_vectors = np.asarray(
+                [
+                    embedded[chunk["content_hash"]] if chunk["content_hash"] in embedded
+                    else store_vectors[hash_rows[chunk["content_hash"]]]
+                    for chunk in batch
+                ],
+                dtype=np.float32
+            )
+            created = await manager.bulk_create_documents_with_embeddings(
+                documents=batch,
+                embeddings=batch_vectors
+            )
+            new_ids.extend(doc.id for doc in created)
+            new_vectors.append(batch_vectors)
+            stats["added"] += len(batch)
+            stats["embedded"] += len(missing)
+            stats["reused"] += sum(1 for chunk in batch if chunk["content_hash"] not in fresh)
+
+        seen = set()
+        batch = []
+        for chunk in self.load_chunks(csv_path):
+            key = (chunk["title"], chunk["content_hash"])
+            if key in seen:
+                continue
+            seen.add(key)
+            if key in current:
+                continue
+            batch.append(chunk)
+            if len(batch) >= settings.INGESTION_EMBED_BATCH_CHUNKS:
+                await add(batch)
+                batch = []
+        if batch:
+            await add(batch)
+
+        to_delete.extend(doc_id for key, doc_id in current.items() if key not in seen)
+        kept_ids = [doc_id for key, doc_id in current.items() if key in seen]
+        stats["deleted"] = len(to_delete)
+        stats["unchanged"] = len(kept_ids)
+        if not stats["added"] and not to_delete:
+            logger.info("Corpus is up to date: %s", stats)
+            return stats
+
+        await manager.delete_documents(to_delete)
+
+        # Rows inserted by an interrupted run are in the table but not in the store yet.
+        unstored = [doc_id for doc_id in kept_ids if doc_id not in store_rows]
+        unstored_vectors = await manager.get_embeddings(unstored) if unstored else {}
+        dimension = new_vectors[0].shape[1] if new_vectors else (store_vectors.shape[1] if store_vectors is not None else 0)
+        if kept_ids:
+            kept_vectors = np.asarray(
+                [
+                    store_vectors[store_rows[doc_id]] if doc_id in store_rows else unstored_vectors[doc_id]
+                    for doc_id in kept_ids
+                ],
+                dtype=np.float32
+            )
+        else:
+            kept_vectors = np.empty((0, dimension), dtype=np.float32)
+        store.write(
+            ids=kept_ids + new_ids,
+            matrix=np.vstack([kept_vectors, *new_vectors]),
+            model=settings.OPENAI_EMBEDDING_MODEL
+        )
+        if settings.CORPUS_SNAPSHOT_ENABLED:
+            await self.publish_snapshot(store)
+        pipeline.clear_checkpoints()
+        logger.info("Ingested %s: %s", csv_path, stats)
+        return stats
+
+    async def publish_snapshot(self, store: EmbeddingStore | None = None) -> str | None:
+        """
+        Publishes the corpus in the embedding store as the snapshot the API workers attach to.
+        :return: The published version, or None when the store cannot be published.
+        """
+        directory = SnapshotDirectory()
+        async with directory.lock():
+            snapshot = await directory.publish_from_store(self.db, store)
+        return snapshot.version if snapshot is not None else None
+
+    async def _export_store(self, store: EmbeddingStore):
+        """
+        Corpus ingested before the binary store existed: export it instead of re-embedding.
+        """
+        existing = await DocumentManager(self.db).get_corpus_rows()
+        store.write(
+            ids=[row.id for row in existing],
+            matrix=np.asarray([row.embedding for row in existing], dtype=np.float32),
+            model=settings.OPENAI_EMBEDDING_MODEL
+        )
+        logger.info("Exported %s existing documents to the embedding store", len(existing))
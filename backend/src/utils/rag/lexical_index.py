@@ -0,0 +1,175 @@
+import re
+from collections import Counter
+from typing import Iterable
+
+import numpy as np
+
+from src.utils.general import fold_accents
+
+# Article numbers ("240", "240-1", "1.2.1.5"), acronyms ("e.t.") and words.
+TOKEN = re.compile(r"\d+(?:[.-]\d+)*(?:-?[a-z])?\b|[a-z](?:\.[a-z])+\.?|[a-z]+")
+
+# Accent-folded Spanish function words, which carry no lexical signal.
+STOPWORDS = frozenset("""
+a al algo algun alguna algunas alguno algunos ante antes aquel aquella aquellas aquellos
+aqui asi aun cada como con contra cual cuales cualquier cuando de del desde donde dos
+durante e el ella ellas ello ellos en entre era eran es esa esas ese eso esos esta estan
+estas este esto estos fue fueron ha han hasta hay la las le les lo los mas me mi mis
+mismo muy ni no nos o otra otras otro otros para pero poco por porque pues que quien
+quienes se sea sean segun ser si sido sin sino sobre son su sus tal tambien tan tanto
+te ti todo todos tu tus u un una unas uno unos usted ya yo cual cuanto cuanta
+""".split())
+
+# Abbreviations and inflections that should match the term used in the statute.
+ALIASES = {
+    "art": ("articulo",),
+    "arts": ("articulo",),
+    "articulos": ("articulo",),
+    "par": ("paragrafo",),
+    "paragrafos": ("paragrafo",),
+    "num": ("numeral",),
+    "numerales": ("numeral",),
+    "lit": ("literal",),
+    "literales": ("literal",),
+    "form": ("formulario",),
+    "formularios": ("formulario",),
+    "et": ("estatuto", "tributario"),
+    "dto": ("decreto",),
+    "decretos": ("decreto",),
+    "dur": ("decreto", "unico", "reglamentario"),
+}
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Accent-folded, lower-cased terms without stopwords; abbreviations are expanded and
+    numbers kept, so "Art. 240 E.T." gives ["articulo", "240", "estatuto", "tributario"].
+    """
+    terms = []
+    for token in TOKEN.findall(fold_accents(text).lower()):
+        if token[0].isalpha() and "." in token:
+            token = token.replace(".", "")
+        for term in ALIASES.get(token, (token,)):
+            if term not in STOPWORDS and (len(term) > 1 or term.isdigit()):
+                terms.append(term)
+    return terms
+
+
+class LexicalIndex:
+    """
+    Compact in-memory BM25 index.
+
+    Postings are stored column-wise: for term `t`, rows `offsets[t]:offsets[t + 1]` of
+    `doc_ids`/`frequencies` list the documents containing it. A query accumulates the
+    BM25 weight of its terms with one `np.bincount` over their postings.
+    """
+
+    def __init__(
+        self,
+        vocabulary: dict[str, int],
+        offsets: np.ndarray,
+        doc_ids: np.ndarray,
+        frequencies: np.ndarray,
+        doc_lengths: np.ndarray,
+        k1: float = 1.2,
+        b: float = 0.75,
+        idf: np.ndarray | None = None,
+        norms: np.ndarray | None = None
+    ):
+        """
+        :param idf: Precomputed term weights and `norms` the per-document length
+            normalization (e.g. mapped from a snapshot); computed from the postings otherwise.
+        """
+        self.vocabulary = vocabulary
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.frequencies = frequencies
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+        n = len(doc_lengths)
+        if idf is None:
+            document_frequency = np.diff(offsets).astype(np.float32)
+            idf = np.log(1.0 + (n - document_frequency + 0.5) / (document_frequency + 0.5)).astype(np.float32)
+        self.idf = idf
+        if norms is None:
+            average_length = float(doc_lengths.mean()) if n else 0.0
+            # Per-document BM25 length normalization, precomputed once.
+            if average_length:
+                norms = (k1 * (1 - b + b * doc_lengths / average_length)).astype(np.float32)
+            else:
+                norms = np.full(n, k1, dtype=np.float32)
+        self.norms = norms
+
+    @classmethod
+    def build(cls, texts: Iterable[str], k1: float = 1.2, b: float = 0.75) -> "LexicalIndex":
+        vocabulary: dict[str, int] = {}
+        term_ids = []
+        doc_ids = []
+        frequencies = []
+        doc_lengths = []
+        for doc_id, text in enumerate(texts):
+            terms = tokenize(text)
+            doc_lengths.append(len(terms))
+            for term, count in Counter(terms).items():
+                term_ids.append(vocabulary.setdefault(term, len(vocabulary)))
+                doc_ids.append(doc_id)
+                frequencies.append(count)
+        term_ids = np.asarray(term_ids, dtype=np.int32)
+        order = np.argsort(term_ids, kind="stable")
+        offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_ids, minlength=len(vocabulary)), out=offsets[1:])
+        return cls(
+            vocabulary=vocabulary,
+            offsets=offsets,
+            doc_ids=np.asarray(doc_ids, dtype=np.int32)[order],
+            frequencies=np.asarray(frequencies, dtype=np.float32)[order],
+            doc_lengths=np.asarray(doc_lengths, dtype=np.float32),
+            k1=k1,
+            b=b
+        )
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def scores(self, query: str) -> np.ndarray:
+        """
+        BM25 score of every document for the query (0 when no term matches).
+        """
+        n = len(self)
+        term_ids = [self.vocabulary[term] for term in set(tokenize(query)) if term in self.vocabulary]
+        if not term_ids or not n:
+            return np.zeros(n, dtype=np.float32)
+        postings = [slice(self.offsets[t], self.offsets[t + 1]) for t in term_ids]
+        docs = np.concatenate([self.doc_ids[p] for p in postings])
+        tf = np.concatenate([self.frequencies[p] for p in postings])
+        idf = np.concatenate([np.full(p.stop - p.start, self.idf[t], dtype=np.float32) for p, t in zip(postings, term_ids)])
+        weights = idf * tf * (self.k1 + 1) / (tf + self.norms[docs])
+        return np.bincount(docs, weights=weights, minlength=n).astype(np.float32)
+
+    def search(self, query: str, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Rows and BM25 scores of the (at most k) best matching documents, best first.
+        Documents sharing no term with the query are never returned.
+        """
+        scores = self.scores(query)
+        matched = np.flatnonzero(scores > 0)
+        if k <= 0 or not matched.shape[0]:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        if matched.shape[0] > k:
+            matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        matched = matched[np.argsort(-scores[matched], kind="stable")]
+        return matched, scores[matched]
+
+
+def reciprocal_rank_fusion(rankings: Iterable[np.ndarray], k: int = 60) -> np.ndarray:
+    """
+    Fuses several rankings of rows (best first) with RRF: each row scores
+    `sum(1 / (k + rank))` over the rankings it appears in.
+    :return: Rows ordered by fused score, best first.
+    """
+    fused: dict[int, float] = {}
+    for ranking in rankings:
+        for rank, row in enumerate(ranking.tolist()):
+            fused[row] = fused.get(row, 0.0) + 1.0 / (k + rank + 1)
+    return np.asarray(sorted(fused, key=lambda row: -fused[row]), dtype=np.int64)
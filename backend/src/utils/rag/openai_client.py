@@ -0,0 +1,137 @@
+import asyncio
+
+import httpx
+import numpy as np
+from openai import AsyncOpenAI
+
+from src.config.settings import settings
+from src.utils.general import normalize_v
+from src.utils.metrics import record_token_usage
+
+
+class OpenAIClientManager:
+    """
+    Owns the process-wide `AsyncOpenAI` client, so every request reuses the same
+    HTTP connection pool instead of opening new TLS connections.
+    The client is created on first use and closed by the application lifespan.
+    """
+
+    def __init__(self):
+        self._client: AsyncOpenAI | None = None
+
+    def get(self) -> AsyncOpenAI:
+        if self._client is None:
+            self._client = AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                base_url=settings.OPENAI_BASE_URL,
+                timeout=settings.OPENAI_TIMEOUT_SECONDS,
+                http_client=httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                        max_keepalive_connections=settings.OPENAI_MAX_CONNECTIONS
+                    ),
+                    timeout=settings.OPENAI_TIMEOUT_SECONDS
+                )
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.close()
+
+
+class EmbeddingBatcher:
+    """
+    Micro-batcher for question embeddings.
+
+    Texts submitted within `max_wait_ms` of each other are sent in one multi-input
+    embeddings call (at most `max_batch_inputs` per call) and every caller receives its own
+    normalized vector. Duplicated texts in a window are embedded once. With `max_wait_ms`
+    set to 0 each call is sent immediately. Only texts for the same model and client share
+    a call; the client defaults to the one of `client_manager`.
+    """
+
+    def __init__(self, client_manager: OpenAIClientManager, max_wait_ms: float, max_batch_inputs: int):
+        self.client_manager = client_manager
+        self.max_wait_ms = max_wait_ms
+        self.max_batch_inputs = max_batch_inputs
+        self.requests = 0
+        self.calls = 0
+        self.inputs = 0
+        self._pending: dict[tuple[str, AsyncOpenAI], list[tuple[str, asyncio.Future]]] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def embed(self, text: str, model: str, client: AsyncOpenAI | None = None) -> np.ndarray:
+        """
+        Returns the normalized embedding of `text`, sharing the call with concurrent requests.
+        """
+        self.requests += 1
+        client = client or self.client_manager.get()
+        if self.max_wait_ms <= 0:
+            return (await self._send(client, model, [text]))[text]
+        future = asyncio.get_running_loop().create_future()
+        queue = self._pending.setdefault((model, client), [])
+        queue.append((text, future))
+        if len(queue) >= self.max_batch_inputs:
+            self._flush_queue((model, client))
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait_ms / 1000, self._flush)
+        return await future
+
+    async def embed_many(self, texts: list[str], model: str, client: AsyncOpenAI | None = None) -> list[np.ndarray]:
+        return list(await asyncio.gather(*(self.embed(text, model, client) for text in texts)))
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "calls": self.calls,
+            "inputs": self.inputs,
+            "average_batch_size": self.inputs / self.calls if self.calls else 0.0
+        }
+
+    def _flush(self):
+        self._timer = None
+        for key in list(self._pending):
+            self._flush_queue(key)
+
+    def _flush_queue(self, key: tuple[str, AsyncOpenAI]):
+        queue = self._pending.pop(key, [])
+        if not self._pending and self._timer is not None:
+            # Nothing left waiting: the next text opens a full window of its own.
+            self._timer.cancel()
+            self._timer = None
+        if not queue:
+            return
+        task = asyncio.get_running_loop().create_task(self._dispatch(key, queue))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, key: tuple[str, AsyncOpenAI], queue: list[tuple[str, asyncio.Future]]):
+        model, client = key
+        try:
+            vectors = await self._send(client, model, [text for text, _ in queue])
+            for text, future in queue:
+                if not future.done():
+                    future.set_result(vectors[text])
+        except Exception as e:
+            for _, future in queue:
+                if not future.done():
+                    future.set_exception(e)
+
+    async def _send(self, client: AsyncOpenAI, model: str, texts: list[str]) -> dict:
+        unique = list(dict.fromkeys(texts))
+        self.calls += 1
+        self.inputs += len(unique)
+        response = await client.embeddings.create(model=model, input=unique)
+        record_token_usage(model, response.usage)
+        return {text: normalize_v(np.array(item.embedding)) for text, item in zip(unique, response.data)}
+
+
+openai_client_manager = OpenAIClientManager()
+embedding_batcher = EmbeddingBatcher(
+    openai_client_manager,
+    max_wait_ms=settings.EMBEDDING_MICROBATCH_WAIT_MS,
+    max_batch_inputs=settings.EMBEDDING_MICROBATCH_MAX_INPUTS
+)
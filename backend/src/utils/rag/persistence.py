@@ -0,0 +1,136 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.answer.services import AnswerManager
+from src.answer_document.services import AnswerDocumentManager
+from src.config.database import SessionLocal
+from src.config.settings import settings
+from src.question.schemas import QuestionRequest
+from src.question.services import QuestionManager
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class Interaction:
+    """
+    Everything persisted for one answered question.
+    """
+    payload: QuestionRequest
+    question_embedding: np.ndarray
+    answer_text: str
+    top_docs: list
+
+
+async def persist_interactions(db: AsyncSession, interactions: list[Interaction]):
+    """
+    Stores questions, answers and their sources in a single transaction:
+    each row is flushed (one INSERT each, no refresh) and committed once at the end.
+    """
+    try:
+        for interaction in interactions:
+            question = await QuestionManager(db).create_question(
+                interaction.payload, interaction.question_embedding, is_flush=True
+            )
+            answer = await AnswerManager(db).create_answer(
+                question_id=question.id, answer_text=interaction.answer_text, is_flush=True
+            )
+            await AnswerDocumentManager(db).post_link_documents_to_answer(
+                answer.id, interaction.top_docs, is_flush=True
+            )
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        raise ValueError({
+            "error": "Error persisting interactions",
+            "details": str(e),
+            "method": "persist_interactions"
+        })
+
+
+class WriteBehindQueue:
+    """
+    Bounded queue drained by a background task, so responses do not wait on Postgres.
+
+    The worker takes up to `batch_size` queued interactions at a time and stores them in
+    one transaction. When the queue is full, `submit` returns False and the caller persists
+    synchronously, which applies backpressure instead of growing memory.
+    """
+
+    def __init__(self, max_size: int, batch_size: int):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.persisted = 0
+        self.failed = 0
+        self.rejected = 0
+        self._queue: asyncio.Queue[Interaction] | None = None
+        self._worker: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    def start(self):
+        if not self.running:
+            self._queue = asyncio.Queue(maxsize=self.max_size)
+            self._worker = asyncio.create_task(self._drain())
+
+    async def stop(self):
+        """
+        Waits for queued interactions to be stored, then stops the worker.
+        """
+        if not self.running:
+            return
+        await self._queue.join()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    def submit(self, interaction: Interaction) -> bool:
+        if not self.running:
+            return False
+        try:
+            self._queue.put_nowait(interaction)
+            return True
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_size": self.max_size,
+            "persisted": self.persisted,
+            "failed": self.failed,
+            "rejected": self.rejected
+        }
+
+    async def _drain(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                async with SessionLocal() as db:
+                    await persist_interactions(db, batch)
+                self.persisted += len(batch)
+            except Exception:
+                self.failed += len(batch)
+                logger.exception("Write-behind persistence failed for %s interactions", len(batch))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+
+write_behind_queue = WriteBehindQueue(
+    max_size=settings.PERSISTENCE_QUEUE_SIZE,
+    batch_size=settings.PERSISTENCE_BATCH_SIZE
+)
@@ -0,0 +1,82 @@
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config.settings import settings
+from src.document.models import Document
+from src.utils.general import normalize_v
+from src.utils.rag.corpus_store import CorpusDocument
+
+
+class PgVectorRetriever:
+    """
+    Retrieval inside Postgres: `ORDER BY embedding_vector <=> :question LIMIT k` served by
+    the HNSW index on `document.embedding_vector`, so every worker shares one index and no
+    vector is sent to Python.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def search(self, question_embedding: np.ndarray, k: int = 5) -> list[tuple[float, CorpusDocument]]:
+        """
+        Returns the top-k `(cosine similarity, CorpusDocument)` tuples, best first.
+        """
+        try:
+            query_vector = normalize_v(np.asarray(question_embedding, dtype=np.float32))
+            distance = Document.embedding_vector.cosine_distance(query_vector)
+            query = (
+                select(Document.id, Document.title, Document.content, (1 - distance).label("score"))
+                .where(Document.embedding_vector.is_not(None))
+                .order_by(distance)
+                .limit(k)
+            )
+            # Candidates explored per HNSW search: higher = better recall, slower.
+            await self.db.execute(text(f"SET LOCAL hnsw.ef_search = {int(settings.RAG_PGVECTOR_EF_SEARCH)}"))
+            result = await self.db.execute(query)
+            return [
+                (float(row.score), CorpusDocument(id=row.id, title=row.title, content=row.content))
+                for row in result.all()
+            ]
+        except Exception as e:
+            raise ValueError({
+                "error": "Error searching pgvector index",
+                "details": str(e),
+                "method": "PgVectorRetriever.search"
+            })
+
+    async def search_many(self, question_embeddings: np.ndarray, k: int = 5) -> list[list[tuple[float, CorpusDocument]]]:
+        """
+        One index search per question row; the session runs them one after another.
+        """
+        return [await self.search(query, k) for query in question_embeddings]
+
+    async def get_documents(self, ids: list[UUID]) -> dict[UUID, CorpusDocument]:
+        """
+        Resolves documents by id (e.g. the sources of cached answers), without embeddings.
+        """
+        try:
+            if not ids:
+                return {}
+            result = await self.db.execute(
+                select(Document.id, Document.title, Document.content).where(Document.id.in_(ids))
+            )
+            return {row.id: CorpusDocument(id=row.id, title=row.title, content=row.content) for row in result.all()}
+        except Exception as e:
+            raise ValueError({
+                "error": "Error retrieving documents",
+                "details": str(e),
+                "method": "PgVectorRetriever.get_documents"
+            })
+
+    async def is_ready(self) -> bool:
+        """
+        Whether at least one document can be retrieved through the index.
+        """
+        result = await self.db.execute(
+            select(Document.id).where(Document.embedding_vector.is_not(None)).limit(1)
+        )
+        return result.first() is not None
+
@@ -0,0 +1,155 @@
+import time
+
+import numpy as np
+
+from src.utils.rag.vector_index import VectorIndex
+
+# Rows dequantized to float32 per block: small enough to stay in cache (1.5 MB at 1536 dims).
+BLOCK_ROWS = 256
+SUPPORTED_DTYPES = ("int8",)
+
+
+class QuantizedMatrix:
+    """
+    int8 copy of a normalized embedding matrix for first-pass scoring.
+
+    One scale per dimension quarters the memory of the float32 matrix (`codes * scales`
+    approximates the original rows). It is meant to be the only resident copy: the float32
+    rows stay memory-mapped and only the rescored candidates are read from them.
+    Scores are computed block by block: each block of codes is widened into one reused
+    float32 buffer that stays in cache and scored with BLAS against the query, which has
+    the scales folded in. float16 is not offered: numpy has no fast float16 conversion or
+    BLAS kernel, so it was several times slower than the float32 scan for half the saving.
+    """
+
+    def __init__(self, codes: np.ndarray, scales: np.ndarray):
+        self.codes = codes
+        self.scales = scales
+
+    @classmethod
+    def from_matrix(cls, matrix: np.ndarray, dtype: str = "int8") -> "QuantizedMatrix":
+        """
+        :param matrix: Row-normalized float32 matrix (may be a memmap; read block by block).
+        :param dtype: Only "int8" is supported.
+        """
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError({
+                "error": "Invalid quantization",
+                "details": f"Unsupported dtype {dtype!r}, expected one of {SUPPORTED_DTYPES}",
+                "method": "QuantizedMatrix.from_matrix"
+            })
+        n, dimension = matrix.shape
+        peak = np.zeros(dimension, dtype=np.float32)
+        for start in range(0, n, BLOCK_ROWS):
+            np.maximum(peak, np.abs(matrix[start:start + BLOCK_ROWS]).max(axis=0), out=peak)
+        scales = np.where(peak > 0, peak / 127.0, 1.0).astype(np.float32)
+        codes = np.empty((n, dimension), dtype=np.int8)
+        for start in range(0, n, BLOCK_ROWS):
+            block = np.asarray(matrix[start:start + BLOCK_ROWS], dtype=np.float32) / scales
+            codes[start:start + BLOCK_ROWS] = np.clip(np.rint(block), -127, 127)
+        return cls(codes, scales)
+
+    @property
+    def dtype(self) -> str:
+        return self.codes.dtype.name
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.scales.nbytes
+
+    def __len__(self) -> int:
+        return self.codes.shape[0]
+
+    def scores(self, question_embeddings: np.ndarray) -> np.ndarray:
+        """
+        Approximate cosine similarities: a vector for one question, or (questions x rows).
+        """
+        queries = np.asarray(question_embeddings, dtype=np.float32)
+        single = queries.ndim == 1
+        # (codes * scales) @ q == codes @ (scales * q)
+        queries = VectorIndex.normalize_rows(np.atleast_2d(queries)) * self.scales
+        scores = np.empty((queries.shape[0], len(self)), dtype=np.float32)
+        buffer = np.empty((min(BLOCK_ROWS, len(self)), self.codes.shape[1]), dtype=np.float32)
+        for start in range(0, len(self), BLOCK_ROWS):
+            codes = self.codes[start:start + BLOCK_ROWS]
+            block = buffer[:codes.shape[0]]
+            np.copyto(block, codes, casting="unsafe")
+            if single:
+                np.dot(block, queries[0], out=scores[0, start:start + codes.shape[0]])
+            else:
+                scores[:, start:start + codes.shape[0]] = queries @ block.T
+        return scores[0] if single else scores
+
+    def candidates(self, question_embedding: np.ndarray, n: int) -> np.ndarray:
+        """
+        Sorted rows of the n best approximate matches, to be rescored exactly.
+        """
+        return np.sort(VectorIndex.top_positions(self.scores(question_embedding), n))
+
+
+def quantization_report(
+    index: VectorIndex,
+    queries: np.ndarray | None = None,
+    k: int = 5,
+    rescore_factors: tuple[int, ...] = (1, 2, 4, 8),
+    n_queries: int = 200,
+    seed: int = 0
+) -> dict:
+    """
+    Memory, latency and recall@k of int8 first-pass scoring against the exact float32 scan
+    (`VectorIndex.search`, the same ranking as `RagManager.get_top_k_documents`).
+    A rescore factor of f rescores the top `f * k` approximate candidates at full precision;
+    a factor of 1 is the quantized ranking alone.
+    When no queries are given, random corpus rows perturbed with noise are used as questions.
+    """
+    rng = np.random.default_rng(seed)
+    if queries is None:
+        rows = rng.choice(len(index), size=min(n_queries, len(index)), replace=False)
+        queries = np.asarray(index.matrix[rows], dtype=np.float32)
+        queries = queries + rng.normal(scale=0.5 / np.sqrt(index.dimension), size=queries.shape).astype(np.float32)
+
+    started = time.perf_counter()
+    exact = [set(index.rank(q, k)[0].tolist()) for q in queries]
+    exact_ms = (time.perf_counter() - started) * 1000 / len(queries)
+    float32_bytes = len(index) * index.dimension * 4
+
+    report = {
+        "documents": len(index),
+        "dimension": index.dimension,
+        "k": k,
+        "float32_bytes": float32_bytes,
+        "exact_ms": round(exact_ms, 4),
+        "quantized": []
+    }
+    quantized = QuantizedMatrix.from_matrix(index.matrix)
+    for factor in rescore_factors:
+        hits = 0
+        started = time.perf_counter()
+        for q, expected in zip(queries, exact):
+            if factor == 1:
+                found = VectorIndex.top_positions(quantized.scores(q), k)
+            else:
+                found = index.rank(q, k, rows=quantized.candidates(q, factor * k))[0]
+            hits += len(expected & set(found.tolist()))
+        quantized_ms = (time.perf_counter() - started) * 1000 / len(queries)
+        report["quantized"].append({
+            "dtype": quantized.dtype,
+            "rescore_factor": factor,
+            "bytes": quantized.nbytes,
+            "memory_ratio": round(quantized.nbytes / float32_bytes, 4),
+            "recall": hits / (len(queries) * k),
+            "quantized_ms": round(quantized_ms, 4)
+        })
+    return report
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    from src.utils.rag.embedding_store import EmbeddingStore
+
+    # Usage: python -m src.utils.rag.quantization [k]
+    ids, vectors = EmbeddingStore().open()
+    top_k = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(json.dumps(quantization_report(VectorIndex(vectors, ids, normalized=True), k=top_k), indent=2))
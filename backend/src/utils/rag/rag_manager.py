@@ -1,24 +1,32 @@
-import os
-import heapq
+import asyncio
+import time
+from typing import AsyncIterator
+
 import numpy as np
-import pandas as pd
 from openai import AsyncOpenAI
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.config.settings import settings
-from src.answer.services import AnswerManager
-from src.answer_document.services import AnswerDocumentManager
 from src.question.services import QuestionManager
-from src.document.services import DocumentManager
 from src.question.schemas import QuestionRequest
-from src.answer.schemas import AnswerResponse
-from src.utils.general import chunk_text, normalize_v
+from src.answer.schemas import AnswerResponse, BatchAnswerItem, BatchAnswerResponse
+from src.utils.general import normalize_v, sse_event
+from src.utils.metrics import record_stage, record_token_usage, stage
+from src.utils.rag.answer_cache import CachedAnswer, semantic_answer_cache
+from src.utils.rag.context_builder import context_builder
+from src.utils.rag.corpus_store import corpus_store
+from src.utils.rag.embedding_cache import EmbeddingCache, question_embedding_cache
+from src.utils.rag.openai_client import embedding_batcher, openai_client_manager
+from src.utils.rag.persistence import Interaction, persist_interactions, write_behind_queue
+from src.utils.rag.pgvector_retriever import PgVectorRetriever
+from src.utils.rag.retrieval_cache import RetrievalKey, retrieval_cache
+from src.utils.rag.vector_index import VectorIndex
 
 
 
 class RagManager:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, client: AsyncOpenAI | None = None):
         self.db = db
-        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = client or openai_client_manager.get()
 
     async def cosine_similarity(self, vec1: np.ndarray, vec2: np.ndarray) -> float:
         """
@@ -40,13 +48,7 @@ class RagManager:
         Retrieves the top-k most similar documents to the question embedding.
         """
         try:
-            scored_docs = []
-            for doc in documents:
-                doc_embedding = np.array(doc.embedding) 
-                score = await self.cosine_similarity(question_embedding, doc_embedding)
-                scored_docs.append((score, doc))
-            top_k = heapq.nlargest(k, scored_docs, key=lambda x: x[0])
-            return [(score, doc) for score, doc in top_k]
+            return VectorIndex.from_documents(documents).search(question_embedding, k)
         except Exception as e:
             raise ValueError({
                 "error": "Error retrieving top K documents",
@@ -54,14 +56,27 @@ class RagManager:
                 "method": "RagManager.get_top_k_documents"
             })
 
-    async def retrieval(self, question_embedding: np.ndarray, k: int = 5) -> list:
+    async def retrieval(self, question_embedding: np.ndarray, k: int = 5, question: str | None = None) -> list:
         """
-        Retrieves relevant documents from the database.
+        Retrieves relevant documents from the in-memory corpus store, or from the pgvector
+        index in Postgres when `RAG_BACKEND=pgvector`. The question text enables BM25 matching
+        of article numbers and form codes when lexical retrieval is configured (memory backend).
+        Results of the memory backend are cached for near-duplicate embeddings and the corpus version.
         """
         try:
-            all_documents = await DocumentManager(self.db).get_documents_list()
-            top_docs = await self.get_top_k_documents(question_embedding, all_documents, k)
-            return top_docs
+            with stage("retrieval"):
+                if settings.RAG_BACKEND == "pgvector":
+                    return await PgVectorRetriever(self.db).search(question_embedding, k)
+                await corpus_store.ensure_loaded(self.db)
+                if not len(corpus_store):
+                    raise ValueError("The corpus is empty, run `python -m src.ingest` first")
+                key = self._retrieval_key(question_embedding, k, question)
+                top_docs = retrieval_cache.get(key)
+                if top_docs is None:
+                    started = time.perf_counter()
+                    top_docs = corpus_store.search(question_embedding, k, question=question)
+                    retrieval_cache.put(key, top_docs, time.perf_counter() - started)
+                return top_docs
         except Exception as e:
             raise ValueError({
                 "error": "Error during retrieval",
@@ -69,12 +84,57 @@ class RagManager:
                 "method": "RagManager.retrieval"
             })
 
-    async def build_context(self, top_docs: list) -> str:
+    async def retrieval_many(self, question_embeddings: np.ndarray, k: int = 5, questions: list[str] | None = None) -> list[list]:
         """
-        Builds the context for the question by concatenating the contents of the top documents.
+        Batched `retrieval`, one top-k list per question row.
         """
         try:
-            return "\n".join(doc.content for _, doc in top_docs)
+            with stage("retrieval"):
+                if settings.RAG_BACKEND == "pgvector":
+                    return await PgVectorRetriever(self.db).search_many(question_embeddings, k)
+                await corpus_store.ensure_loaded(self.db)
+                if not len(corpus_store):
+                    raise ValueError("The corpus is empty, run `python -m src.ingest` first")
+                keys = [
+                    self._retrieval_key(question_embedding, k, questions[i] if questions else None)
+                    for i, question_embedding in enumerate(question_embeddings)
+                ]
+                results = [retrieval_cache.get(key) for key in keys]
+                missing = [i for i, top_docs in enumerate(results) if top_docs is None]
+                if missing:
+                    started = time.perf_counter()
+                    retrieved = corpus_store.search_many(
+                        question_embeddings[missing],
+                        k,
+                        questions=[questions[i] for i in missing] if questions else None
+                    )
+                    # The batch is scored at once: every question is credited an equal share.
+                    elapsed = (time.perf_counter() - started) / len(missing)
+                    for i, top_docs in zip(missing, retrieved):
+                        results[i] = top_docs
+                        retrieval_cache.put(keys[i], top_docs, elapsed)
+                return results
+        except Exception as e:
+            raise ValueError({
+                "error": "Error during retrieval",
+                "details": str(e),
+                "method": "RagManager.retrieval_many"
+            })
+
+    def _retrieval_key(self, question_embedding: np.ndarray, k: int, question: str | None) -> RetrievalKey:
+        # BM25 makes the result depend on the question text, not only on its embedding.
+        lexical = settings.RAG_LEXICAL_MODE != "off" and question
+        return retrieval_cache.key(question_embedding, corpus_store.version, k, question if lexical else None)
+
+    async def build_context(self, top_docs: list, question: str) -> str:
+        """
+        Builds the context for the question from the top documents, within the token budget:
+        adjacent fragments are merged, redundant ones dropped and, if needed, only the
+        sentences closest to the question are kept.
+        """
+        try:
+            with stage("context"):
+                return context_builder.build(question, top_docs).text
         except Exception as e:
             raise ValueError({
                 "error": "Error building context",
@@ -87,16 +147,12 @@ class RagManager:
         Generates a response using GPT and the retrieved context.
         """
         try:
-            system_prompt = settings.PROMPT_TEMPLATE 
-            user_prompt = f"{context}\n\nPregunta:\n{question}"
-
-            response = await self.client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ]
-            )
+            with stage("generation"):
+                response = await self.client.chat.completions.create(
+                    model=settings.OPENAI_MODEL,
+                    messages=self._messages(context, question)
+                )
+            record_token_usage(settings.OPENAI_MODEL, response.usage)
             return response.choices[0].message.content
         except Exception as e:
             raise ValueError({
@@ -105,30 +161,176 @@ class RagManager:
                 "method": "RagManager.generation"
             })
 
-    async def process_question(self, payload: QuestionRequest) -> AnswerResponse:
+    async def generation_stream(self, context: str, question: str) -> AsyncIterator[str]:
         """
-        Main processing flow for the RAG: retrieval → context → generation → persistence.
+        Streaming variant of `generation`: yields the answer tokens as GPT produces them.
         """
+        # Only the waits on OpenAI are timed, not the time the consumer takes to send each token.
+        upstream = 0.0
         try:
-            cache_path = os.path.join(os.path.dirname(__file__), "data", "embeddings_cache.pkl")
-            csv_path = os.path.join(os.path.dirname(__file__), "data", "documents.csv")
-            await self._load_documents_and_create_embeddings(csv_path, cache_path)
+            started = time.perf_counter()
+            try:
+                stream = await self.client.chat.completions.create(
+                    model=settings.OPENAI_MODEL,
+                    messages=self._messages(context, question),
+                    stream=True,
+                    stream_options={"include_usage": True}
+                )
+            finally:
+                upstream += time.perf_counter() - started
+            chunks = aiter(stream)
+            while True:
+                started = time.perf_counter()
+                try:
+                    chunk = await anext(chunks)
+                except StopAsyncIteration:
+                    break
+                finally:
+                    upstream += time.perf_counter() - started
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+                # The last chunk has no choices and carries the usage of the whole answer.
+                record_token_usage(settings.OPENAI_MODEL, chunk.usage)
+        except Exception as e:
+            raise ValueError({
+                "error": "Error during generation",
+                "details": str(e),
+                "method": "RagManager.generation_stream"
+            })
+        finally:
+            record_stage("generation", upstream)
+
+    def _messages(self, context: str, question: str) -> list[dict]:
+        system_prompt = settings.PROMPT_TEMPLATE 
+        user_prompt = f"{context}\n\nPregunta:\n{question}"
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+
+    async def embed_question(self, question: str) -> np.ndarray:
+        """
+        Returns the normalized question embedding, skipping the embeddings call when the same
+        normalized question was embedded before (in memory, or persisted in the question table).
+        """
+        try:
+            return (await self.embed_questions([question]))[0]
+        except Exception as e:
+            raise ValueError({
+                "error": "Error embedding question",
+                "details": str(e),
+                "method": "RagManager.embed_question"
+            })
 
+    async def embed_questions(self, questions: list[str]) -> np.ndarray:
+        """
+        Batched `embed_question`: cache hits are resolved first, then the persisted embeddings
+        (one query), and every remaining distinct question is sent in a single embeddings call.
+        :return: Matrix with one normalized embedding per question, in input order.
+        """
+        try:
+            model = settings.OPENAI_EMBEDDING_MODEL
+            keys = [EmbeddingCache.question_key(question) for question in questions]
+            found = {}
+            for key in keys:
+                cached = question_embedding_cache.get(key, model)
+                if cached is not None:
+                    question_embedding_cache.hits += 1
+                    found[key] = cached
+            pending = {key: question for key, question in zip(keys, questions) if key not in found}
+            if pending and settings.EMBEDDING_CACHE_PERSISTENT:
+                with stage("embedding_lookup"):
+                    stored = await QuestionManager(self.db).get_embeddings(list(pending), model)
+                for key, embedding in stored.items():
+                    question_embedding_cache.persistent_hits += 1
+                    found[key] = question_embedding_cache.put(key, model, embedding)
+                    del pending[key]
+            if pending:
+                question_embedding_cache.misses += len(pending)
+                # Shared with the questions of concurrent requests by the micro-batcher.
+                with stage("embedding"):
+                    vectors = await embedding_batcher.embed_many(list(pending.values()), model, self.client)
+                for key, vector in zip(pending, vectors):
+                    found[key] = question_embedding_cache.put(key, model, vector)
+            return np.vstack([found[key] for key in keys])
+        except Exception as e:
+            raise ValueError({
+                "error": "Error embedding questions",
+                "details": str(e),
+                "method": "RagManager.embed_questions"
+            })
 
-            response_embedding = await self.client.embeddings.create(
-                model=settings.OPENAI_EMBEDDING_MODEL,
-                input=payload.question
+    async def lookup_cached_answer(self, question_embedding: np.ndarray) -> CachedAnswer | None:
+        """
+        Returns a previous answer to a near-duplicate question, if the semantic cache is enabled.
+        """
+        if not settings.SEMANTIC_CACHE_ENABLED:
+            return None
+        with stage("answer_cache"):
+            if settings.RAG_BACKEND == "pgvector":
+                corpus_store.track_store()
+            else:
+                await corpus_store.ensure_loaded(self.db)
+            return semantic_answer_cache.lookup(question_embedding, corpus_store.version)
+
+    def remember_answer(self, question_embedding: np.ndarray, answer_text: str, top_docs: list):
+        """
+        Adds a freshly generated answer to the semantic cache, if enabled.
+        """
+        if settings.SEMANTIC_CACHE_ENABLED:
+            semantic_answer_cache.store(
+                question_embedding,
+                CachedAnswer(answer_text=answer_text, top_docs=top_docs, corpus_version=corpus_store.version)
+            )
+
+    async def persist(self, payload: QuestionRequest, question_embedding: np.ndarray, answer_text: str, top_docs: list):
+        """
+        Stores the question, its answer and the sources used in one transaction.
+        In write-behind mode the interaction is queued and stored by a background worker,
+        unless the queue is full.
+        """
+        await self.persist_many([
+            Interaction(
+                payload=payload,
+                question_embedding=question_embedding,
+                answer_text=answer_text,
+                top_docs=top_docs
             )
-            question_embedding = normalize_v(np.array(response_embedding.data[0].embedding))
+        ])
+
+    async def persist_many(self, interactions: list[Interaction]):
+        """
+        Stores several interactions in one transaction, or queues them in write-behind mode.
+        """
+        if not interactions:
+            return
+        with stage("persistence"):
+            if settings.PERSISTENCE_MODE == "write_behind":
+                interactions = [interaction for interaction in interactions if not write_behind_queue.submit(interaction)]
+                if not interactions:
+                    return
+            await persist_interactions(self.db, interactions)
+
+    async def process_question(self, payload: QuestionRequest) -> AnswerResponse:
+        """
+        Main processing flow for the RAG: retrieval → context → generation → persistence.
+        With the semantic cache enabled, near-duplicate questions reuse a previous answer
+        and its sources instead of retrieval and generation.
+        """
+        try:
+            question_embedding = await self.embed_question(payload.question)
 
-            top_docs = await self.retrieval(question_embedding, k=5)
-            context = await self.build_context(top_docs)
+            cached = await self.lookup_cached_answer(question_embedding)
+            if cached is not None:
+                top_docs, answer_text = cached.top_docs, cached.answer_text
+            else:
+                top_docs = await self.retrieval(question_embedding, k=5, question=payload.question)
+                context = await self.build_context(top_docs, payload.question)
 
-            answer_text = await self.generation(context, payload.question)
+                answer_text = await self.generation(context, payload.question)
+                self.remember_answer(question_embedding, answer_text, top_docs)
 
-            question = await QuestionManager(self.db).create_question(payload, question_embedding.tolist())
-            answer = await AnswerManager(self.db).create_answer(question_id=question.id, answer_text=answer_text)
-            await AnswerDocumentManager(self.db).post_link_documents_to_answer(answer.id, top_docs)
+            await self.persist(payload, question_embedding, answer_text, top_docs)
 
             return AnswerResponse(
                 answer=answer_text,
@@ -141,40 +343,111 @@ class RagManager:
                 "method": "RagManager.process_question"
             })
 
-    async def _load_documents_and_create_embeddings(self, csv_path: str, cache_path: str):
+    async def process_batch(self, payloads: list[QuestionRequest]) -> BatchAnswerResponse:
         """
-        Loads documents from a CSV file, chunks them, and creates normalized embeddings in the database.
+        Batch variant of `process_question` for evaluation and bulk jobs: one embeddings call,
+        one matrix-matrix retrieval, generations with bounded concurrency and one transaction
+        for every successful answer. A failing question is reported in its own result and
+        does not affect the others.
         """
         try:
-            if os.path.exists(cache_path):
-                return
-            df = pd.read_csv(csv_path)
-            raw_documents = df.to_dict(orient="records")
-
-            chunked_documents = []
-            for doc in raw_documents:
-                chunks = chunk_text(doc["text"], max_chars=800)
-                for idx, chunk in enumerate(chunks):
-                    chunked_documents.append({
-                        "title": f"{doc['title']} [fragment {idx + 1}]",
-                        "content": chunk,
-                        "doc_id_original": doc["doc_id"]
-                    })
-
-            response = await self.client.embeddings.create(
-                model=settings.OPENAI_EMBEDDING_MODEL,
-                input=[doc["content"] for doc in chunked_documents]
-            )
-            embeddings = [normalize_v(np.array(e.embedding)).tolist() for e in response.data]
+            question_embeddings = await self.embed_questions([payload.question for payload in payloads])
+            answers: list[tuple[str, list] | None] = [None] * len(payloads)
+            errors: list[str | None] = [None] * len(payloads)
 
-            await DocumentManager(self.db).bulk_create_documents_with_embeddings(
-                documents=chunked_documents,
-                embeddings=embeddings,  
-                cache_path=cache_path
-            )
+            pending = []
+            for i, question_embedding in enumerate(question_embeddings):
+                cached = await self.lookup_cached_answer(question_embedding)
+                if cached is not None:
+                    answers[i] = (cached.answer_text, cached.top_docs)
+                else:
+                    pending.append(i)
+
+            if pending:
+                retrieved = await self.retrieval_many(
+                    question_embeddings[pending],
+                    k=5,
+                    questions=[payloads[i].question for i in pending]
+                )
+                semaphore = asyncio.Semaphore(settings.BATCH_GENERATION_CONCURRENCY)
+
+                async def generate(i: int, top_docs: list):
+                    try:
+                        async with semaphore:
+                            context = await self.build_context(top_docs, payloads[i].question)
+                            answer_text = await self.generation(context, payloads[i].question)
+                        answers[i] = (answer_text, top_docs)
+                        self.remember_answer(question_embeddings[i], answer_text, top_docs)
+                    except Exception as e:
+                        errors[i] = str(e)
+
+                await asyncio.gather(*(generate(i, top_docs) for i, top_docs in zip(pending, retrieved)))
+
+            answered = [i for i, answer in enumerate(answers) if answer is not None]
+            try:
+                await self.persist_many([
+                    Interaction(
+                        payload=payloads[i],
+                        question_embedding=question_embeddings[i],
+                        answer_text=answers[i][0],
+                        top_docs=answers[i][1]
+                    )
+                    for i in answered
+                ])
+            except Exception as e:
+                for i in answered:
+                    errors[i] = str(e)
+
+            results = [
+                BatchAnswerItem(
+                    index=i,
+                    question=payload.question,
+                    answer=answers[i][0] if answers[i] is not None else None,
+                    sources=[str(doc.id) for _, doc in answers[i][1]] if answers[i] is not None else [],
+                    error=errors[i]
+                )
+                for i, payload in enumerate(payloads)
+            ]
+            failed = sum(error is not None for error in errors)
+            return BatchAnswerResponse(results=results, succeeded=len(results) - failed, failed=failed)
         except Exception as e:
             raise ValueError({
-                "error": "Error loading documents and creating embeddings",
+                "error": "Error processing question batch",
+                "details": str(e),
+                "method": "RagManager.process_batch"
+            })
+
+    async def stream_question(self, payload: QuestionRequest) -> AsyncIterator[str]:
+        """
+        Streaming variant of `process_question`, as Server-Sent Events:
+        `sources` first, then one `token` event per generated fragment, and `done` with the
+        full answer once it is persisted. Failures are reported as an `error` event.
+        """
+        try:
+            question_embedding = await self.embed_question(payload.question)
+
+            cached = await self.lookup_cached_answer(question_embedding)
+            top_docs = cached.top_docs if cached is not None else await self.retrieval(question_embedding, k=5, question=payload.question)
+            sources = [str(doc.id) for _, doc in top_docs]
+            yield sse_event("sources", {"sources": sources})
+
+            if cached is not None:
+                answer_text = cached.answer_text
+                yield sse_event("token", {"token": answer_text})
+            else:
+                context = await self.build_context(top_docs, payload.question)
+                tokens = []
+                async for token in self.generation_stream(context, payload.question):
+                    tokens.append(token)
+                    yield sse_event("token", {"token": token})
+                answer_text = "".join(tokens)
+                self.remember_answer(question_embedding, answer_text, top_docs)
+
+            await self.persist(payload, question_embedding, answer_text, top_docs)
+            yield sse_event("done", AnswerResponse(answer=answer_text, sources=sources).model_dump())
+        except Exception as e:
+            yield sse_event("error", {
+                "error": "Error processing question",
                 "details": str(e),
-                "method": "RagManager._load_documents_and_create_embeddings"
+                "method": "RagManager.stream_question"
             })
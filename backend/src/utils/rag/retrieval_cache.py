@@ -0,0 +1,154 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.config.settings import settings
+from src.utils.general import normalize_v
+
+# Near-duplicates kept per bucket; the oldest one is dropped first.
+BUCKET_ENTRIES = 16
+# Least certain projection bits flipped when probing neighbouring buckets (2^n buckets per lookup).
+PROBE_BITS = 3
+
+
+@dataclass(frozen=True, eq=False)
+class RetrievalKey:
+    """
+    Lookup key of a question: its projection bucket (first) and the neighbouring buckets
+    to probe, plus the normalized embedding a hit is confirmed against.
+    """
+    buckets: tuple[int, ...]
+    corpus_version: int
+    k: int
+    question: str | None
+    query: np.ndarray
+
+    def slot(self, bucket: int) -> tuple:
+        return bucket, self.corpus_version, self.k, self.question
+
+
+class RetrievalCache:
+    """
+    Bounded in-process LRU of retrieval results for near-duplicate questions.
+
+    Questions are bucketed by the sign bits of a fixed random projection of their
+    normalized embedding (random-hyperplane LSH), so similar embeddings usually share a
+    bucket. A hit is confirmed by the cosine similarity with the stored question, which
+    must reach `threshold`, and returns that question's cached `(score, document)` list.
+    When the corpus version changes every entry is dropped, since its documents and
+    scores may be stale.
+    """
+
+    def __init__(self, max_entries: int, bits: int, threshold: float, seed: int = 0):
+        self.max_entries = max_entries
+        self.bits = bits
+        self.threshold = threshold
+        self.seed = seed
+        self.corpus_version: int | None = None
+        self._planes: dict[int, np.ndarray] = {}
+        self._entries: OrderedDict[tuple, list[tuple[np.ndarray, list, float]]] = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def key(self, question_embedding: np.ndarray, corpus_version: int, k: int, question: str | None = None) -> RetrievalKey:
+        """
+        :param question: Only part of the key when it changes the result (lexical retrieval).
+        """
+        query = normalize_v(np.asarray(question_embedding, dtype=np.float32))
+        projection = self._projection(query.shape[0]) @ query
+        bucket = sum(1 << int(i) for i in np.flatnonzero(projection >= 0))
+        # Embeddings close to a hyperplane land on either side of it: probe both sides of
+        # the nearest ones.
+        uncertain = [1 << int(i) for i in np.argsort(np.abs(projection))[:PROBE_BITS]]
+        buckets = [bucket]
+        for flip in uncertain:
+            buckets += [b ^ flip for b in buckets]
+        return RetrievalKey(tuple(buckets), corpus_version, k, question, query)
+
+    def get(self, key: RetrievalKey) -> list | None:
+        """
+        Returns a copy of the most similar cached top-k list, counting the retrieval time it saves.
+        """
+        started = time.perf_counter()
+        best, best_score, best_slot = None, self.threshold, None
+        if self._current(key.corpus_version):
+            for bucket in key.buckets:
+                for entry in self._entries.get(key.slot(bucket), ()):
+                    score = float(np.dot(entry[0], key.query))
+                    if score >= best_score:
+                        best, best_score, best_slot = entry, score, key.slot(bucket)
+        if best is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(best_slot)
+        self.hits += 1
+        self.saved_seconds += max(0.0, best[2] - (time.perf_counter() - started))
+        return list(best[1])
+
+    def put(self, key: RetrievalKey, top_docs: list, elapsed_seconds: float):
+        """
+        :param elapsed_seconds: Time the retrieval took, saved again on every hit.
+        """
+        if self.max_entries <= 0 or not self._current(key.corpus_version):
+            return
+        slot = key.slot(key.buckets[0])
+        entries = self._entries.setdefault(slot, [])
+        entries.append((key.query, list(top_docs), elapsed_seconds))
+        self._size += 1
+        if len(entries) > BUCKET_ENTRIES:
+            entries.pop(0)
+            self._size -= 1
+        self._entries.move_to_end(slot)
+        while self._size > self.max_entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def clear(self):
+        self._entries.clear()
+        self._size = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": self._size,
+            "max_entries": self.max_entries,
+            "corpus_version": self.corpus_version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "latency_saved_ms": round(self.saved_seconds * 1000, 3),
+            "avg_latency_saved_ms": round(self.saved_seconds * 1000 / self.hits, 3) if self.hits else 0.0
+        }
+
+    def _projection(self, dimension: int) -> np.ndarray:
+        """
+        Random hyperplanes (bits x dimension), fixed by `seed` so every worker buckets alike.
+        """
+        planes = self._planes.get(dimension)
+        if planes is None:
+            rng = np.random.default_rng(self.seed)
+            planes = self._planes[dimension] = rng.standard_normal((self.bits, dimension)).astype(np.float32)
+        return planes
+
+    def _current(self, corpus_version: int) -> bool:
+        """
+        Moves the cache to a newer corpus version; keys of an older one are never served or stored.
+        """
+        if self.corpus_version is None or corpus_version > self.corpus_version:
+            self.clear()
+            self.corpus_version = corpus_version
+        return corpus_version == self.corpus_version
+
+
+retrieval_cache = RetrievalCache(
+    max_entries=settings.RETRIEVAL_CACHE_SIZE,
+    bits=settings.RETRIEVAL_CACHE_BITS,
+    threshold=settings.RETRIEVAL_CACHE_THRESHOLD
+)
@@ -0,0 +1,144 @@
+from typing import Any, Sequence
+
+import numpy as np
+
+from src.utils.general import normalize_v
+
+
+class VectorIndex:
+    """
+    Exact cosine similarity index over a single pre-normalized float32 matrix.
+
+    Every row of `matrix` is the unit-length embedding of the document at the same
+    position in `documents`, so a question is scored against the whole corpus with
+    one matrix-vector product.
+    """
+
+    def __init__(self, matrix: np.ndarray, documents: Sequence[Any], normalized: bool = False):
+        """
+        :param matrix: 2-D array with one embedding per row.
+        :param documents: Objects returned alongside their score, aligned with the rows.
+            Lists are copied; other sequences (e.g. lazily decoded ones) are kept as given.
+        :param normalized: Whether the rows are already unit length (skips the copy).
+        """
+        if matrix.ndim != 2:
+            raise ValueError({
+                "error": "Invalid embedding matrix",
+                "details": f"Expected a 2-D matrix, got {matrix.ndim} dimensions",
+                "method": "VectorIndex.__init__"
+            })
+        if matrix.shape[0] != len(documents):
+            raise ValueError({
+                "error": "Invalid embedding matrix",
+                "details": f"{matrix.shape[0]} rows for {len(documents)} documents",
+                "method": "VectorIndex.__init__"
+            })
+        self.matrix = matrix if normalized else self.normalize_rows(matrix)
+        self.documents = documents if isinstance(documents, Sequence) and not isinstance(documents, list) else list(documents)
+
+    @classmethod
+    def from_documents(cls, documents: Sequence[Any]) -> "VectorIndex":
+        """
+        Builds the index from objects exposing an `embedding` attribute (e.g. `Document`).
+        """
+        if not documents:
+            return cls.empty()
+        matrix = np.asarray([doc.embedding for doc in documents], dtype=np.float32)
+        return cls(matrix, documents)
+
+    @classmethod
+    def empty(cls, dimension: int = 0) -> "VectorIndex":
+        """
+        Returns an index without documents.
+        """
+        return cls(np.empty((0, dimension), dtype=np.float32), [], normalized=True)
+
+    @staticmethod
+    def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+        """
+        Returns a C-contiguous float32 copy of `matrix` with unit-length rows.
+        Zero rows are left untouched, mirroring `normalize_v`.
+        """
+        matrix = np.array(matrix, dtype=np.float32, order="C", copy=True)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+    @property
+    def dimension(self) -> int:
+        return self.matrix.shape[1]
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def scores(self, question_embedding: np.ndarray) -> np.ndarray:
+        """
+        Cosine similarity of the question against every document.
+        """
+        query = normalize_v(np.asarray(question_embedding, dtype=np.float32))
+        return self.matrix @ query
+
+    def search(self, question_embedding: np.ndarray, k: int = 5) -> list[tuple[float, Any]]:
+        """
+        Returns the top-k `(score, document)` tuples, best first.
+        """
+        if k <= 0 or not self.documents:
+            return []
+        return self.select_top_k(self.scores(question_embedding), k)
+
+    def search_many(self, question_embeddings: np.ndarray, k: int = 5) -> list[list[tuple[float, Any]]]:
+        """
+        Batched `search`: scores every question against the corpus with one matrix-matrix product.
+        :param question_embeddings: 2-D array with one question embedding per row.
+        :return: One top-k list per question, in input order.
+        """
+        queries = self.normalize_rows(np.atleast_2d(question_embeddings))
+        if k <= 0 or not self.documents:
+            return [[] for _ in range(queries.shape[0])]
+        scores = queries @ self.matrix.T
+        return [self.select_top_k(row, k) for row in scores]
+
+    def search_rows(self, question_embedding: np.ndarray, rows: np.ndarray, k: int = 5) -> list[tuple[float, Any]]:
+        """
+        Like `search`, but only scores the given candidate rows (e.g. from an ANN index).
+        """
+        if k <= 0 or rows.shape[0] == 0:
+            return []
+        query = normalize_v(np.asarray(question_embedding, dtype=np.float32))
+        scores = self.matrix[rows] @ query
+        return [(float(scores[i]), self.documents[rows[i]]) for i in self.top_positions(scores, k)]
+
+    def rank(self, question_embedding: np.ndarray, k: int, rows: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Rows and scores of the k best documents, best first, optionally among candidate rows.
+        """
+        query = normalize_v(np.asarray(question_embedding, dtype=np.float32))
+        if rows is None:
+            scores = self.matrix @ query
+            positions = self.top_positions(scores, k) if k > 0 and self.documents else np.empty(0, dtype=np.int64)
+            return positions, scores[positions]
+        if k <= 0 or rows.shape[0] == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        scores = self.matrix[rows] @ query
+        positions = self.top_positions(scores, k)
+        return rows[positions], scores[positions]
+
+    def select_top_k(self, scores: np.ndarray, k: int) -> list[tuple[float, Any]]:
+        """
+        Picks the k best rows from a score vector aligned with the index rows.
+        """
+        return [(float(scores[i]), self.documents[i]) for i in self.top_positions(scores, k)]
+
+    @staticmethod
+    def top_positions(scores: np.ndarray, k: int) -> np.ndarray:
+        """
+        Positions of the k highest scores, best first.
+        """
+        k = min(k, scores.shape[0])
+        if k < scores.shape[0]:
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(scores.shape[0])
+        # Sort by score, keeping the corpus order on ties like `heapq.nlargest` does.
+        candidates.sort()
+        return candidates[np.argsort(-scores[candidates], kind="stable")]
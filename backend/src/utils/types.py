@@ -0,0 +1,117 @@
+import struct
+from typing import Sequence
+
+import numpy as np
+from sqlalchemy import Float, LargeBinary, Text, cast
+from sqlalchemy.types import TypeDecorator, UserDefinedType
+
+
+class Vector(UserDefinedType):
+    """
+    pgvector `vector(n)` column.
+
+    Values are sent as pgvector text literals ("[0.1,0.2]") cast through TEXT, so asyncpg
+    needs no codec for the extension type; results are parsed back into float32 arrays.
+    `to_binary`/`from_binary` implement the binary wire format for asyncpg COPY.
+    """
+
+    cache_ok = True
+
+    def __init__(self, dimension: int | None = None):
+        self.dimension = dimension
+
+    def get_col_spec(self, **kw) -> str:
+        return f"vector({self.dimension})" if self.dimension else "vector"
+
+    def bind_expression(self, bindvalue):
+        return cast(cast(bindvalue, Text), self)
+
+    def bind_processor(self, dialect):
+        def process(value):
+            return None if value is None else self.to_text(value)
+        return process
+
+    def result_processor(self, dialect, coltype):
+        def process(value):
+            return None if value is None else self.from_text(value)
+        return process
+
+    class comparator_factory(UserDefinedType.Comparator):
+        def cosine_distance(self, other):
+            """
+            `<=>` operator: 1 - cosine similarity, served by a `vector_cosine_ops` index.
+            """
+            return self.op("<=>", return_type=Float)(other)
+
+    @staticmethod
+    def to_text(value: Sequence[float]) -> str:
+        # 9 significant digits round-trip any float32.
+        return "[" + ",".join(f"{float(x):.9g}" for x in value) + "]"
+
+    @staticmethod
+    def from_text(value: str) -> np.ndarray:
+        return np.array(value.strip("[]").split(","), dtype=np.float32)
+
+    @staticmethod
+    def to_binary(value: Sequence[float]) -> bytes:
+        values = np.asarray(value, dtype=">f4")
+        return struct.pack(">HH", values.shape[0], 0) + values.tobytes()
+
+    @staticmethod
+    def from_binary(value: bytes) -> np.ndarray:
+        dimension, _ = struct.unpack_from(">HH", value)
+        return np.frombuffer(value, dtype=">f4", count=dimension, offset=4).astype(np.float32)
+
+
+class PackedVector(TypeDecorator):
+    """
+    Embedding stored as packed little-endian float32 in a `bytea` column.
+
+    An 8-byte header (format version, dtype code, 2 reserved bytes, uint32 dimension)
+    precedes the values, so a row takes 4 bytes per dimension instead of 8 for `float8[]`
+    and is decoded with one `np.frombuffer` instead of one Python float per element.
+    Decoded arrays are read-only views over the fetched bytes.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    HEADER = struct.Struct("<BBxxI")
+    VERSION = 1
+    DTYPES = {1: np.dtype("<f4")}
+    DTYPE_CODES = {dtype: code for code, dtype in DTYPES.items()}
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else self.pack(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else self.unpack(value)
+
+    @classmethod
+    def pack(cls, value: Sequence[float] | np.ndarray) -> bytes:
+        values = np.asarray(value, dtype="<f4")
+        if values.ndim != 1:
+            raise ValueError({
+                "error": "Invalid embedding",
+                "details": f"Expected a 1-D vector, got {values.ndim} dimensions",
+                "method": "PackedVector.pack"
+            })
+        return cls.HEADER.pack(cls.VERSION, cls.DTYPE_CODES[values.dtype], values.shape[0]) + values.tobytes()
+
+    @classmethod
+    def unpack(cls, value: bytes) -> np.ndarray:
+        version, dtype_code, dimension = cls.HEADER.unpack_from(value)
+        dtype = cls.DTYPES.get(dtype_code)
+        if version != cls.VERSION or dtype is None:
+            raise ValueError({
+                "error": "Invalid embedding",
+                "details": f"Unsupported packed vector (version {version}, dtype {dtype_code})",
+                "method": "PackedVector.unpack"
+            })
+        if len(value) != cls.HEADER.size + dimension * dtype.itemsize:
+            raise ValueError({
+                "error": "Invalid embedding",
+                "details": f"Packed vector of {len(value)} bytes does not hold {dimension} values",
+                "method": "PackedVector.unpack"
+            })
+        return np.frombuffer(value, dtype=dtype, count=dimension, offset=cls.HEADER.size)
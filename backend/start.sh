@@ -1,3 +1,4 @@
 #!/bin/bash
 alembic upgrade head
+python -m src.ingest
 uvicorn src.main:app --host 0.0.0.0 --port 8000 --reload
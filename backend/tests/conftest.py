@@ -0,0 +1,15 @@
+import os
+import sys
+
+# Settings are read at import time; tests never reach these services unless they opt in.
+for name, value in {
+    "DB_USER": "rag",
+    "DB_PASSWORD": "rag",
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "DB_NAME": "rag",
+    "OPENAI_API_KEY": "test"
+}.items():
+    os.environ.setdefault(name, value)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
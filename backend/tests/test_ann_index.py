@@ -0,0 +1,44 @@
+import numpy as np
+
+from benchmarks.corpus import synthetic_embeddings, synthetic_queries
+from src.utils.rag.ann_index import IVFIndex, recall_report
+from src.utils.rag.vector_index import VectorIndex
+
+
+def test_ivf_recall_on_clustered_corpus():
+    matrix = synthetic_embeddings(5000, 64, clusters=50)
+    index = VectorIndex(matrix, list(range(len(matrix))), normalized=True)
+    ivf = IVFIndex.build(matrix, n_lists=50, nprobe=8)
+    report = {row["nprobe"]: row for row in recall_report(index, ivf, synthetic_queries(matrix, 100), k=5)}
+    # A few lists out of 50 already find nearly every exact neighbour.
+    assert report[4]["recall"] >= 0.95
+    assert report[4]["scanned_fraction"] < 0.15
+    assert report[1]["recall"] <= report[4]["recall"] <= report[16]["recall"]
+
+
+def test_every_row_is_in_one_list():
+    matrix = synthetic_embeddings(1000, 32, clusters=10)
+    ivf = IVFIndex.build(matrix, n_lists=16)
+    assert np.array_equal(np.sort(ivf.order), np.arange(1000))
+    assert np.array_equal(np.sort(ivf.candidates(matrix[0], nprobe=16)), np.arange(1000))
+
+
+def test_saved_index_is_tied_to_its_store(tmp_path):
+    matrix = synthetic_embeddings(500, 16, clusters=5)
+    ivf = IVFIndex.build(matrix, n_lists=8)
+    path = str(tmp_path / "ivf.npz")
+    ivf.save(path, source_checksum="abc")
+    loaded = IVFIndex.load(path, nprobe=3, source_checksum="abc")
+    assert loaded.nprobe == 3
+    assert np.array_equal(loaded.assignments, ivf.assignments)
+    assert np.array_equal(loaded.candidates(matrix[7]), IVFIndex(ivf.centroids, ivf.assignments, nprobe=3).candidates(matrix[7]))
+    assert IVFIndex.load(path, source_checksum="other") is None
+
+
+def test_select_renumbers_rows():
+    matrix = synthetic_embeddings(300, 16, clusters=5)
+    ivf = IVFIndex.build(matrix, n_lists=4)
+    rows = np.arange(0, 300, 3)
+    selected = ivf.select(rows)
+    assert len(selected) == 100
+    assert np.array_equal(selected.assignments, ivf.assignments[rows])
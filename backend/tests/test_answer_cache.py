@@ -0,0 +1,82 @@
+import asyncio
+import datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.answer.services import AnswerManager
+from src.config.settings import settings
+from src.utils.general import normalize_v
+from src.utils.rag.answer_cache import CachedAnswer, SemanticAnswerCache
+
+DIMENSION = 64
+
+
+def embedding(seed: int) -> np.ndarray:
+    return normalize_v(np.random.default_rng(seed).standard_normal(DIMENSION).astype(np.float32))
+
+
+def answer(text: str, version: int = 1) -> CachedAnswer:
+    return CachedAnswer(answer_text=text, top_docs=[(0.9, "doc")], corpus_version=version)
+
+
+@pytest.fixture
+def cache() -> SemanticAnswerCache:
+    return SemanticAnswerCache(threshold=0.95, ttl_seconds=60, max_entries=3)
+
+
+def test_near_duplicate_question_hits(cache):
+    cache.store(embedding(0), answer("a"))
+    cache.store(embedding(1), answer("b"))
+    rephrased = embedding(0) + 0.05 * embedding(2)
+    assert cache.lookup(rephrased, 1).answer_text == "a"
+    assert cache.lookup(embedding(3), 1) is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_expired_entries_miss(cache):
+    cache.store(embedding(0), answer("old"), age_seconds=61)
+    cache.store(embedding(1), answer("recent"), age_seconds=30)
+    assert cache.lookup(embedding(0), 1) is None
+    assert cache.lookup(embedding(1), 1).answer_text == "recent"
+
+
+def test_corpus_change_drops_entries(cache):
+    cache.store(embedding(0), answer("a", version=1))
+    assert cache.lookup(embedding(0), 2) is None
+    assert len(cache) == 0
+
+
+def test_oldest_entry_is_overwritten(cache):
+    for i in range(4):
+        cache.store(embedding(i), answer(str(i)))
+    assert len(cache) == 3
+    assert cache.lookup(embedding(0), 1) is None
+    assert [cache.lookup(embedding(i), 1).answer_text for i in (1, 2, 3)] == ["1", "2", "3"]
+
+
+def test_warm_loads_recent_answers_with_live_sources(cache, monkeypatch):
+    monkeypatch.setattr(settings, "RAG_BACKEND", "memory")
+    now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+    def stored(text: str, seed: int, document_id: str) -> SimpleNamespace:
+        return SimpleNamespace(
+            answer_text=text,
+            created_at=now - datetime.timedelta(seconds=10),
+            question=SimpleNamespace(embedding=embedding(seed)),
+            documents=[SimpleNamespace(document_id=document_id, relevance_score=0.8)]
+        )
+
+    async def recent(manager, since, embedding_model, limit):
+        assert since >= now - datetime.timedelta(seconds=61) and limit == 3
+        return [stored("live", 0, "kept"), stored("stale", 1, "deleted")]
+
+    monkeypatch.setattr(AnswerManager, "get_recent_answers", recent)
+    corpus = SimpleNamespace(version=5, changed_at=None, get={"kept": "document"}.get)
+
+    assert asyncio.run(cache.warm(None, corpus)) == 1
+    hit = cache.lookup(embedding(0), 5)
+    assert hit.answer_text == "live" and hit.top_docs == [(0.8, "document")]
+    # Answers citing documents no longer in the corpus are skipped.
+    assert cache.lookup(embedding(1), 5) is None
@@ -0,0 +1,54 @@
+import pytest
+
+from src.utils.rag.chunker import LegalChunker
+
+
+def article(number: int, sentences: int) -> str:
+    body = " ".join(f"El contribuyente del artículo {number} cumple la obligación {i}." for i in range(sentences))
+    return f"ARTÍCULO {number}. {body}"
+
+
+def test_articles_start_new_chunks():
+    text = "\n".join(article(n, 4) for n in (240, 241, 242))
+    chunks = list(LegalChunker(max_chars=400, overlap_chars=100).split(text))
+    assert [chunk.split(".")[0] for chunk in chunks] == ["ARTÍCULO 240", "ARTÍCULO 241", "ARTÍCULO 242"]
+    # A new article does not repeat the end of the previous one.
+    assert all("240" not in chunk for chunk in chunks[1:])
+
+
+def test_short_articles_are_packed_together():
+    text = " ".join(f"Artículo {n}. Derogado." for n in range(1, 6))
+    chunks = list(LegalChunker(max_chars=400, overlap_chars=100).split(text))
+    assert chunks == [text]
+
+
+def test_long_article_splits_at_sentences_with_overlap():
+    text = article(26, 20)
+    chunks = list(LegalChunker(max_chars=300, overlap_chars=120).split(text))
+    assert len(chunks) > 2
+    assert all(len(chunk) <= 300 for chunk in chunks)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        # Continuations repeat whole words from the end of the previous chunk.
+        overlap = max(size for size in range(len(chunk)) if previous.endswith(chunk[:size]))
+        assert 0 < overlap <= 120
+        assert chunk[overlap:].startswith(" El contribuyente")
+
+
+def test_paragrafos_and_numerals_are_units():
+    text = (
+        "ARTÍCULO 10. Son contribuyentes:\n"
+        "1. Las personas naturales.\n"
+        "2. Las sociedades.\n"
+        "PARÁGRAFO 1. Se exceptúan las entidades sin ánimo de lucro."
+    )
+    chunks = list(LegalChunker(max_chars=60, overlap_chars=0).split(text))
+    assert chunks == [
+        "ARTÍCULO 10. Son contribuyentes: 1. Las personas naturales.",
+        "2. Las sociedades.",
+        "PARÁGRAFO 1. Se exceptúan las entidades sin ánimo de lucro."
+    ]
+
+
+def test_overlap_must_be_smaller_than_chunks():
+    with pytest.raises(ValueError):
+        LegalChunker(max_chars=100, overlap_chars=100)
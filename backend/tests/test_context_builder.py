@@ -0,0 +1,43 @@
+from types import SimpleNamespace
+
+from src.utils.rag.chunker import LegalChunker
+from src.utils.rag.context_builder import ContextBuilder
+
+
+def fragments(source: str, contents: list[str]) -> list:
+    return [
+        (1.0, SimpleNamespace(title=f"{source} [fragment {i}]", content=content))
+        for i, content in enumerate(contents)
+    ]
+
+
+def build(top_docs: list) -> str:
+    return ContextBuilder(max_tokens=0, dedup_threshold=1.0).build("pregunta", top_docs).text
+
+
+def test_single_character_boundary_is_not_an_overlap():
+    text = build(fragments("Estatuto", ["Según el artículo 5", "5 del estatuto tributario"]))
+    assert text == "Según el artículo 5 5 del estatuto tributario"
+
+
+def test_short_shared_words_are_not_an_overlap():
+    text = build(fragments("Estatuto", ["La tarifa es del 10 por ciento", "por ciento de la renta gravable"]))
+    assert text == "La tarifa es del 10 por ciento por ciento de la renta gravable"
+
+
+def test_overlap_must_cover_whole_words():
+    first = "Los contribuyentes declaran el impuesto sobre la renta y complementarios anualmente"
+    second = "renta y complementarios anualmente ante la DIAN"
+    assert build(fragments("Estatuto", [first, second])) == f"{first} ante la DIAN"
+    # Same long boundary, but it starts inside a word of the first fragment.
+    shifted = "enta y complementarios anualmente ante la DIAN"
+    assert build(fragments("Estatuto", [first, shifted])) == f"{first} {shifted}"
+
+
+def test_chunker_overlap_is_stitched_back():
+    text = " ".join(
+        f"Oración número {i} sobre obligaciones tributarias de los contribuyentes." for i in range(40)
+    )
+    chunks = list(LegalChunker(max_chars=400, overlap_chars=150).split(text))
+    assert len(chunks) > 2
+    assert build(fragments("Estatuto", chunks)) == text
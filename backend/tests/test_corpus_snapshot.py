@@ -0,0 +1,116 @@
+import asyncio
+import datetime
+import os
+import uuid
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.config.settings import settings
+from src.document.services import DocumentManager
+from src.utils.rag.corpus_snapshot import SnapshotDirectory
+from src.utils.rag.corpus_store import CorpusStore
+from src.utils.rag.embedding_store import EmbeddingStore
+from src.utils.rag.vector_index import VectorIndex
+
+
+def corpus(rng: np.random.Generator, n: int, start: int = 0) -> tuple[list, np.ndarray]:
+    rows = [
+        SimpleNamespace(
+            id=uuid.uuid4(),
+            title=f"Artículo {start + i}",
+            content=f"Artículo {start + i}. Tarifa del impuesto número {start + i}",
+            created_at=datetime.datetime(2024, 1, 1) + datetime.timedelta(seconds=start + i)
+        )
+        for i in range(n)
+    ]
+    return rows, rng.standard_normal((n, 16)).astype(np.float32)
+
+
+@pytest.fixture
+def table(tmp_path, monkeypatch) -> list:
+    monkeypatch.setattr(settings, "EMBEDDING_STORE_DIR", str(tmp_path / "store"))
+    monkeypatch.setattr(settings, "CORPUS_SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+    monkeypatch.setattr(settings, "CORPUS_SNAPSHOT_ENABLED", True)
+    monkeypatch.setattr(settings, "RAG_RETRIEVAL_MODE", "ivf")
+    monkeypatch.setattr(settings, "RAG_IVF_MIN_DOCUMENTS", 10)
+    monkeypatch.setattr(settings, "RAG_IVF_NLIST", 4)
+    monkeypatch.setattr(settings, "RAG_QUANTIZATION", "int8")
+    monkeypatch.setattr(settings, "RAG_LEXICAL_MODE", "hybrid")
+    rows = []
+
+    async def metadata(manager):
+        return list(rows)
+
+    monkeypatch.setattr(DocumentManager, "get_corpus_metadata", metadata)
+    return rows
+
+
+def mapped(array: np.ndarray) -> bool:
+    return isinstance(array, np.memmap) or isinstance(array.base, np.memmap)
+
+
+def write_store(rows: list, vectors: np.ndarray):
+    EmbeddingStore().write(ids=[row.id for row in rows], matrix=vectors, model=settings.OPENAI_EMBEDDING_MODEL)
+
+
+def test_workers_attach_to_one_published_version(table):
+    rows, vectors = corpus(np.random.default_rng(0), 40)
+    table.extend(rows)
+    write_store(rows, vectors)
+    first, second = CorpusStore(), CorpusStore()
+    asyncio.run(first.ensure_loaded(None))
+    asyncio.run(second.ensure_loaded(None))
+
+    assert first._snapshot.version == second._snapshot.version == SnapshotDirectory().current_version()
+    manifest = second._snapshot.manifest
+    assert set(manifest.indexes) == {"ivf", "int8", "bm25"}
+    # The second worker maps what the first one published instead of building it.
+    assert mapped(second.index.matrix)
+    assert mapped(second.ann.assignments) and mapped(second.ann.order)
+    assert mapped(second.quantized.codes)
+    assert mapped(second.lexical.doc_ids) and mapped(second.lexical.norms)
+
+    assert second.get(rows[7].id).title == "Artículo 7"
+    exact = VectorIndex(vectors, rows).search(vectors[3], 3)
+    found = second.search(vectors[3], 3)
+    assert found[0][1].id == rows[3].id
+    assert found[0][0] == pytest.approx(exact[0][0], abs=1e-5)
+    assert second.search(vectors[5], 1, "artículo 5")[0][1].id == rows[5].id
+
+
+def test_workers_hand_off_to_a_new_version(table):
+    rng = np.random.default_rng(1)
+    rows, vectors = corpus(rng, 30)
+    table.extend(rows)
+    write_store(rows, vectors)
+    store = CorpusStore()
+    asyncio.run(store.ensure_loaded(None))
+    old_version, old_snapshot = store._snapshot.version, store._snapshot
+
+    # Ingestion drops 5 documents, adds 10 and publishes a new version.
+    added, added_vectors = corpus(rng, 10, start=30)
+    table[:] = rows[5:] + added
+    write_store(rows + added, np.vstack([vectors, added_vectors]))
+    assert asyncio.run(SnapshotDirectory().publish_from_store(None)) is not None
+    asyncio.run(store.ensure_loaded(None))
+
+    assert store._snapshot.version != old_version
+    assert len(store) == len(store.lexical) == len(store.quantized) == len(store.ann) == 35
+    assert store.get(rows[0].id) is None
+    assert store.search(added_vectors[2], 1)[0][1].id == added[2].id
+    # The previous version stays readable for requests that still hold it.
+    assert old_snapshot.title(0) == "Artículo 0"
+
+
+def test_publish_skips_disabled_indexes(table, monkeypatch):
+    monkeypatch.setattr(settings, "RAG_QUANTIZATION", "none")
+    monkeypatch.setattr(settings, "RAG_LEXICAL_MODE", "off")
+    rows, vectors = corpus(np.random.default_rng(2), 5)
+    table.extend(rows)
+    write_store(rows, vectors)
+    snapshot = asyncio.run(SnapshotDirectory().publish_from_store(None))
+    assert snapshot.manifest.indexes == {}
+    assert not [name for name in os.listdir(snapshot.path) if name.startswith(("ivf_", "int8_", "bm25_"))]
+    assert snapshot.ann(nprobe=1) is None and snapshot.quantized() is None and snapshot.lexical() is None
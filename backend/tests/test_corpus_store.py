@@ -0,0 +1,118 @@
+import asyncio
+import datetime
+import threading
+import uuid
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.config.settings import settings
+from src.document.services import DocumentManager
+from src.utils.rag.corpus_store import CorpusStore
+
+
+class FakeTable:
+    """
+    `document` rows served through the DocumentManager corpus queries.
+    """
+
+    def __init__(self, rng: np.random.Generator, n: int):
+        self.rng = rng
+        self.rows = []
+        self.add(n)
+
+    def add(self, n: int):
+        for _ in range(n):
+            i = len(self.rows)
+            self.rows.append(SimpleNamespace(
+                id=uuid.uuid4(),
+                title=f"Documento {i}",
+                content=f"contenido {i}",
+                embedding=self.rng.standard_normal(16).astype(np.float32),
+                created_at=datetime.datetime(2024, 1, 1) + datetime.timedelta(seconds=i)
+            ))
+
+    def install(self, monkeypatch):
+        async def signature(manager):
+            return len(self.rows), max((row.created_at for row in self.rows), default=None)
+
+        async def rows(manager):
+            return list(self.rows)
+
+        monkeypatch.setattr(DocumentManager, "get_corpus_signature", signature)
+        monkeypatch.setattr(DocumentManager, "get_corpus_rows", rows)
+
+
+@pytest.fixture
+def table(tmp_path, monkeypatch) -> FakeTable:
+    # No embedding store: the corpus is loaded from the database rows.
+    monkeypatch.setattr(settings, "EMBEDDING_STORE_DIR", str(tmp_path / "store"))
+    monkeypatch.setattr(settings, "CORPUS_SNAPSHOT_ENABLED", False)
+    monkeypatch.setattr(settings, "CORPUS_DB_POLL_SECONDS", 0.0)
+    table = FakeTable(np.random.default_rng(0), 20)
+    table.install(monkeypatch)
+    return table
+
+
+def test_new_rows_are_picked_up_without_a_store(table):
+    store = CorpusStore()
+
+    async def run():
+        await store.ensure_loaded(None)
+        version = store.version
+        await store.ensure_loaded(None)
+        assert store.version == version
+        table.add(3)
+        await store.ensure_loaded(None)
+        return version
+
+    version = asyncio.run(run())
+    assert len(store) == 23
+    assert store.version == version + 1
+    assert store.get(table.rows[-1].id).title == "Documento 22"
+    top = store.search(table.rows[-1].embedding, 1)
+    assert top[0][1].id == table.rows[-1].id
+
+
+def test_table_is_polled_at_most_every_interval(table, monkeypatch):
+    monkeypatch.setattr(settings, "CORPUS_DB_POLL_SECONDS", 3600.0)
+    store = CorpusStore()
+
+    async def run():
+        await store.ensure_loaded(None)
+        table.add(1)
+        await store.ensure_loaded(None)
+
+    asyncio.run(run())
+    assert len(store) == 20
+
+
+def test_reload_builds_off_the_event_loop(table, monkeypatch):
+    store = CorpusStore()
+    asyncio.run(store.load(None))
+    first = table.rows[0]
+    table.add(5)
+    building = threading.Event()
+    release = threading.Event()
+    build = CorpusStore._build
+
+    def slow_build(self, *args):
+        building.set()
+        assert release.wait(5)
+        return build(self, *args)
+
+    monkeypatch.setattr(CorpusStore, "_build", slow_build)
+
+    async def run():
+        reload = asyncio.create_task(store.load(None))
+        while not building.is_set():
+            await asyncio.sleep(0.001)
+        # The loop keeps serving the previous corpus while the new one is built.
+        seen = (len(store), store.get(first.id) is not None, store.search(first.embedding, 1)[0][1].id)
+        release.set()
+        await reload
+        return seen
+
+    assert asyncio.run(run()) == (20, True, first.id)
+    assert len(store) == 25
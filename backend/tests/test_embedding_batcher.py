@@ -0,0 +1,63 @@
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+
+from src.utils.rag.openai_client import EmbeddingBatcher
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.calls: list[tuple[float, list[str]]] = []
+
+    async def create(self, model: str, input: list[str]):
+        self.calls.append((asyncio.get_running_loop().time(), list(input)))
+        return SimpleNamespace(
+            data=[SimpleNamespace(embedding=[1.0, float(len(text))]) for text in input],
+            usage=None
+        )
+
+
+class FakeClient:
+    def __init__(self):
+        self.embeddings = FakeEmbeddings()
+
+
+def batcher(client, max_wait_ms: float = 50, max_batch_inputs: int = 2) -> EmbeddingBatcher:
+    return EmbeddingBatcher(SimpleNamespace(get=lambda: client), max_wait_ms, max_batch_inputs)
+
+
+def test_size_flush_resets_the_window():
+    client = FakeClient()
+    embeddings = batcher(client)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        first = await embeddings.embed_many(["a", "bb"], "model")
+        assert embeddings._timer is None
+        # Arrives later within the cancelled window: it must still wait a full window.
+        await asyncio.sleep(0.03)
+        started = loop.time()
+        await embeddings.embed("ccc", "model")
+        return first, loop.time() - started
+
+    first, waited = asyncio.run(run())
+    assert [call[1] for call in client.embeddings.calls] == [["a", "bb"], ["ccc"]]
+    assert waited >= 0.045
+    np.testing.assert_allclose(first[1], np.array([1.0, 2.0]) / np.sqrt(5))
+
+
+def test_injected_client_is_used():
+    default, injected = FakeClient(), FakeClient()
+    embeddings = batcher(default, max_wait_ms=1, max_batch_inputs=10)
+
+    async def run():
+        return await asyncio.gather(
+            embeddings.embed("a", "model", injected),
+            embeddings.embed("b", "model", injected),
+            embeddings.embed("c", "model")
+        )
+
+    asyncio.run(run())
+    assert [call[1] for call in injected.embeddings.calls] == [["a", "b"]]
+    assert [call[1] for call in default.embeddings.calls] == [["c"]]
@@ -0,0 +1,78 @@
+import asyncio
+
+import httpx
+import numpy as np
+import pytest
+from openai import AsyncOpenAI
+
+from benchmarks.fake_openai import create_app, fake_embedding
+from src.utils.rag.embedding_pipeline import EmbeddingPipeline
+
+DIMENSION = 8
+TEXTS = [f"Artículo {i}. El contribuyente declara la renta del periodo {i}." for i in range(10)]
+
+
+@pytest.fixture
+def app():
+    return create_app(dimension=DIMENSION)
+
+
+def pipeline(app, tmp_path, **options) -> EmbeddingPipeline:
+    # The SDK's own retries are off, so every provider error reaches the pipeline.
+    client = AsyncOpenAI(
+        api_key="test",
+        base_url="http://fake-openai/v1",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=app))
+    )
+    options = {"model": "text-embedding-3-small", "retry_base_seconds": 0.001, "concurrency": 1, **options}
+    return EmbeddingPipeline(client, checkpoint_dir=str(tmp_path / "checkpoints"), **options)
+
+
+def expected(texts: list[str]) -> np.ndarray:
+    return np.vstack([fake_embedding(text, DIMENSION) for text in texts])
+
+
+def test_batches_respect_the_input_limit(app, tmp_path):
+    vectors = asyncio.run(pipeline(app, tmp_path, max_batch_inputs=4).embed(TEXTS))
+    np.testing.assert_allclose(vectors, expected(TEXTS), atol=1e-6)
+    assert app.state.requests == {"embeddings": 3, "embedding_inputs": 10, "chat_completions": 0}
+
+
+def test_batches_respect_the_token_limit(app, tmp_path):
+    embeddings = pipeline(app, tmp_path, max_batch_tokens=40, max_batch_inputs=100)
+    long_text = "impuesto " * 100
+    batches = embeddings.make_batches(TEXTS[:3] + [long_text] + TEXTS[3:5])
+    # Each text is about 15 tokens; the long one is over the limit and goes alone.
+    assert [list(batch) for batch in batches] == [[0, 1], [2], [3], [4, 5]]
+
+
+def test_rate_limits_and_server_errors_are_retried(app, tmp_path):
+    app.state.embedding_failures = [429, 503, None, 500]
+    vectors = asyncio.run(pipeline(app, tmp_path, max_batch_inputs=5, max_retries=2).embed(TEXTS))
+    np.testing.assert_allclose(vectors, expected(TEXTS), atol=1e-6)
+    assert app.state.requests["embeddings"] == 5
+    assert app.state.requests["embedding_inputs"] == 10
+
+
+def test_retries_are_bounded(app, tmp_path):
+    app.state.embedding_failures = [429, 429, 429]
+    with pytest.raises(ValueError):
+        asyncio.run(pipeline(app, tmp_path, max_retries=2).embed(TEXTS))
+    assert app.state.requests["embeddings"] == 3
+
+
+def test_rerun_resumes_from_the_checkpoint(app, tmp_path):
+    # The second batch fails for good; the first and third ones are saved.
+    app.state.embedding_failures = [None, 503]
+    with pytest.raises(ValueError):
+        asyncio.run(pipeline(app, tmp_path, max_batch_inputs=4, max_retries=0).embed(TEXTS))
+    assert app.state.requests["embedding_inputs"] == 6
+
+    embeddings = pipeline(app, tmp_path, max_batch_inputs=4, max_retries=0)
+    vectors = asyncio.run(embeddings.embed(TEXTS))
+    np.testing.assert_allclose(vectors, expected(TEXTS), atol=1e-6)
+    # Only the 4 texts of the missing batch were sent again.
+    assert app.state.requests["embedding_inputs"] == 10
+    embeddings.clear_checkpoints()
+    assert not (tmp_path / "checkpoints").exists()
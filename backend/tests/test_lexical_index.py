@@ -0,0 +1,61 @@
+import numpy as np
+
+from src.config.settings import settings
+from src.utils.rag.corpus_store import CorpusDocument, CorpusStore
+from src.utils.rag.lexical_index import LexicalIndex, reciprocal_rank_fusion, tokenize
+from src.utils.rag.vector_index import VectorIndex
+
+CONTENTS = [
+    "Artículo 240. Tarifa general para personas jurídicas del impuesto sobre la renta.",
+    "Artículo 241. Tarifa para personas naturales residentes.",
+    "Artículo 26. Los ingresos son base de la renta líquida.",
+    "Parágrafo. Las sociedades declaran la renta en el formulario 110.",
+]
+
+
+def test_tokenize_expands_abbreviations():
+    assert tokenize("¿Qué dice el Art. 240 del E.T.?") == ["dice", "articulo", "240", "estatuto", "tributario"]
+    assert tokenize("Decreto 1625 de 2016, artículo 1.2.1.5") == ["decreto", "1625", "2016", "articulo", "1.2.1.5"]
+
+
+def test_bm25_ranks_matching_documents():
+    index = LexicalIndex.build(CONTENTS)
+    rows, scores = index.search("tarifa del artículo 240", 3)
+    assert rows[0] == 0
+    assert list(rows) == [0, 1, 2]
+    assert np.all(np.diff(scores) <= 0)
+    # Documents sharing no term are never returned.
+    assert index.search("formulario", 5)[0].tolist() == [3]
+    assert index.search("sanciones", 5)[0].shape == (0,)
+
+
+def test_reciprocal_rank_fusion():
+    fused = reciprocal_rank_fusion([np.array([1, 2, 3]), np.array([3, 1, 4])], k=60)
+    # 1 and 3 appear in both rankings; 1 ranks higher on average.
+    assert fused.tolist() == [1, 3, 2, 4]
+
+
+def test_hybrid_search_surfaces_exact_article(monkeypatch):
+    monkeypatch.setattr(settings, "RAG_LEXICAL_MODE", "hybrid")
+    monkeypatch.setattr(settings, "RAG_LEXICAL_CANDIDATES", 10)
+    rng = np.random.default_rng(0)
+    matrix = rng.standard_normal((len(CONTENTS), 16)).astype(np.float32)
+    documents = [CorpusDocument(id=i, title=f"Doc {i}", content=content) for i, content in enumerate(CONTENTS)]
+    store = CorpusStore()
+    store.index = VectorIndex(matrix, documents)
+    store.lexical = LexicalIndex.build(CONTENTS)
+    # The embedding is closest to document 2, but the question names article 241.
+    question = matrix[2] + 0.1 * matrix[1]
+    assert store.search(question, 1)[0][1].id == 2
+    hybrid = store.search(question, 2, "tarifa del artículo 241")
+    assert {doc.id for _, doc in hybrid} == {1, 2}
+    # Scores stay cosine similarities.
+    expected = VectorIndex.normalize_rows(matrix) @ (question / np.linalg.norm(question))
+    for score, doc in hybrid:
+        assert abs(score - expected[doc.id]) < 1e-5
+
+    monkeypatch.setattr(settings, "RAG_LEXICAL_MODE", "prefilter")
+    # Only documents sharing a term are scored, however far their embedding is.
+    assert [doc.id for _, doc in store.search(question, 1, "formulario 110 de las sociedades")] == [3]
+    # Too few lexical matches for k: fused with the vector ranking instead.
+    assert {doc.id for _, doc in store.search(question, 2, "formulario 110")} == {2, 3}
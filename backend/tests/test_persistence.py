@@ -0,0 +1,70 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from src.utils.rag import persistence
+from src.utils.rag.persistence import WriteBehindQueue
+
+
+@pytest.fixture
+def batches(monkeypatch) -> list:
+    stored = []
+
+    @asynccontextmanager
+    async def session():
+        yield None
+
+    async def persist(db, interactions):
+        await asyncio.sleep(0.001)
+        if "fail" in interactions:
+            raise ValueError("database unavailable")
+        stored.append(list(interactions))
+
+    monkeypatch.setattr(persistence, "SessionLocal", session)
+    monkeypatch.setattr(persistence, "persist_interactions", persist)
+    return stored
+
+
+def test_stop_drains_queued_interactions(batches):
+    queue = WriteBehindQueue(max_size=100, batch_size=4)
+
+    async def run():
+        queue.start()
+        assert all(queue.submit(i) for i in range(10))
+        await queue.stop()
+
+    asyncio.run(run())
+    assert batches == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+    assert queue.stats() == {"running": False, "queued": 0, "max_size": 100, "persisted": 10, "failed": 0, "rejected": 0}
+    # Once stopped, callers persist synchronously again.
+    assert not queue.submit(10)
+
+
+def test_full_queue_applies_backpressure(batches):
+    queue = WriteBehindQueue(max_size=2, batch_size=10)
+
+    async def run():
+        queue.start()
+        accepted = [queue.submit(i) for i in range(3)]
+        await queue.stop()
+        return accepted
+
+    assert asyncio.run(run()) == [True, True, False]
+    assert batches == [[0, 1]]
+    assert queue.stats()["rejected"] == 1
+
+
+def test_failed_batches_do_not_block_the_drain(batches):
+    queue = WriteBehindQueue(max_size=10, batch_size=2)
+
+    async def run():
+        queue.start()
+        for item in ["fail", 1, 2, 3]:
+            queue.submit(item)
+        await asyncio.wait_for(queue.stop(), timeout=5)
+
+    asyncio.run(run())
+    assert batches == [[2, 3]]
+    assert queue.stats()["persisted"] == 2
+    assert queue.stats()["failed"] == 2
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from src.config.settings import settings
+from src.utils.rag.corpus_store import CorpusStore
+from src.utils.rag.quantization import QuantizedMatrix
+from src.utils.rag.vector_index import VectorIndex
+
+
+@pytest.fixture
+def mapped_index(tmp_path) -> VectorIndex:
+    rng = np.random.default_rng(0)
+    # Clustered rows, like chunks of the same statute: neighbours are close in score.
+    centers = rng.standard_normal((20, 64)).astype(np.float32)
+    matrix = centers[rng.integers(0, 20, 3000)] + 0.4 * rng.standard_normal((3000, 64)).astype(np.float32)
+    np.save(tmp_path / "vectors.npy", VectorIndex.normalize_rows(matrix))
+    vectors = np.load(tmp_path / "vectors.npy", mmap_mode="r")
+    return VectorIndex(vectors, list(range(len(vectors))), normalized=True)
+
+
+def test_int8_scores_track_float32(mapped_index):
+    quantized = QuantizedMatrix.from_matrix(mapped_index.matrix)
+    assert quantized.codes.dtype == np.int8
+    assert quantized.nbytes < mapped_index.matrix.nbytes / 3
+    queries = np.asarray(mapped_index.matrix[:8])
+    exact = queries @ np.asarray(mapped_index.matrix).T
+    np.testing.assert_allclose(quantized.scores(queries), exact, atol=0.02)
+    np.testing.assert_allclose(quantized.scores(queries[0]), exact[0], atol=0.02)
+
+
+def test_int8_rescoring_recall(mapped_index):
+    rng = np.random.default_rng(1)
+    quantized = QuantizedMatrix.from_matrix(mapped_index.matrix)
+    k, hits, queries = 5, 0, 100
+    for row in rng.choice(len(mapped_index), queries, replace=False):
+        query = mapped_index.matrix[row] + 0.05 * rng.standard_normal(64).astype(np.float32)
+        expected = set(mapped_index.rank(query, k)[0].tolist())
+        found, _ = mapped_index.rank(query, k, rows=quantized.candidates(query, 4 * k))
+        hits += len(expected & set(found.tolist()))
+    assert hits / (queries * k) >= 0.98
+
+
+def test_float16_is_rejected(mapped_index):
+    with pytest.raises(ValueError):
+        QuantizedMatrix.from_matrix(mapped_index.matrix, "float16")
+
+
+def test_only_memory_mapped_rows_are_quantized(mapped_index, monkeypatch):
+    monkeypatch.setattr(settings, "RAG_QUANTIZATION", "int8")
+    assert CorpusStore._load_quantized(mapped_index) is not None
+    resident = VectorIndex(np.array(mapped_index.matrix), mapped_index.documents, normalized=True)
+    assert CorpusStore._load_quantized(resident) is None
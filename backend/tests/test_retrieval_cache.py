@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from src.utils.general import normalize_v
+from src.utils.rag.retrieval_cache import RetrievalCache
+
+DIMENSION = 1536
+
+
+@pytest.fixture
+def cache() -> RetrievalCache:
+    return RetrievalCache(max_entries=100, bits=8, threshold=0.99)
+
+
+def near_duplicate(rng: np.random.Generator, embedding: np.ndarray, noise: float = 0.001) -> np.ndarray:
+    """
+    The same question embedded again: every component moves by a little random noise.
+    """
+    return normalize_v(embedding + rng.normal(0, noise, embedding.shape).astype(np.float32))
+
+
+def test_near_duplicate_hits(cache):
+    rng = np.random.default_rng(0)
+    hits = 0
+    for _ in range(50):
+        embedding = normalize_v(rng.standard_normal(DIMENSION).astype(np.float32))
+        cache.put(cache.key(embedding, 1, 5), [(0.9, "doc")], 0.01)
+        other = near_duplicate(rng, embedding)
+        # Far finer than the old rounding grid could tell apart, yet not identical.
+        assert not np.array_equal(other, embedding)
+        assert np.dot(other, embedding) > 0.99
+        hits += cache.get(cache.key(other, 1, 5)) == [(0.9, "doc")]
+    # Bucketing is probabilistic: a rare near-duplicate may still fall outside the probes.
+    assert hits >= 48
+    assert cache.stats()["hits"] == hits
+
+
+def test_unrelated_query_misses(cache):
+    rng = np.random.default_rng(1)
+    embedding = normalize_v(rng.standard_normal(DIMENSION).astype(np.float32))
+    cache.put(cache.key(embedding, 1, 5), [(0.9, "doc")], 0.01)
+    for _ in range(20):
+        unrelated = rng.standard_normal(DIMENSION).astype(np.float32)
+        assert cache.get(cache.key(unrelated, 1, 5)) is None
+    assert cache.stats()["misses"] == 20
+
+
+def test_same_bucket_below_threshold_misses():
+    # A single bucket holds every question: only the cosine check tells them apart.
+    cache = RetrievalCache(max_entries=100, bits=0, threshold=0.99)
+    a = np.array([1.0, 0.0, 0.0], dtype=np.float32)
+    b = np.array([0.9, 0.3, 0.0], dtype=np.float32)
+    cache.put(cache.key(a, 1, 5), ["a"], 0.01)
+    assert cache.get(cache.key(b, 1, 5)) is None
+    assert cache.get(cache.key(a * 3, 1, 5)) == ["a"]
+
+
+def test_key_parts_must_match(cache):
+    rng = np.random.default_rng(2)
+    embedding = normalize_v(rng.standard_normal(DIMENSION).astype(np.float32))
+    cache.put(cache.key(embedding, 1, 5, "artículo 5"), ["doc"], 0.01)
+    assert cache.get(cache.key(embedding, 1, 3, "artículo 5")) is None
+    assert cache.get(cache.key(embedding, 1, 5, "artículo 6")) is None
+    assert cache.get(cache.key(embedding, 1, 5, "artículo 5")) == ["doc"]
+
+
+def test_corpus_version_change_invalidates(cache):
+    rng = np.random.default_rng(3)
+    embedding = normalize_v(rng.standard_normal(DIMENSION).astype(np.float32))
+    cache.put(cache.key(embedding, 1, 5), ["doc"], 0.01)
+    assert cache.get(cache.key(embedding, 2, 5)) is None
+    assert len(cache) == 0
+    # Keys of the older version are neither served nor stored anymore.
+    cache.put(cache.key(embedding, 1, 5), ["doc"], 0.01)
+    assert cache.get(cache.key(embedding, 1, 5)) is None
+
+
+def test_bounded_size():
+    cache = RetrievalCache(max_entries=10, bits=8, threshold=0.99)
+    rng = np.random.default_rng(4)
+    embeddings = [rng.standard_normal(DIMENSION).astype(np.float32) for _ in range(30)]
+    for i, embedding in enumerate(embeddings):
+        cache.put(cache.key(embedding, 1, 5), [i], 0.01)
+    assert len(cache) <= 10
+    assert cache.get(cache.key(embeddings[-1], 1, 5)) == [29]
+    assert cache.get(cache.key(embeddings[0], 1, 5)) is None
@@ -0,0 +1,39 @@
+import struct
+
+import numpy as np
+import pytest
+
+from src.utils.types import PackedVector, Vector
+
+
+def test_packed_vector_round_trip():
+    values = np.random.default_rng(0).standard_normal(1536).astype(np.float32)
+    packed = PackedVector.pack(values)
+    assert len(packed) == 8 + 4 * 1536
+    assert packed[:8] == struct.pack("<BBxxI", 1, 1, 1536)
+    unpacked = PackedVector.unpack(packed)
+    assert unpacked.dtype == np.float32 and np.array_equal(unpacked, values)
+    # Lists and float64 arrays are stored as float32 too.
+    assert np.array_equal(PackedVector.unpack(PackedVector.pack([0.5, -1.0])), np.array([0.5, -1.0], dtype=np.float32))
+
+
+def test_packed_vector_rejects_bad_input():
+    with pytest.raises(ValueError):
+        PackedVector.pack(np.zeros((2, 3)))
+    packed = PackedVector.pack(np.ones(4, dtype=np.float32))
+    # Unknown dtype code and format version.
+    with pytest.raises(ValueError):
+        PackedVector.unpack(packed[:1] + b"\x02" + packed[2:])
+    with pytest.raises(ValueError):
+        PackedVector.unpack(b"\x02" + packed[1:])
+    # Header dimension that does not match the payload.
+    with pytest.raises(ValueError):
+        PackedVector.unpack(packed[:4] + struct.pack("<I", 5) + packed[8:])
+    with pytest.raises(ValueError):
+        PackedVector.unpack(packed + b"\x00\x00\x00\x00")
+
+
+def test_vector_literals_round_trip():
+    values = np.random.default_rng(1).standard_normal(16).astype(np.float32)
+    assert np.array_equal(Vector.from_text(Vector.to_text(values)), values)
+    assert np.array_equal(Vector.from_binary(Vector.to_binary(values)), values)
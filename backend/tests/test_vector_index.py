@@ -0,0 +1,107 @@
+import asyncio
+import heapq
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.utils.general import normalize_v
+from src.utils.rag.vector_index import VectorIndex
+
+
+def reference_top_k(question_embedding: np.ndarray, documents: list, k: int) -> list:
+    """
+    The per-document cosine / `heapq.nlargest` loop `VectorIndex` replaced.
+    """
+    scored = []
+    for doc in documents:
+        score = float(np.dot(normalize_v(np.array(question_embedding)), normalize_v(np.array(doc.embedding))))
+        scored.append((score, doc))
+    return heapq.nlargest(k, scored, key=lambda x: x[0])
+
+
+def make_documents(rng: np.random.Generator, n: int, dimension: int = 32) -> list:
+    return [
+        SimpleNamespace(id=i, embedding=rng.standard_normal(dimension).astype(np.float32))
+        for i in range(n)
+    ]
+
+
+def assert_same(result: list, expected: list):
+    assert [doc.id for _, doc in result] == [doc.id for _, doc in expected]
+    np.testing.assert_allclose([s for s, _ in result], [s for s, _ in expected], rtol=1e-5, atol=1e-6)
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("k", [1, 5, 20])
+def test_search_matches_reference(seed, k):
+    rng = np.random.default_rng(seed)
+    documents = make_documents(rng, 200)
+    question = rng.standard_normal(32).astype(np.float32)
+    assert_same(VectorIndex.from_documents(documents).search(question, k), reference_top_k(question, documents, k))
+
+
+def test_ties_keep_corpus_order():
+    rng = np.random.default_rng(1)
+    documents = make_documents(rng, 10)
+    # Exactly representable scores: three documents along the question, the rest orthogonal to it.
+    for doc in documents:
+        doc.embedding[0] = 0.0
+    for i in (1, 3, 6):
+        documents[i].embedding = np.eye(32, dtype=np.float32)[0] * (i + 1)
+    question = np.eye(32, dtype=np.float32)[0]
+    result = VectorIndex.from_documents(documents).search(question, 5)
+    assert [doc.id for _, doc in result] == [1, 3, 6, 0, 2]
+    assert_same(result, reference_top_k(question, documents, 5))
+
+
+def test_k_larger_than_corpus():
+    rng = np.random.default_rng(2)
+    documents = make_documents(rng, 7)
+    question = rng.standard_normal(32).astype(np.float32)
+    result = VectorIndex.from_documents(documents).search(question, 50)
+    assert len(result) == 7
+    assert_same(result, reference_top_k(question, documents, 50))
+
+
+def test_k_zero():
+    rng = np.random.default_rng(3)
+    documents = make_documents(rng, 5)
+    assert VectorIndex.from_documents(documents).search(rng.standard_normal(32), 0) == []
+    assert reference_top_k(rng.standard_normal(32), documents, 0) == []
+
+
+def test_empty_index():
+    question = np.ones(32, dtype=np.float32)
+    assert VectorIndex.from_documents([]).search(question, 5) == []
+    assert VectorIndex.empty(32).search(question, 5) == []
+    assert VectorIndex.empty(32).search_many(np.ones((2, 32)), 5) == [[], []]
+
+
+def test_zero_query_vector():
+    rng = np.random.default_rng(4)
+    documents = make_documents(rng, 6)
+    question = np.zeros(32, dtype=np.float32)
+    result = VectorIndex.from_documents(documents).search(question, 3)
+    # Every score is 0, so the first documents win, as with `heapq.nlargest`.
+    assert [score for score, _ in result] == [0.0, 0.0, 0.0]
+    assert_same(result, reference_top_k(question, documents, 3))
+
+
+def test_search_many_matches_search():
+    rng = np.random.default_rng(5)
+    documents = make_documents(rng, 100)
+    index = VectorIndex.from_documents(documents)
+    questions = rng.standard_normal((4, 32)).astype(np.float32)
+    for result, question in zip(index.search_many(questions, 5), questions):
+        assert_same(result, index.search(question, 5))
+
+
+def test_rag_manager_get_top_k_documents():
+    from src.utils.rag.rag_manager import RagManager
+
+    rng = np.random.default_rng(6)
+    documents = make_documents(rng, 50)
+    question = rng.standard_normal(32).astype(np.float32)
+    result = asyncio.run(RagManager(None, client=object()).get_top_k_documents(question, documents, 5))
+    assert_same(result, reference_top_k(question, documents, 5))